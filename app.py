@@ -1,19 +1,521 @@
 import streamlit as st
-import pandas as pd
 import subprocess
+import math
 import os
 import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+import worker as extraction_worker
+from progress import parse_event, eta_seconds
+from session_store import has_session
+from output_schema import output_paths, read_results, DEFAULT_FORMATS, MIME_TYPES
+from job_queue import JobQueue, job_output_path, ACTIVE_STATES
+from draft_id_input import split_ids, read_upload, clean_ids, write_id_file
+from run_diff import diff_frames, diff_summary, read_result, read_table
+# pandas is imported only where a table is drawn: most reruns (Steps 1-3) never need it
+
+# "worker": jobs queued to the warm, logged-in browser kept between runs (EXTRACTOR_WORKER_POOL caps
+# how many run at once across all users); "selenium": one headless Chrome subprocess per run
+EXTRACTOR_BACKEND = os.getenv("EXTRACTOR_BACKEND", "worker").strip().lower()
 
 st.set_page_config(page_title="MoEngage Campaign Extractor", layout="centered")
-st.title("MoEngage Campaign Extractor (Headless Selenium)")
+st.title("MoEngage Campaign Extractor")
 
 # ==========================================
 # SESSION STATE
 # ==========================================
 if "step" not in st.session_state:
     st.session_state.step = 1
-for k in ["email", "password", "db_name", "draft_ids_text", "otp"]:
+for k in ["email", "password", "db_name", "otp"]:
     st.session_state.setdefault(k, "")
+st.session_state.setdefault("use_cache", True)
+st.session_state.setdefault("workspace_drafts", {})  # {workspace: [validated, deduped draft IDs]}
+st.session_state.setdefault("draft_texts", {})  # {workspace: text typed into its Draft IDs box}
+st.session_state.setdefault("run_state", None)  # None -> extraction not started for this visit of Step 4
+st.session_state.setdefault("view_job", None)  # queued job shown in Step 4 (worker backend)
+st.session_state.setdefault("run_timing", None)  # last "timing" progress event
+st.session_state.setdefault("discover", None)  # draft listing filters when every listed draft is extracted
+st.session_state.setdefault("baseline", None)  # {"name", "data"} of a previous result to diff against
+
+# ==========================================
+# EXTRACTION PROGRESS
+# ==========================================
+LOG_TAIL_LINES = 200  # only the end of the extractor log is kept for display
+RUN_IDLE_TIMEOUT = 600  # seconds without a finished draft before the Selenium extractor is killed
+PREVIEW_LIMIT = 50  # duplicates/invalid entries listed in the Step 2 preview
+
+
+def output_filename():
+    if len(st.session_state.workspace_drafts) > 1:
+        return "workspaces_campaigns_headless.csv"
+    return f"{st.session_state.db_name}_campaigns_headless.csv"
+
+
+def extraction_events(csv_filename):
+    """
+    Runs the Selenium extractor and yields its progress events.
+    Plain extractor output comes through as {"event": "log", "line": ...}.
+    """
+    # The IDs go through a file: thousands of them would not fit in the environment
+    with tempfile.NamedTemporaryFile("w", prefix="draft_ids_", suffix=".txt", delete=False) as f:
+        id_file = f.name
+    write_id_file(id_file, st.session_state.workspace_drafts[st.session_state.db_name])
+    env = os.environ.copy()
+    env["MOENGAGE_EMAIL"] = st.session_state.email
+    env["MOENGAGE_PASSWORD"] = st.session_state.password
+    env["WORKSPACE"] = st.session_state.db_name
+    env["DRAFT_IDS_FILE"] = id_file
+    env["OTP_CODE"] = st.session_state.otp
+    env["PROGRESS_EVENTS"] = "1"
+    if not st.session_state.use_cache:
+        env["RESULT_CACHE"] = "off"
+
+    proc = subprocess.Popen(
+        [sys.executable, "selenium_headless.py"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=env
+    )
+    st.session_state.run_proc = proc
+    # Checked off the output loop, so an extractor that hangs without printing is killed too;
+    # it resets on every finished draft, so long ID lists are never cut off while progressing
+    last_progress = [time.monotonic()]
+    timed_out = threading.Event()
+
+    def watchdog():
+        while proc.poll() is None:
+            if time.monotonic() - last_progress[0] > RUN_IDLE_TIMEOUT:
+                timed_out.set()
+                proc.kill()
+                return
+            time.sleep(1)
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    try:
+        for line in proc.stdout:
+            event = parse_event(line)
+            if event and event["event"] == "draft":
+                last_progress[0] = time.monotonic()
+            yield event or {"event": "log", "line": line.rstrip()}
+        proc.wait()
+        if timed_out.is_set():
+            raise TimeoutError
+        if proc.returncode and st.session_state.run_state == "cancelled":
+            yield {"event": "cancelled"}
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        st.session_state.run_proc = None
+        os.remove(id_file)
+
+
+def render_progress(events):
+    """
+    Shows a live progress bar, ETA, growing results table and log tail.
+    Returns "done", "failed" or "cancelled".
+    """
+    import pandas as pd
+
+    bar = st.progress(0.0, text="Starting extraction...")
+    table_slot = st.empty()
+    log_slot = st.empty()
+    table = None
+    logs = deque(maxlen=LOG_TAIL_LINES)
+    total, finished, outcome = 0, 0, "failed"
+    started = time.monotonic()
+
+    for event in events:
+        kind = event["event"]
+        if kind == "start":
+            total = event["total"]
+            started = time.monotonic()
+        elif kind == "draft":
+            finished += 1
+            eta = eta_seconds(finished, total, time.monotonic() - started)
+            bar.progress(min(finished / max(total, 1), 1.0), text=f"{finished}/{total} drafts — ETA {eta:.0f}s")
+            if event.get("row"):
+                row = pd.DataFrame([event["row"]])
+                if table is None:
+                    table = table_slot.dataframe(row)
+                else:
+                    table.add_rows(row)
+        elif kind == "log":
+            logs.append(event["line"])
+            log_slot.code("\n".join(logs))
+        elif kind == "timing":
+            st.session_state.run_timing = event
+        elif kind == "done":
+            outcome = "done"
+            bar.progress(1.0, text=f"{finished}/{total} drafts — done")
+        elif kind == "error":
+            st.error(event.get("message"))
+        elif kind == "cancelled":
+            outcome = "cancelled"
+
+    table_slot.empty()
+    return outcome
+
+
+def render_timing(timing):
+    """
+    Where the run's time went: total seconds per phase and the slowest drafts; peak memory.
+    """
+    if not timing or not timing.get("phases"):
+        return
+    import pandas as pd
+
+    st.subheader("Timing breakdown")
+    # "draft" spans cover the other per-draft phases, so they would double count
+    phases = pd.DataFrame([p for p in timing["phases"] if p["phase"] != "draft"]).set_index("phase")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.bar_chart(phases["total_s"], horizontal=True)
+    with col2:
+        st.dataframe(phases[["count", "mean_s", "p95_s", "failures"]])
+    if timing.get("slowest_drafts"):
+        st.caption("Slowest drafts")
+        st.dataframe(pd.DataFrame(timing["slowest_drafts"])[["draft_id", "total_s", "slowest_phase"]], hide_index=True)
+    memory = timing.get("memory")
+    if memory:
+        st.caption(f"Peak memory: {memory['peak_rss_mb']:.0f} MB "
+                   f"({memory['peak_browser_rss_mb']:.0f} MB browser), "
+                   f"{memory['recycles']} browser session recycle(s)")
+
+
+# ==========================================
+# QUEUED JOBS (worker backend)
+# ==========================================
+# Job IDs live in the URL (?job=...), so a page refresh finds the jobs again;
+# their status, progress and result files are read from the persisted job queue.
+JOB_POLL_SECONDS = 2
+REMEMBERED_JOBS = 10
+
+
+def remembered_jobs():
+    return [j for j in st.query_params.get_all("job") if j]
+
+
+def remember_job(job_id):
+    st.query_params["job"] = [job_id] + [j for j in remembered_jobs() if j != job_id][:REMEMBERED_JOBS - 1]
+
+
+def load_jobs(job_ids):
+    queue = JobQueue()
+    try:
+        jobs = queue.list(job_ids)
+        for job in jobs:
+            job["position"] = queue.position(job["job_id"]) if job["status"] == "queued" else None
+        return jobs
+    finally:
+        queue.close()
+
+
+def submit_job():
+    """
+    Queues the extraction set up in Steps 1-3 and returns its job ID without waiting for it.
+    """
+    job_id = uuid.uuid4().hex
+    extraction_worker.enqueue({
+        "job_id": job_id,
+        "email": st.session_state.email,
+        "password": st.session_state.password,
+        "workspaces": st.session_state.workspace_drafts,
+        "otp": st.session_state.otp,
+        "output": job_output_path(job_id, output_filename()),
+        "use_cache": st.session_state.use_cache,
+        "formats": DEFAULT_FORMATS,
+        "discover": st.session_state.discover,
+    })
+    remember_job(job_id)
+    return job_id
+
+
+def job_label(job):
+    workspaces = ", ".join(job["spec"].get("workspaces") or [job["spec"].get("workspace", "")])
+    started = time.strftime("%H:%M", time.localtime(job["submitted_at"]))
+    return f"{started} · {workspaces}"
+
+
+def job_status_text(job):
+    if job["status"] == "queued":
+        return f"queued (#{job['position']} in line)" if job["position"] else "queued"
+    if job["status"] == "running" and job["total"]:
+        return f"running — {job['finished']}/{job['total']} drafts"
+    return job["status"]
+
+
+def render_jobs_panel():
+    """
+    Sidebar list of this browser's jobs; polls while any of them is queued or running.
+    """
+    job_ids = remembered_jobs()
+    if not job_ids:
+        return
+
+    def panel():
+        jobs = load_jobs(job_ids)
+        st.subheader("Jobs")
+        for job in jobs:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.caption(f"{job_label(job)} — {job_status_text(job)}")
+            with col2:
+                if st.button("View", key=f"view_{job['job_id']}"):
+                    st.session_state.update({"step": 4, "view_job": job["job_id"], "run_state": "submitted"})
+                    st.rerun()
+
+    active = any(job["status"] in ACTIVE_STATES for job in load_jobs(job_ids))
+    with st.sidebar:
+        st.fragment(panel, run_every=JOB_POLL_SECONDS if active else None)()
+
+
+def render_job(job_id):
+    """
+    Live status of a queued job; its results once it is done.
+    """
+    def status():
+        job = load_jobs([job_id])[0]
+        if job["status"] not in ACTIVE_STATES:
+            st.rerun()  # finished: redraw the page with the results, and stop polling
+        if job["status"] == "queued":
+            st.info(f"Waiting for a free extraction slot — {job_status_text(job)}.")
+        else:
+            done = job["finished"] / job["total"] if job["total"] else 0.0
+            st.progress(min(done, 1.0), text=f"{job['finished']}/{job['total'] or '?'} drafts")
+        st.button("Cancel", on_click=extraction_worker.cancel, args=(job_id,), key=f"cancel_{job_id}")
+
+    jobs = load_jobs([job_id])
+    if not jobs:
+        st.error("This job is no longer available.")
+        return
+    job = jobs[0]
+    if job["status"] in ACTIVE_STATES:
+        st.fragment(status, run_every=JOB_POLL_SECONDS)()
+    elif job["status"] == "done":
+        render_results(job["outputs"], job["timing"])
+    elif job["status"] == "cancelled":
+        st.warning("Extraction cancelled.")
+    else:
+        st.error(job["error"] or "Extraction failed.")
+        if job["status"] == "interrupted":
+            st.caption(f"Completed drafts are kept in run journal {job_id}.")
+
+
+# ==========================================
+# RESULTS
+# ==========================================
+# Results are parsed once per file version (path and modification time) and kept in st.cache_data,
+# so reruns (paging, filtering, downloads, a finished job's page) never read them again.
+# Tables are filtered here and sent to the browser one page at a time.
+RESULT_CACHE_ENTRIES = 8
+PAGE_SIZES = [25, 50, 100, 250]
+CELL_PREVIEW_CHARS = 300  # longer cells (message bodies) are cut in the table; downloads keep them whole
+FILTER_COLUMNS = ["Workspace", "SMS Sender", "Change", "Column"]  # multiselect filters, where present
+SEARCH_COLUMNS = ["Draft ID", "Campaign Name"]
+
+
+def result_versions(result_paths):
+    return tuple(sorted((fmt, path, os.path.getmtime(path))
+                        for fmt, path in result_paths.items() if os.path.exists(path)))
+
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, show_spinner=False)
+def cached_result(versions):
+    # Parquet keeps the column types
+    return read_results({fmt: path for fmt, path, _ in versions})
+
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, show_spinner=False)
+def cached_diff(baseline_name, baseline_data, versions):
+    return diff_frames(read_table(baseline_name, baseline_data), read_result({fmt: path for fmt, path, _ in versions}))
+
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, show_spinner=False)
+def cached_file(path, mtime):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def cell_preview(frame):
+    """
+    The frame with text cells longer than CELL_PREVIEW_CHARS cut short.
+    """
+    import pandas as pd
+
+    frame = frame.copy()
+    for name in frame.columns:
+        if frame[name].dtype == object or pd.api.types.is_string_dtype(frame[name].dtype):
+            text = frame[name].astype("string")
+            long = text.str.len().fillna(0) > CELL_PREVIEW_CHARS
+            if long.any():
+                frame[name] = text.where(~long, text.str.slice(0, CELL_PREVIEW_CHARS) + "…")
+    return frame
+
+
+def render_table(df, key):
+    """
+    Filterable, paginated table of a result or diff frame. Runs as a fragment: paging and
+    filtering redraw only the table.
+    """
+    @st.fragment
+    def table():
+        view = df
+        validation_columns = [c for c in df.columns if c.endswith(" Validation")]
+        filters = [c for c in FILTER_COLUMNS if c in df.columns and df[c].nunique() > 1]
+        cols = st.columns(max(2, len(filters) + 1))
+        search = cols[0].text_input("Search ID or name", key=f"{key}_search")
+        for col, name in zip(cols[1:], filters):
+            options = sorted(df[name].dropna().astype(str).unique())
+            chosen = col.multiselect(name, options, key=f"{key}_{name}")
+            if chosen:
+                view = view[view[name].astype("string").isin(chosen)]
+        if validation_columns and st.checkbox("Only failed validations", key=f"{key}_failed"):
+            view = view[view[validation_columns].eq(False).fillna(False).any(axis=1)]
+        if search:
+            hits = None
+            for name in (c for c in SEARCH_COLUMNS if c in df.columns):
+                found = view[name].astype("string").str.contains(search, case=False, regex=False).fillna(False)
+                hits = found if hits is None else hits | found
+            if hits is not None:
+                view = view[hits]
+
+        total = len(view)
+        col1, col2 = st.columns(2)
+        size = col1.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+        pages = max(1, math.ceil(total / size))
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages  # the filters left fewer pages
+        page = col2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        start = (page - 1) * size
+        st.dataframe(cell_preview(view.iloc[start:start + size]), hide_index=True)
+        shown = f"Rows {start + 1}–{min(start + size, total)} of {total}" if total else "No matching rows"
+        st.caption(shown + (f" (filtered from {len(df)})" if total != len(df) else ""))
+
+    table()
+
+
+def render_diff(result_paths, baseline):
+    """
+    Only what changed since the baseline: one row per changed field, plus added and removed drafts.
+    Returns False if the baseline could not be compared.
+    """
+    try:
+        diff = cached_diff(baseline["name"], baseline["data"], result_versions(result_paths))
+    except Exception as e:
+        st.error(f"Could not compare with {baseline['name']}: {e}")
+        return False
+    summary = diff_summary(diff)
+    st.subheader(f"Changes since {baseline['name']}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Drafts changed", summary["changed_drafts"])
+    col2.metric("Added", summary["added"])
+    col3.metric("Removed", summary["removed"])
+    if diff.empty:
+        st.success("No changes.")
+        return True
+    if summary["columns"]:
+        st.caption("Changed fields: " + ", ".join(f"{c} ({n})" for c, n in summary["columns"].items()))
+    render_table(diff, "diff")
+    st.download_button("Download changes (CSV)", diff.to_csv(index=False), file_name="changes.csv",
+                       mime=MIME_TYPES["csv"], key="download_diff")
+    return True
+
+
+def render_results(result_paths, timing):
+    if not any(os.path.exists(path) for path in result_paths.values()):
+        st.error("Results not found — check logs above.")
+        return
+    # Downloads are served from the files as written
+    df = cached_result(result_versions(result_paths))
+    st.success("Extraction finished!")
+    if "From Cache" in df.columns:
+        cached = int(df["From Cache"].fillna(False).astype(bool).sum())
+        if cached:
+            st.info(f"{cached} of {len(df)} row(s) reused from the result cache.")
+    baseline = st.session_state.baseline
+    if baseline and render_diff(result_paths, baseline):
+        with st.expander(f"All {len(df)} row(s)"):
+            render_table(df, "result")
+    else:
+        render_table(df, "result")
+    for fmt, path in result_paths.items():
+        if os.path.exists(path):
+            st.download_button(
+                f"Download {fmt.upper()}",
+                cached_file(path, os.path.getmtime(path)),
+                file_name=os.path.basename(path),
+                mime=MIME_TYPES[fmt],
+                key=f"download_{fmt}"
+            )
+    render_timing(timing)
+
+
+# ==========================================
+# DRAFT ID INPUT
+# ==========================================
+def draft_id_input(workspace, label):
+    """
+    Text box plus file upload for one workspace's draft IDs, with a preview of the
+    count, duplicates and invalid entries. Returns (typed text, IdReport).
+    """
+    text = st.text_area(f"{label} (comma- or newline-separated)",
+                        value=st.session_state.draft_texts.get(workspace, ""), key=f"draft_ids_{workspace}")
+    upload = st.file_uploader(f"...or upload {label} (CSV, XLSX or one ID per line)",
+                              type=["csv", "xlsx", "txt"], key=f"upload_{workspace}")
+    tokens = split_ids(text)
+    if upload is not None:
+        try:
+            tokens += read_upload(upload.name, upload.getvalue())
+        except Exception as e:
+            st.error(f"Could not read {upload.name}: {e}")
+    report = clean_ids(tokens)
+
+    if report.valid or report.invalid:
+        parts = [f"{len(report.valid)} draft ID(s)"]
+        if report.duplicates:
+            parts.append(f"{sum(n - 1 for n in report.duplicates.values())} duplicate(s) removed")
+        if report.invalid:
+            parts.append(f"{len(report.invalid)} invalid entr{'y' if len(report.invalid) == 1 else 'ies'} skipped")
+        st.caption(" · ".join(parts))
+    if report.duplicates or report.invalid:
+        with st.expander("Duplicates and invalid entries"):
+            if report.duplicates:
+                st.write("Given more than once:")
+                st.code("\n".join(f"{d} ×{n}" for d, n in list(report.duplicates.items())[:PREVIEW_LIMIT]))
+            if report.invalid:
+                st.write("Not a 24-character hex draft ID:")
+                st.code("\n".join(report.invalid[:PREVIEW_LIMIT]))
+    return text, report
+
+
+DRAFT_SOURCES = ["Enter or upload draft IDs", "All SMS drafts in the workspace"]
+
+
+def discovery_filters():
+    """
+    Optional filters for extracting every listed draft. Returns the job's "discover" dict.
+    """
+    saved = st.session_state.discover or {}
+    col1, col2 = st.columns(2)
+    tag = col1.text_input("Only drafts tagged", value=saved.get("tag") or "")
+    name = col2.text_input("Name matches", value=saved.get("name_pattern") or "",
+                           help='Glob pattern, case-insensitive, e.g. "*EMI*"')
+    col3, col4 = st.columns(2)
+    created_from = col3.date_input("Created from", value=saved.get("created_from"), format="YYYY-MM-DD")
+    created_to = col4.date_input("Created to", value=saved.get("created_to"), format="YYYY-MM-DD")
+    st.caption("The draft list is read from the dashboard after login; all matching drafts are extracted.")
+    return {
+        "tag": tag.strip() or None,
+        "name_pattern": name.strip() or None,
+        "created_from": created_from.isoformat() if created_from else None,
+        "created_to": created_to.isoformat() if created_to else None,
+    }
+
 
 # ==========================================
 # STEP 1 — LOGIN CREDENTIALS
@@ -40,12 +542,35 @@ elif st.session_state.step == 2:
     st.subheader("Step 2 — Workspace & Draft IDs")
 
     db_options = ["Collections_TC", "Tata Capital", "TataCapital_UAT", "Services_TC", "Wealth_TC", "Moneyfy"]
-    db_name = st.selectbox(
-        "Select Workspace",
+    selected = list(st.session_state.workspace_drafts) or [st.session_state.db_name]
+    workspaces = st.multiselect(
+        "Select Workspaces",
         db_options,
-        index=db_options.index(st.session_state.db_name) if st.session_state.db_name in db_options else 0
+        default=[ws for ws in selected if ws in db_options] or db_options[:1],
+        help="Several workspaces are extracted in parallel after a single login, into one combined result."
+    )
+    reports, draft_texts, discover = {}, {}, None
+    # Listing needs the worker's logged-in browser; the Selenium extractor only takes IDs
+    source = DRAFT_SOURCES[0]
+    if EXTRACTOR_BACKEND == "worker":
+        source = st.radio("Drafts", DRAFT_SOURCES, horizontal=True,
+                          index=0 if st.session_state.discover is None else 1)
+    if source == DRAFT_SOURCES[1]:
+        discover = discovery_filters()
+    else:
+        for ws in workspaces:
+            label = f"{ws} — Draft IDs" if len(workspaces) > 1 else "Draft IDs"
+            draft_texts[ws], reports[ws] = draft_id_input(ws, label)
+    baseline_upload = st.file_uploader(
+        "Compare with a previous result (optional)",
+        type=["csv", "parquet", "xlsx", "gz"],
+        help="Shows only the drafts and fields that changed since this file, e.g. the last run's download."
+    )
+    use_cache = st.checkbox(
+        "Reuse recently extracted results",
+        value=st.session_state.use_cache,
+        help="Drafts extracted within the last hour, or unchanged since, are not opened again."
     )
-    draft_ids = st.text_area("Draft IDs (comma-separated)", value=st.session_state.draft_ids_text)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -54,12 +579,33 @@ elif st.session_state.step == 2:
             st.rerun()
     with col2:
         if st.button("Next"):
-            if not draft_ids.strip():
-                st.warning("Enter at least one Draft ID.")
+            if not workspaces:
+                st.warning("Select at least one workspace.")
+            elif len(workspaces) > 1 and EXTRACTOR_BACKEND != "worker":
+                st.warning("The Selenium extractor handles one workspace per run; select a single workspace.")
+            elif discover is None and not all(report.valid for report in reports.values()):
+                st.warning("Enter or upload at least one valid Draft ID for every selected workspace.")
             else:
+                db_name = workspaces[0]
                 st.session_state.db_name = db_name
-                st.session_state.draft_ids_text = draft_ids
-                st.session_state.step = 3
+                st.session_state.draft_texts = draft_texts
+                if discover is None:
+                    st.session_state.workspace_drafts = {ws: report.valid for ws, report in reports.items()}
+                else:
+                    st.session_state.workspace_drafts = {ws: [] for ws in workspaces}  # listed when the job runs
+                st.session_state.discover = discover
+                st.session_state.use_cache = use_cache
+                st.session_state.baseline = (
+                    {"name": baseline_upload.name, "data": baseline_upload.getvalue()} if baseline_upload else None
+                )
+                # A stored, unexpired session for this account/workspace makes the OTP unnecessary;
+                # further workspaces reuse the first one's login
+                if has_session(st.session_state.email, db_name):
+                    st.session_state.otp = ""
+                    st.session_state.run_state = None
+                    st.session_state.step = 4
+                else:
+                    st.session_state.step = 3
                 st.rerun()
 
 # ==========================================
@@ -83,6 +629,7 @@ elif st.session_state.step == 3:
     if next_btn:
         if otp_code.strip() and otp_code.isdigit() and len(otp_code.strip()) == 6:
             st.session_state.otp = otp_code.strip()
+            st.session_state.run_state = None
             st.session_state.step = 4
             st.rerun()
         else:
@@ -93,46 +640,51 @@ elif st.session_state.step == 3:
 # ==========================================
 elif st.session_state.step == 4:
     st.subheader("Step 4 — Run Extraction")
-    csv_filename = f"{st.session_state.db_name}_campaigns_headless.csv"
 
-    env = os.environ.copy()
-    env["MOENGAGE_EMAIL"] = st.session_state.email
-    env["MOENGAGE_PASSWORD"] = st.session_state.password
-    env["WORKSPACE"] = st.session_state.db_name
-    env["DRAFT_IDS"] = st.session_state.draft_ids_text
-    env["OTP_CODE"] = st.session_state.otp
+    if EXTRACTOR_BACKEND == "worker":
+        # Submit once per visit of this step; reruns and refreshes follow the queued job
+        if st.session_state.run_state is None:
+            try:
+                st.session_state.view_job = submit_job()
+                st.session_state.run_state = "submitted"
+            except Exception as e:
+                st.error(f"Could not queue the extraction: {e}")
+                st.session_state.run_state = "failed"
+        if st.session_state.view_job and st.session_state.run_state == "submitted":
+            render_job(st.session_state.view_job)
+    else:
+        csv_filename = output_filename()
+        result_paths = output_paths(csv_filename)
 
-    with st.spinner("Running headless Chrome... this may take 2–3 mins"):
-        try:
-            process = subprocess.run(
-                [sys.executable, "selenium_headless.py"],
-                capture_output=True,
-                text=True,
-                env=env,
-                timeout=600
-            )
+        def cancel_run():
+            proc = st.session_state.get("run_proc")
+            if proc is not None and proc.poll() is None:
+                proc.terminate()
+            st.session_state.run_state = "cancelled"
 
-            if process.stdout:
-                st.text_area("Logs (stdout):", process.stdout, height=250)
-            if process.stderr:
-                st.warning("Errors / stderr:")
-                st.text_area("stderr", process.stderr, height=200)
-
-            if os.path.exists(csv_filename):
-                df = pd.read_csv(csv_filename)
-                st.success("Extraction finished!")
-                st.dataframe(df)
-                st.download_button(
-                    "Download CSV",
-                    df.to_csv(index=False).encode("utf-8"),
-                    file_name=csv_filename
-                )
-            else:
-                st.error("CSV not found — check logs above.")
+        # Extract only once per visit of this step; reruns (e.g. Download) reuse the result
+        if st.session_state.run_state is None:
+            # Never show results left over from a previous run
+            for path in result_paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            st.session_state.run_state = "running"
+            st.session_state.run_timing = None
+            st.button("Cancel", on_click=cancel_run)
+            try:
+                st.session_state.run_state = render_progress(extraction_events(csv_filename))
+            except TimeoutError:
+                st.error(f"Process timed out: no draft finished for {RUN_IDLE_TIMEOUT}s.")
+                st.session_state.run_state = "failed"
+            except Exception as e:
+                st.error(f"Unexpected error: {e}")
+                st.session_state.run_state = "failed"
 
-        except subprocess.TimeoutExpired:
-            st.error("Process timed out.")
-        except Exception as e:
-            st.error(f"Unexpected error: {e}")
+        if st.session_state.run_state == "cancelled":
+            st.warning("Extraction cancelled.")
+        else:
+            render_results(result_paths, st.session_state.run_timing)
+
+    st.button("Run Again", on_click=lambda: st.session_state.update({"step": 1, "run_state": None, "view_job": None}))
 
-    st.button("Run Again", on_click=lambda: st.session_state.update({"step": 1}))
+render_jobs_panel()
@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from memory_guard import processes, process_tree
+from mock_dashboard import start_server, add_scenario_arguments, scenario_from_args
+from progress import parse_event
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Offline extraction benchmark: runs the extractors against mock_dashboard.py and writes
+# a JSON baseline that later runs can be compared with (--compare).
+#   python benchmark.py --drafts 50 --output baseline.json
+#   python benchmark.py --drafts 50 --compare baseline.json
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRAPERS = ("playwright", "selenium")
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+BENCH_WORKSPACE = "Collections_TC"
+BENCH_OTP = "123456"
+MEMORY_SAMPLE_S = 0.25
+RUN_TIMEOUT_S = 1800
+# Metrics where a lower value is better; everything else compared is higher-is-better
+LOWER_IS_BETTER = ("wall_s", "first_draft_s", "p50_s", "p95_s", "peak_rss_mb", "peak_chromium_mb", "errors")
+# Cold-start budget (--startup): cumulative seconds to import each entry module in a fresh
+# interpreter. Importing must not start a browser, probe the network or pull in pandas/Selenium.
+#   python benchmark.py --startup
+STARTUP_BUDGET_S = {
+    "output_schema": 0.05,
+    "job_queue": 0.15,
+    "worker": 0.4,
+    "selenium_headless": 0.6,
+    "scrape": 1.5,
+}
+STARTUP_BUDGET_SCALE = float(os.getenv("STARTUP_BUDGET_SCALE", "1"))  # e.g. 2 on a slow CI machine
+STARTUP_RUNS = 5
+
+# ==========================================
+# MEMORY SAMPLING
+# ==========================================
+class MemorySampler(threading.Thread):
+    """
+    Samples the RSS of the extractor process and the total RSS of the Chromium
+    processes below it until stopped; keeps the peaks.
+    """
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak_rss = 0
+        self.peak_chromium = 0
+        self.stopped = threading.Event()
+
+    def sample(self):
+        procs = processes()
+        tree = process_tree(self.pid, procs)
+        if self.pid in procs:
+            self.peak_rss = max(self.peak_rss, procs[self.pid][1])
+        chromium = sum(procs[p][1] for p in tree if "chrom" in procs[p][2].lower())
+        self.peak_chromium = max(self.peak_chromium, chromium)
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.sample()
+            except OSError:
+                pass
+            self.stopped.wait(MEMORY_SAMPLE_S)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+# ==========================================
+# RUNS
+# ==========================================
+def _command(scraper, draft_ids, workdir, args):
+    if scraper == "playwright":
+        return [
+            sys.executable, os.path.join(HERE, "scrape.py"),
+            BENCH_EMAIL, BENCH_PASSWORD, BENCH_WORKSPACE, ",".join(draft_ids),
+            os.path.join(workdir, "bench.csv"), BENCH_OTP,
+            "--concurrency", str(args.concurrency), "--mode", args.mode, "--progress", "--no-cache",
+        ], {}
+    return [sys.executable, os.path.join(HERE, "selenium_headless.py")], {
+        "MOENGAGE_EMAIL": BENCH_EMAIL,
+        "MOENGAGE_PASSWORD": BENCH_PASSWORD,
+        "WORKSPACE": BENCH_WORKSPACE,
+        "DRAFT_IDS": ",".join(draft_ids),
+        "OTP_CODE": BENCH_OTP,
+        "PROGRESS_EVENTS": "1",
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_scraper(scraper, draft_ids, base_url, args):
+    """
+    Runs one extractor over the synthetic drafts and returns its metrics.
+    Per-draft latency is the gap between consecutive draft completions, so it is exact at
+    --concurrency 1; the first draft also includes login and is reported separately.
+    """
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scraper}-") as workdir:
+        cmd, extra_env = _command(scraper, draft_ids, workdir, args)
+        env = dict(os.environ, **extra_env)
+        env.update({
+            "MOENGAGE_DASHBOARD_URL": base_url,
+            "SESSION_STORE_DIR": os.path.join(workdir, ".sessions"),
+            "RUN_JOURNAL_DIR": os.path.join(workdir, "runs"),
+            "RESULT_CACHE": "off",
+            "OUTPUT_FORMATS": "csv",
+            "PYTHONUNBUFFERED": "1",
+        })
+        started = time.monotonic()
+        proc = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, bufsize=1)
+        sampler = MemorySampler(proc.pid)
+        sampler.start()
+        finished, errors, failure, phases = [], 0, None, {}
+        try:
+            for line in proc.stdout:
+                event = parse_event(line)
+                if event is None:
+                    if args.verbose:
+                        print(f"  [{scraper}] {line.rstrip()}")
+                    continue
+                if event["event"] == "draft":
+                    finished.append(event["elapsed_s"])
+                    errors += event["status"] != "ok"
+                elif event["event"] == "timing":
+                    phases = {p["phase"]: p["mean_s"] for p in event["phases"]}
+                elif event["event"] == "error":
+                    failure = event.get("message")
+                if time.monotonic() - started > RUN_TIMEOUT_S:
+                    failure = f"timed out after {RUN_TIMEOUT_S}s"
+                    break
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            sampler.stop()
+        wall = time.monotonic() - started
+
+    gaps = [b - a for a, b in zip(finished, finished[1:])]
+    span = finished[-1] - finished[0] if len(finished) > 1 else 0
+    return {
+        "drafts": len(finished),
+        "errors": errors + (len(draft_ids) - len(finished)),
+        "failure": failure or (f"exit code {proc.returncode}" if proc.returncode else None),
+        "wall_s": round(wall, 3),
+        "first_draft_s": round(finished[0], 3) if finished else None,
+        "p50_s": _round(percentile(gaps, 50)),
+        "p95_s": _round(percentile(gaps, 95)),
+        "mean_s": _round(statistics.fmean(gaps) if gaps else None),
+        "throughput_per_min": round(len(gaps) / span * 60, 2) if span else None,
+        "peak_rss_mb": round(sampler.peak_rss / 2 ** 20, 1),
+        "peak_chromium_mb": round(sampler.peak_chromium / 2 ** 20, 1),
+        "phase_mean_s": phases,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ==========================================
+# STARTUP BUDGET
+# ==========================================
+def import_seconds(module):
+    """
+    Cumulative import time of module in a fresh interpreter (python -X importtime).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in reversed(result.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"no import timing for {module}")
+
+
+def check_startup(runs=STARTUP_RUNS, scale=STARTUP_BUDGET_SCALE):
+    """
+    Compares the median cold import time of each entry module with its budget.
+    Returns True when all are within budget.
+    """
+    ok = True
+    for module, budget in STARTUP_BUDGET_S.items():
+        try:
+            seconds = statistics.median(import_seconds(module) for _ in range(runs))
+        except RuntimeError as e:
+            print(f"  {module:<18} skipped ({e})")
+            continue
+        within = seconds <= budget * scale
+        ok &= within
+        print(f"  {module:<18} {seconds * 1000:>7.1f} ms  (budget {budget * scale * 1000:.0f} ms)"
+              f"{'' if within else '  OVER BUDGET'}")
+    return ok
+
+# ==========================================
+# REPORT
+# ==========================================
+def compare(current, baseline):
+    """
+    Prints each metric next to the baseline with the relative change.
+    """
+    for scraper, metrics in current["results"].items():
+        before = baseline.get("results", {}).get(scraper)
+        if not before:
+            print(f"{scraper}: not in baseline")
+            continue
+        print(f"{scraper} (baseline {baseline.get('commit')} -> {current.get('commit')}):")
+        for name, value in metrics.items():
+            old = before.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old * 100
+            better = change < 0 if name in LOWER_IS_BETTER else change > 0
+            marker = "" if abs(change) < 5 else ("  better" if better else "  WORSE")
+            print(f"  {name:<20} {old:>10} -> {value:>10}  ({change:+.1f}%){marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractors against the mock dashboard")
+    parser.add_argument("--drafts", type=int, default=20, help="Number of synthetic drafts (default: %(default)s)")
+    parser.add_argument("--scrapers", default=",".join(SCRAPERS), help="Comma-separated: playwright, selenium")
+    parser.add_argument("--concurrency", type=int, default=1, help="Playwright tabs (default: %(default)s)")
+    parser.add_argument("--mode", choices=("dom", "api"), default="dom", help="Playwright extraction mode")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show extractor log output")
+    parser.add_argument("--startup", action="store_true",
+                        help="Only check entry-module import times against their budget; exit 1 if over")
+    add_scenario_arguments(parser)
+    args = parser.parse_args()
+
+    if args.startup:
+        print(f"Cold import times (median of {STARTUP_RUNS}):")
+        sys.exit(0 if check_startup() else 1)
+
+    scrapers = [s.strip() for s in args.scrapers.split(",") if s.strip()]
+    if not scrapers or any(s not in SCRAPERS for s in scrapers):
+        parser.error(f"--scrapers takes one or more of: {', '.join(SCRAPERS)}")
+
+    scenario = scenario_from_args(args)
+    server, base_url = start_server(**scenario)
+    print(f"Mock dashboard on {base_url}")
+    draft_ids = [f"bench{i:019d}" for i in range(args.drafts)]
+    results = {}
+    try:
+        for scraper in scrapers:
+            print(f"Running {scraper} over {len(draft_ids)} drafts...")
+            results[scraper] = run_scraper(scraper, draft_ids, base_url, args)
+            print(f"  {json.dumps(results[scraper])}")
+    finally:
+        server.shutdown()
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"drafts": args.drafts, "concurrency": args.concurrency, "mode": args.mode, **scenario},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from collections import namedtuple
+
+# ==========================================
+# FIELD TABLE
+# ==========================================
+# name:      key in the extracted section dict
+# xpath:     element to read (first match, or all matches for kind "texts")
+# kind:      "value" | "text" | "texts" | "parent_text" | "checked" | "attr:<name>"
+# default:   value used when the element is absent
+# transform: optional callable applied to a present raw value (ValueError -> default)
+FieldSpec = namedtuple("FieldSpec", ["name", "xpath", "kind", "default", "transform"], defaults=[None])
+
+
+class _Absent:
+    """Marker for a field whose element is not on the page."""
+    def __repr__(self):
+        return "ABSENT"
+
+    def __bool__(self):
+        return False
+
+
+ABSENT = _Absent()
+
+
+def _strip(value):
+    return value.strip()
+
+
+def _is_true(value):
+    return value == "true"
+
+
+def _join_tags(values):
+    return ", ".join(v.strip() for v in values)
+
+
+TARGET_USERS_FIELDS = [
+    FieldSpec("Campaign Name", "//input[@placeholder='Campaign Name']", "value", "N/A"),
+    FieldSpec("User Attribute", "//span[@class='mds-dropdown__trigger__inner__single--value']", "text", "N/A"),
+    FieldSpec("Campaign Tags", "//div[@class='mds-input__input--tags__list--item']/span[1]", "texts", "N/A", _join_tags),
+    FieldSpec("Message Type", "//div[@class='dashboard-ui-103k3sf e441wj90']//input[@checked]", "parent_text", "N/A", _strip),
+    FieldSpec("Audience Selection", "//div[@class='mds-segmentation__section mds-segmentation__header']//input[@checked]/..", "text", "N/A", _strip),
+    FieldSpec("Exclude User", "//input[@id='exclude-user']", "checked", False),
+    FieldSpec("User Opted Out Toggle", "//div[@class='mds-preferenceManagement']//span[@role='switch']", "attr:aria-checked", False, _is_true),
+    FieldSpec("Audience Limit Toggle", "//span[@aria-labelledby='Limit the number of users who will receive the campaign.']", "attr:aria-checked", False, _is_true),
+    FieldSpec("Control Group Toggle", "//span[@aria-labelledby='Campaign control group']", "attr:aria-checked", False, _is_true),
+]
+
+CONTENT_FIELDS = [
+    FieldSpec("SMS Sender", "//div[@placeholder='Select a connector']//span[@class='mds-dropdown__trigger__inner__single--value']", "text", "N/A"),
+    FieldSpec("Template ID", "//input[@id='template_id']", "value", "N/A"),
+    FieldSpec("Message Body", "//div[@id='personalization_container']", "text", "N/A"),
+]
+
+# Raw schedule fields; Send Time and Scheduled Datetime are derived from these in scrape.py
+SCHEDULE_FIELDS = [
+    FieldSpec("Send Campaign Type", "//input[@name='gCampaignType' and @checked]", "attr:id", "N/A"),
+    FieldSpec("Start Date", "//input[@placeholder='Select date']", "value", "N/A"),
+    FieldSpec("Hours", "(//div[contains(@class,'mds-timepicker__col')]//input[@type='number'])[1]", "value", "N/A"),
+    FieldSpec("Minutes", "(//div[contains(@class,'mds-timepicker__col')]//input[@type='number'])[2]", "value", "N/A"),
+    FieldSpec("AM/PM", "//div[contains(@class,'mds-button-group')]//button[contains(@class,'mds-button--primary')]", "text", "N/A"),
+    FieldSpec("Conversion Goals", "//div[@class='mds-cg']//div[contains(@class,'mds-cg__section')]", "text", "N/A"),
+    FieldSpec("Frequency Cap Toggle", "//span[@role='switch' and ../input[@name='Frequency capping']]", "attr:aria-checked", False, _is_true),
+    FieldSpec("Request Limit", "//input[@placeholder='Requests per/min...']", "value", None, int),
+]
+
+# ==========================================
+# SNAPSHOT
+# ==========================================
+# Reads every field of a table in one pass inside the page; absent elements come back as null
+SNAPSHOT_JS = """
+(fields) => {
+    const first = (xpath) => document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const all = (xpath) => {
+        const r = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < r.snapshotLength; i++) nodes.push(r.snapshotItem(i));
+        return nodes;
+    };
+    const out = {};
+    for (const [name, xpath, kind] of fields) {
+        if (kind === "texts") {
+            const texts = all(xpath).map(el => el.innerText);
+            out[name] = texts.length ? texts : null;
+            continue;
+        }
+        const el = first(xpath);
+        if (!el) { out[name] = null; continue; }
+        if (kind === "value") out[name] = el.value;
+        else if (kind === "text") out[name] = el.innerText;
+        else if (kind === "parent_text") out[name] = el.parentElement ? el.parentElement.innerText : null;
+        else if (kind === "checked") out[name] = el.checked;
+        else if (kind.startsWith("attr:")) out[name] = el.getAttribute(kind.slice(5));
+        else out[name] = null;
+    }
+    return out;
+}
+"""
+
+
+def _table_arg(fields):
+    return [[f.name, f.xpath, f.kind] for f in fields]
+
+
+async def snapshot_fields(page, fields):
+    """
+    Reads all fields of a table with a single page.evaluate round trip.
+    Returns {name: raw value or ABSENT}.
+    """
+    raw = await page.evaluate(SNAPSHOT_JS, _table_arg(fields))
+    return {f.name: ABSENT if raw.get(f.name) is None else raw[f.name] for f in fields}
+
+
+def snapshot_fields_selenium(driver, fields):
+    """
+    Selenium counterpart of snapshot_fields: one execute_script round trip, no waiting.
+    """
+    raw = driver.execute_script(f"return ({SNAPSHOT_JS})(arguments[0]);", _table_arg(fields)) or {}
+    return {f.name: ABSENT if raw.get(f.name) is None else raw[f.name] for f in fields}
+
+
+def resolve_fields(snapshot, fields):
+    """
+    Turns a snapshot into the section dict: transforms present values and
+    replaces ABSENT with each field's default.
+    """
+    data = {}
+    for f in fields:
+        value = snapshot.get(f.name, ABSENT)
+        if value is ABSENT:
+            data[f.name] = f.default
+            continue
+        if f.transform:
+            try:
+                value = f.transform(value)
+            except ValueError:
+                value = f.default
+        data[f.name] = value
+    return data
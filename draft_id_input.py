@@ -0,0 +1,112 @@
+import csv
+import io
+import os
+import re
+from collections import Counter, namedtuple
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+DRAFT_ID_RE = re.compile(r"^[0-9a-fA-F]{24}$")  # MoEngage draft IDs are 24-hex-char object IDs
+DRAFT_ID_CHUNK_SIZE = int(os.getenv("DRAFT_ID_CHUNK_SIZE", "200"))  # drafts handed to the extractor at a time
+ID_COLUMN_NAMES = ("draft id", "draft_id", "draftid", "draft ids", "id")  # header that marks the ID column
+SEPARATORS_RE = re.compile(r"[\s,;]+")
+
+# ==========================================
+# PARSING
+# ==========================================
+# IdReport.valid: unique well-formed IDs in first-seen order
+# IdReport.duplicates: {ID: times seen} for IDs given more than once
+# IdReport.invalid: tokens that are not draft IDs, in order, unique
+IdReport = namedtuple("IdReport", ["valid", "duplicates", "invalid"])
+
+
+def split_ids(text):
+    """
+    Tokens of pasted text: IDs may be separated by commas, semicolons, spaces or newlines.
+    """
+    return [t for t in SEPARATORS_RE.split(text or "") if t]
+
+
+def _csv_tokens(text):
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    for name in ID_COLUMN_NAMES:
+        if name in header:
+            column = header.index(name)
+            return [row[column].strip() for row in rows[1:] if len(row) > column and row[column].strip()]
+    # No recognisable header: every cell may hold IDs
+    return [token for row in rows for cell in row for token in split_ids(cell)]
+
+
+def _xlsx_tokens(data):
+    import pandas as pd  # needs openpyxl
+
+    sheet = pd.read_excel(io.BytesIO(data), header=None, dtype=str).fillna("")
+    text = "\n".join(",".join(str(cell) for cell in row) for row in sheet.itertuples(index=False))
+    return _csv_tokens(text)
+
+
+def read_upload(filename, data):
+    """
+    Draft ID tokens of an uploaded file: .csv, .xlsx or plain text (one or more IDs per line).
+    """
+    name = filename.lower()
+    if name.endswith(".xlsx"):
+        return _xlsx_tokens(data)
+    text = data.decode("utf-8-sig", errors="replace")
+    if name.endswith(".csv"):
+        return _csv_tokens(text)
+    return split_ids(text)
+
+
+def clean_ids(tokens):
+    """
+    Validates and dedupes draft ID tokens. Returns an IdReport.
+    """
+    counts = Counter()
+    valid, invalid = [], {}
+    for token in tokens:
+        token = token.strip().strip('"\'')
+        if not token:
+            continue
+        if not DRAFT_ID_RE.match(token):
+            invalid.setdefault(token, None)
+            continue
+        token = token.lower()
+        counts[token] += 1
+        if counts[token] == 1:
+            valid.append(token)
+    duplicates = {draft_id: n for draft_id, n in counts.items() if n > 1}
+    return IdReport(valid, duplicates, list(invalid))
+
+# ==========================================
+# TRANSPORT
+# ==========================================
+# Long ID lists go to the extractors as a file with one ID per line, never through
+# the environment (DRAFT_IDS) or the command line, which have size limits.
+
+def write_id_file(path, draft_ids):
+    with open(path, "w", encoding="utf-8") as f:
+        for draft_id in draft_ids:
+            f.write(draft_id + "\n")
+    return path
+
+
+def read_id_file(path):
+    """
+    IDs of an ID file in order, duplicates and blank lines dropped.
+    """
+    with open(path, encoding="utf-8") as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+
+def chunked(items, size=DRAFT_ID_CHUNK_SIZE):
+    """
+    Yields (offset, chunk) over consecutive slices of at most size items.
+    """
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
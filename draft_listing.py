@@ -0,0 +1,297 @@
+import asyncio
+import fnmatch
+import json
+import math
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import timing
+from dom_snapshot import ABSENT
+from draft_payload import _as_raw, _lookup, _parse_datetime
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Discovery opens the dashboard's SMS campaign list once, catches the listing XHR it makes,
+# then replays that request with the context's cookies page by page instead of scrolling
+# the list. Filters are applied to the listed drafts here, so they work whatever the API supports.
+MOENGAGE_ORIGIN = os.getenv("MOENGAGE_DASHBOARD_URL", "https://dashboard-03.moengage.com").rstrip("/")
+DRAFT_LIST_PAGE_URL = os.getenv("DRAFT_LIST_PAGE_URL", MOENGAGE_ORIGIN + "/v4/#/campaigns?channel=SMS&status=DRAFT")
+# A JSON response whose URL contains this and that holds a list of campaigns is the listing request
+DRAFT_LIST_API_PATTERN = os.getenv("DRAFT_LIST_API_PATTERN", "campaigns")
+DRAFT_LIST_PAGE_SIZE = int(os.getenv("DRAFT_LIST_PAGE_SIZE", "100"))
+DRAFT_LIST_CONCURRENCY = 4  # listing pages fetched at once once the total is known
+DRAFT_LIST_MAX_PAGES = 1000
+DRAFT_LIST_WAIT_MS = 20000
+DRAFT_STATUSES = {"draft", "drafts"}  # listed items with another status are left out
+
+# Candidate dotted paths, first hit wins; override or extend with a JSON file of the same
+# shape in DRAFT_LIST_PATHS_FILE. "items" and "total" are read off the response, the rest off each item.
+LISTING_PATHS = {
+    "items": ["data.campaigns", "data.results", "data.items", "data", "campaigns", "results", "items"],
+    "total": ["data.total", "data.total_count", "data.count", "total", "total_count", "count", "meta.total"],
+    "Draft ID": ["_id", "id", "campaign_id", "draft_id"],
+    "Campaign Name": ["campaign_name", "name", "basic_details.campaign_name"],
+    "Campaign Tags": ["tags", "campaign_tags", "basic_details.tags"],
+    "Created": ["created_at", "created_time", "createdAt", "meta.created_at"],
+    "Status": ["status", "campaign_status", "state"],
+    "Channel": ["channel", "campaign_channel", "platform"],
+}
+PAGE_KEYS = ("page", "page_no", "pageNo", "page_number", "pageNumber")
+OFFSET_KEYS = ("offset", "skip", "start")
+SIZE_KEYS = ("limit", "page_size", "pageSize", "per_page", "size")
+# Request headers that belong to the original request only
+_DROPPED_HEADERS = {"content-length", "cookie", "host", "accept-encoding"}
+
+
+def _load_paths():
+    paths = {name: list(candidates) for name, candidates in LISTING_PATHS.items()}
+    override = os.getenv("DRAFT_LIST_PATHS_FILE", "").strip()
+    if override:
+        with open(override, encoding="utf-8") as f:
+            paths.update(json.load(f))
+    return paths
+
+
+def _first(node, candidates):
+    for path in candidates:
+        value = _lookup(node, path)
+        if value is not ABSENT:
+            return value
+    return ABSENT
+
+
+def _get(node, path):
+    # Unlike _lookup, keeps empty values: an empty list is still a (last or empty) listing page
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+# ==========================================
+# LISTING RESPONSES
+# ==========================================
+def listing_items(body, paths=None):
+    """
+    The campaign dicts of one listing response, or None if it is not a listing.
+    """
+    paths = paths or _load_paths()
+    candidates = [body] if isinstance(body, list) else [_get(body, path) for path in paths["items"]]
+    for items in candidates:
+        if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+            return items
+    return None
+
+
+def listing_total(body, paths=None):
+    paths = paths or _load_paths()
+    total = _first(body, paths["total"])
+    return int(total) if isinstance(total, (int, float)) or str(total).isdigit() else None
+
+
+def listed_draft(item, paths=None):
+    """
+    {"Draft ID", "Campaign Name", "Campaign Tags", "Created", "Status", "Channel"} of one listed campaign.
+    """
+    paths = paths or _load_paths()
+    draft_id = _first(item, paths["Draft ID"])
+    tags = _first(item, paths["Campaign Tags"])
+    created = _first(item, paths["Created"])
+    name, status, channel = (_first(item, paths[k]) for k in ("Campaign Name", "Status", "Channel"))
+    return {
+        "Draft ID": None if draft_id is ABSENT else str(draft_id),
+        "Campaign Name": None if name is ABSENT else str(name),
+        "Campaign Tags": [] if tags is ABSENT else _as_raw(tags, "texts"),
+        "Created": None if created is ABSENT else _parse_datetime(created),
+        "Status": None if status is ABSENT else str(status),
+        "Channel": None if channel is ABSENT else str(channel),
+    }
+
+
+def draft_matches(draft, tag=None, created_from=None, created_to=None, name_pattern=None):
+    """
+    Whether a listed draft is an SMS draft passing the filters. tag matches any of the draft's
+    tags, dates (datetime.date) are inclusive, name_pattern is a case-insensitive glob ("*EMI*").
+    """
+    if not draft["Draft ID"]:
+        return False
+    if draft["Status"] and draft["Status"].lower() not in DRAFT_STATUSES:
+        return False
+    if draft["Channel"] and "sms" not in draft["Channel"].lower():
+        return False
+    if tag and tag.lower() not in (t.lower() for t in draft["Campaign Tags"]):
+        return False
+    if created_from or created_to:
+        if draft["Created"] is None:
+            return False
+        created = draft["Created"].date()
+        if (created_from and created < created_from) or (created_to and created > created_to):
+            return False
+    if name_pattern and not fnmatch.fnmatch((draft["Campaign Name"] or "").lower(), name_pattern.lower()):
+        return False
+    return True
+
+# ==========================================
+# PAGINATION
+# ==========================================
+def _paged_params(params, page, size, first_page):
+    """
+    Sets the page (or offset) and page size in a dict of request parameters, in place.
+    Returns False if it has no page or offset parameter to set.
+    """
+    size_key = next((k for k in SIZE_KEYS if k in params), None)
+    if size_key:
+        params[size_key] = size
+    for key in PAGE_KEYS:
+        if key in params:
+            params[key] = first_page + page
+            return True
+    for key in OFFSET_KEYS:
+        if key in params:
+            params[key] = page * size
+            return True
+    return False
+
+
+class ListingRequest:
+    """
+    The captured listing request, replayed for any page with the context's cookies.
+    """
+    def __init__(self, url, method, headers, post_data):
+        self.url = url
+        self.method = method
+        self.headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        try:
+            self.body = json.loads(post_data) if post_data else None
+        except ValueError:
+            self.body = None
+        self.first_page = self._first_page()
+
+    def _first_page(self):
+        # Listings count pages from 0 or 1; the dashboard asks for its first one
+        query = dict(parse_qsl(urlsplit(self.url).query))
+        for params in (self.body if isinstance(self.body, dict) else {}, query):
+            for key in PAGE_KEYS:
+                if key in params and str(params[key]).isdigit():
+                    return int(params[key])
+        return 1
+
+    def for_page(self, page, size):
+        """
+        (url, body) of one listing page.
+        """
+        body = dict(self.body) if isinstance(self.body, dict) else self.body
+        if isinstance(body, dict) and _paged_params(body, page, size, self.first_page):
+            return self.url, body
+        parts = urlsplit(self.url)
+        query = dict(parse_qsl(parts.query))
+        if not _paged_params(query, page, size, self.first_page):
+            query.update({"page": self.first_page + page, "limit": size})
+        return urlunsplit(parts._replace(query=urlencode(query))), body
+
+    async def fetch(self, api, page, size):
+        url, body = self.for_page(page, size)
+        response = await api.fetch(url, method=self.method, headers=self.headers,
+                                   data=json.dumps(body) if body is not None else None)
+        if not response.ok:
+            raise RuntimeError(f"Draft listing page {page + 1} failed with HTTP {response.status}")
+        return await response.json()
+
+
+class ListingCapture:
+    """
+    Listens on a page for the first campaign-listing JSON response. Attach before navigating.
+    """
+    def __init__(self, page, url_pattern=DRAFT_LIST_API_PATTERN):
+        self.url_pattern = url_pattern
+        self.paths = _load_paths()
+        self._found = asyncio.get_running_loop().create_future()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        request = response.request
+        if (not self._found.done() and request.resource_type in ("xhr", "fetch")
+                and self.url_pattern in response.url and "json" in response.headers.get("content-type", "")):
+            asyncio.ensure_future(self._read(response))
+
+    async def _read(self, response):
+        try:
+            body = await response.json()
+        except Exception:
+            return
+        if listing_items(body, self.paths) is not None and not self._found.done():
+            request = response.request
+            self._found.set_result((ListingRequest(request.url, request.method, request.headers, request.post_data), body))
+
+    async def wait(self, timeout_ms=DRAFT_LIST_WAIT_MS):
+        """
+        Returns (ListingRequest, first response body), or None if no listing arrived in time.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._found), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return None
+
+# ==========================================
+# DISCOVERY
+# ==========================================
+async def list_all(request, api, page_size=DRAFT_LIST_PAGE_SIZE, paths=None):
+    """
+    Every campaign of a listing, in listing order. With a total in the response the remaining
+    pages are fetched DRAFT_LIST_CONCURRENCY at a time; without one, page by page until a short page.
+    """
+    paths = paths or _load_paths()
+    first = await request.fetch(api, 0, page_size)
+    items = listing_items(first, paths) or []
+    # The server may cap the page size below what was asked for
+    size = len(items) or page_size
+    total = listing_total(first, paths)
+    pages = [items]
+    if total is not None and len(items) < total:
+        gate = asyncio.Semaphore(DRAFT_LIST_CONCURRENCY)
+
+        async def fetch(page):
+            async with gate:
+                return listing_items(await request.fetch(api, page, size), paths) or []
+
+        count = min(math.ceil(total / size), DRAFT_LIST_MAX_PAGES)
+        pages += await asyncio.gather(*(fetch(page) for page in range(1, count)))
+    elif total is None:
+        for page in range(1, DRAFT_LIST_MAX_PAGES):
+            if len(pages[-1]) < size:
+                break
+            batch = listing_items(await request.fetch(api, page, size), paths) or []
+            # A listing that ignores the page parameter keeps returning the first page
+            if not batch or batch == pages[0]:
+                break
+            pages.append(batch)
+    return [item for batch in pages for item in batch]
+
+
+async def discover_drafts(context, tag=None, created_from=None, created_to=None, name_pattern=None, page_size=DRAFT_LIST_PAGE_SIZE):
+    """
+    Lists the SMS drafts of the workspace a logged-in context is switched to, filtered
+    (see draft_matches). Returns listed_draft dicts in listing order, one per draft ID.
+    """
+    paths = _load_paths()
+    page = await context.new_page()
+    try:
+        capture = ListingCapture(page)
+        with timing.span("listing_page"):
+            await page.goto(DRAFT_LIST_PAGE_URL, wait_until="domcontentloaded")
+            captured = await capture.wait()
+    finally:
+        await page.close()
+    if captured is None:
+        raise RuntimeError(f"No draft listing request seen on {DRAFT_LIST_PAGE_URL}; "
+                           "check DRAFT_LIST_PAGE_URL and DRAFT_LIST_API_PATTERN")
+    request, _ = captured
+    with timing.span("listing_fetch"):
+        items = await list_all(request, context.request, page_size, paths)
+
+    drafts = {}
+    for item in items:
+        draft = listed_draft(item, paths)
+        if draft_matches(draft, tag, created_from, created_to, name_pattern):
+            drafts.setdefault(draft["Draft ID"], draft)
+    return list(drafts.values())
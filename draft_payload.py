@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from dom_snapshot import ABSENT, resolve_fields
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# A JSON response whose URL contains this and the draft ID is taken as the draft definition
+DRAFT_API_URL_PATTERN = os.getenv("DRAFT_API_URL_PATTERN", "draft")
+# Waited after network quiet, when the draft XHR has normally arrived already; a draft whose
+# XHR never matches falls back to the DOM this much later
+PAYLOAD_WAIT_MS = 500
+# Timestamps in the payload are converted to the zone the dashboard displays them in
+PAYLOAD_TIMEZONE = ZoneInfo(os.getenv("DRAFT_PAYLOAD_TIMEZONE", "Asia/Kolkata"))
+
+# Candidate dotted paths per field (names match the dom_snapshot tables), first hit wins.
+# Override or extend with a JSON file of the same shape in DRAFT_PAYLOAD_PATHS_FILE.
+# Only field-specific keys: a bare "name" or "message" could be any object's.
+PAYLOAD_PATHS = {
+    # Target Users
+    "Campaign Name": ["campaign_name", "basic_details.campaign_name", "basic_details.name"],
+    "User Attribute": ["basic_details.user_attribute", "user_attribute"],
+    "Campaign Tags": ["campaign_tags", "tags", "basic_details.tags", "basic_details.campaign_tags"],
+    "Message Type": ["message_type", "basic_details.message_type"],
+    "Audience Selection": ["segmentation_details.audience_type", "segmentation.type"],
+    "Exclude User": ["segmentation_details.exclude_users", "exclude_users"],
+    "User Opted Out Toggle": ["segmentation_details.send_to_opted_out", "send_to_opted_out_users"],
+    "Audience Limit Toggle": ["segmentation_details.limit_audience", "audience_limit.enabled"],
+    "Control Group Toggle": ["control_group.enabled", "segmentation_details.control_group"],
+    # Content
+    "SMS Sender": ["content.sender_name", "content.connector_name", "sms.sender", "connector.name"],
+    "Template ID": ["content.template_id", "sms.template_id", "template_id"],
+    "Message Body": ["content.message", "sms.message"],
+    # Schedule and Goals
+    "Send Campaign Type": ["scheduling_details.delivery_type", "schedule.type", "delivery_type"],
+    "Scheduled Datetime": ["scheduling_details.start_time", "schedule.start_time"],
+    "Conversion Goals": ["conversion_goals.0.name", "conversion_goal.name"],
+    "Frequency Cap Toggle": ["delivery_controls.frequency_capping", "frequency_capping.enabled"],
+    "Request Limit": ["delivery_controls.throttle_rpm", "request_limit", "throttle.rpm"],
+    # Change detection for the result cache
+    "Last Modified": ["updated_at", "last_updated_time", "modified_at", "meta.updated_at"],
+}
+
+# API enum values -> the labels the form shows, per field (keys lower-cased). Values not listed
+# that look like identifiers ("CUSTOM_SEGMENT") become words ("Custom Segment").
+PAYLOAD_LABELS = {
+    "Message Type": {"promotional": "Promotional", "transactional": "Transactional"},
+    "Audience Selection": {
+        "all": "All Users",
+        "all_users": "All Users",
+        "allusers": "All Users",
+        "custom_segment": "Custom Segment",
+        "segment": "Custom Segment",
+    },
+}
+# Fields of the section on screen after navigation that are also read from the page (same
+# snapshot, no click) and compared; on a mismatch the page value is used and reported
+CROSS_CHECK_FIELDS = ("Message Type", "Audience Selection")
+
+_SEND_TYPE_IDS = {
+    "asap": "asap",
+    "as_soon_as_possible": "asap",
+    "specificdatetime": "specificDateTime",
+    "specific_date_time": "specificDateTime",
+    "at_fixed_time": "specificDateTime",
+    "scheduled": "specificDateTime",
+}
+
+
+def _load_paths():
+    paths = {name: list(candidates) for name, candidates in PAYLOAD_PATHS.items()}
+    override = os.getenv("DRAFT_PAYLOAD_PATHS_FILE", "").strip()
+    if override:
+        with open(override, encoding="utf-8") as f:
+            paths.update(json.load(f))
+    return paths
+
+# ==========================================
+# PAYLOAD LOOKUP
+# ==========================================
+def _lookup(payload, path):
+    node = payload
+    for part in path.split("."):
+        if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            return ABSENT
+    return ABSENT if node in (None, "", []) else node
+
+
+def _as_raw(value, kind):
+    """
+    Converts a JSON value into the raw form the DOM snapshot would have produced for this kind.
+    """
+    if kind == "texts":
+        items = value if isinstance(value, list) else [value]
+        return [str(i.get("name", i)) if isinstance(i, dict) else str(i) for i in items]
+    if kind == "checked":
+        return bool(value)
+    if kind.startswith("attr:aria-"):
+        return "true" if value in (True, "true", 1) else "false"
+    if isinstance(value, dict):
+        value = value.get("name", value.get("value", ABSENT))
+    return ABSENT if value is ABSENT else str(value)
+
+
+def _label(name, value):
+    labels = PAYLOAD_LABELS.get(name)
+    if labels is None or not isinstance(value, str):
+        return value
+    if value.lower() in labels:
+        return labels[value.lower()]
+    if re.fullmatch(r"[a-z]+(_[a-z]+)+|[A-Z]+(_[A-Z]+)*", value):
+        return value.replace("_", " ").title()
+    return value
+
+
+def _parse_datetime(value):
+    if isinstance(value, (int, float)):
+        # Epoch seconds or milliseconds
+        dt = datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc)
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(PAYLOAD_TIMEZONE)
+    return dt.replace(tzinfo=None)
+
+
+def payload_values(payload, fields, paths=None):
+    """
+    Reads a dom_snapshot field table out of the draft payload.
+    Returns {name: raw value or ABSENT}, ready for resolve_fields; ABSENT fields need the DOM.
+    """
+    paths = paths or _load_paths()
+    values = {}
+    for f in fields:
+        value = ABSENT
+        for path in paths.get(f.name, []):
+            value = _lookup(payload, path)
+            if value is not ABSENT:
+                break
+        values[f.name] = ABSENT if value is ABSENT else _label(f.name, _as_raw(value, f.kind))
+
+    names = {f.name for f in fields}
+    if "Send Campaign Type" in names and values["Send Campaign Type"] is not ABSENT:
+        sid = values["Send Campaign Type"]
+        values["Send Campaign Type"] = _SEND_TYPE_IDS.get(sid.lower(), sid)
+
+    # The payload carries one timestamp where the form has date, hour, minute and AM/PM inputs
+    if {"Start Date", "Hours", "Minutes", "AM/PM"} <= names:
+        for path in paths.get("Scheduled Datetime", []):
+            dt = _lookup(payload, path)
+            dt = None if dt is ABSENT else _parse_datetime(dt)
+            if dt:
+                values["Start Date"] = dt.strftime("%d %b %Y")
+                values["Hours"] = dt.strftime("%I")
+                values["Minutes"] = dt.strftime("%M")
+                values["AM/PM"] = dt.strftime("%p")
+                break
+    return values
+
+
+def payload_version(payload, paths=None):
+    """
+    The draft's last-modified marker from the payload, or None when it has none.
+    """
+    paths = paths or _load_paths()
+    for path in paths.get("Last Modified", []):
+        value = _lookup(payload, path)
+        if value is not ABSENT:
+            return str(value)
+    return None
+
+# ==========================================
+# CROSS-CHECK
+# ==========================================
+class PayloadReport:
+    """
+    Per run: how often the page contradicted a cross-checked payload value, per field.
+    A field that shows up here needs its PAYLOAD_PATHS or PAYLOAD_LABELS entry fixed.
+    """
+    def __init__(self):
+        self.mismatches = Counter()
+
+    def reset(self):
+        self.mismatches.clear()
+
+    def lines(self):
+        if not self.mismatches:
+            return []
+        counts = ", ".join(f"{name}: {n}" for name, n in self.mismatches.most_common())
+        return [f"Payload values replaced by the page (drafts): {counts}"]
+
+
+payload_report = PayloadReport()
+
+
+def cross_checked(snapshot, page_values, fields):
+    """
+    Compares payload values in snapshot with the page's for fields (after each field's
+    transform). Returns {name: page value} for the fields where they disagree.
+    """
+    replaced = {}
+    for f in fields:
+        page_value = page_values.get(f.name, ABSENT)
+        if page_value is ABSENT:
+            continue
+        payload_resolved = resolve_fields({f.name: snapshot[f.name]}, [f])[f.name]
+        if resolve_fields({f.name: page_value}, [f])[f.name] != payload_resolved:
+            payload_report.mismatches[f.name] += 1
+            replaced[f.name] = page_value
+    return replaced
+
+# ==========================================
+# CAPTURE
+# ==========================================
+class DraftPayloadCapture:
+    """
+    Listens on a page for the draft-detail JSON response. Attach before navigating.
+    """
+    def __init__(self, page, draft_id, url_pattern=DRAFT_API_URL_PATTERN):
+        self.draft_id = draft_id
+        self.url_pattern = url_pattern
+        self._found = asyncio.get_running_loop().create_future()
+        page.on("response", self._on_response)
+
+    def _matches(self, response):
+        request = response.request
+        return (
+            request.resource_type in ("xhr", "fetch")
+            and self.draft_id in response.url
+            and self.url_pattern in response.url
+            and "json" in response.headers.get("content-type", "")
+        )
+
+    def _on_response(self, response):
+        if not self._found.done() and self._matches(response):
+            asyncio.ensure_future(self._read(response))
+
+    async def _read(self, response):
+        try:
+            body = await response.json()
+        except Exception:
+            return
+        # Some endpoints wrap the draft in {"data": {...}}
+        if isinstance(body, dict) and isinstance(body.get("data"), dict):
+            body = body["data"]
+        if isinstance(body, dict) and not self._found.done():
+            self._found.set_result(body)
+
+    async def wait(self, timeout_ms=PAYLOAD_WAIT_MS):
+        """
+        Returns the parsed payload, or None if it did not arrive in time.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._found), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return None
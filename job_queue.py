@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from progress import ProgressEmitter
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "jobs.sqlite")
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "job_results")
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+ACTIVE_STATES = ("queued", "running")
+FINAL_STATES = ("done", "failed", "cancelled", "interrupted")
+
+# ==========================================
+# JOB QUEUE
+# ==========================================
+# One row per extraction job, shared by the extraction worker (which claims and runs jobs)
+# and the app (which submits through the worker and polls here). Credentials are never
+# stored: the worker keeps them in memory only, so jobs left queued or running by a worker
+# that died are marked "interrupted" and can be resumed from their run journal (run ID = job ID).
+
+
+def job_output_path(job_id, filename):
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    return os.path.abspath(os.path.join(JOB_OUTPUT_DIR, f"{job_id}_{filename}"))
+
+
+class JobQueue:
+    def __init__(self, path=JOB_QUEUE_DB):
+        # Several processes use the file; wait for each other's writes instead of failing
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id       TEXT PRIMARY KEY,
+                account      TEXT NOT NULL,
+                status       TEXT NOT NULL,
+                spec_json    TEXT NOT NULL,
+                total        INTEGER,
+                finished     INTEGER NOT NULL DEFAULT 0,
+                failed       INTEGER NOT NULL DEFAULT 0,
+                rows         INTEGER,
+                outputs_json TEXT,
+                timing_json  TEXT,
+                error        TEXT,
+                submitted_at REAL NOT NULL,
+                started_at   REAL,
+                finished_at  REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, submitted_at)")
+
+    def submit(self, spec, job_id=None):
+        """
+        Queues a job spec (without credentials). Returns the job ID.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        self.db.execute(
+            "INSERT INTO jobs (job_id, account, status, spec_json, submitted_at) VALUES (?, ?, 'queued', ?, ?)",
+            [job_id, spec.get("email", "").strip().lower(), json.dumps(spec), time.time()]
+        )
+        return job_id
+
+    def claim(self):
+        """
+        Marks the oldest queued job as running and returns (job_id, spec), or None.
+        """
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT job_id, spec_json FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT 1"
+            ).fetchone()
+            if row:
+                self.db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+                                [time.time(), row["job_id"]])
+        finally:
+            self.db.execute("COMMIT")
+        return (row["job_id"], json.loads(row["spec_json"])) if row else None
+
+    def update(self, job_id, **fields):
+        for name in ("outputs", "timing"):
+            if name in fields:
+                fields[f"{name}_json"] = json.dumps(fields.pop(name))
+        if fields.get("status") in FINAL_STATES:
+            fields["finished_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self.db.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id])
+
+    def count_progress(self, job_id, ok):
+        self.db.execute(
+            "UPDATE jobs SET finished = finished + 1, failed = failed + ? WHERE job_id = ?", [0 if ok else 1, job_id]
+        )
+
+    def cancel_queued(self, job_id):
+        """
+        Cancels a job that has not started yet. Returns True if it was still queued.
+        """
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued'",
+            [time.time(), job_id]
+        )
+        return cursor.rowcount > 0
+
+    def interrupt_active(self, reason="The extraction worker restarted; resume the run to continue."):
+        """
+        Marks jobs left queued or running by a previous worker as interrupted. Returns how many.
+        """
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'interrupted', error = ?, finished_at = ? WHERE status IN ('queued', 'running')",
+            [reason, time.time()]
+        )
+        return cursor.rowcount
+
+    def queued_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def position(self, job_id):
+        """
+        1-based place of a queued job in the queue, or None.
+        """
+        row = self.db.execute("SELECT submitted_at FROM jobs WHERE job_id = ? AND status = 'queued'", [job_id]).fetchone()
+        if row is None:
+            return None
+        return self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND submitted_at <= ?", [row["submitted_at"]]
+        ).fetchone()[0]
+
+    def get(self, job_id):
+        row = self.db.execute("SELECT * FROM jobs WHERE job_id = ?", [job_id]).fetchone()
+        return self._job(row) if row else None
+
+    def list(self, job_ids=None, account=None, limit=20):
+        """
+        Newest first; by job IDs, by account, or all.
+        """
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            if not job_ids:
+                return []
+            where, params = f"job_id IN ({','.join('?' * len(job_ids))})", job_ids
+        elif account is not None:
+            where, params = "account = ?", [account.strip().lower()]
+        else:
+            where, params = "1 = 1", []
+        rows = self.db.execute(
+            f"SELECT * FROM jobs WHERE {where} ORDER BY submitted_at DESC LIMIT ?", [*params, limit]
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def purge(self, retention_hours=JOB_RETENTION_HOURS):
+        """
+        Drops finished jobs older than the retention window, with their output files.
+        """
+        cutoff = time.time() - retention_hours * 3600
+        rows = self.db.execute(
+            f"SELECT job_id, outputs_json FROM jobs WHERE status IN ({','.join('?' * len(FINAL_STATES))}) "
+            f"AND finished_at < ?", [*FINAL_STATES, cutoff]
+        ).fetchall()
+        for row in rows:
+            for path in json.loads(row["outputs_json"] or "{}").values():
+                if os.path.exists(path):
+                    os.remove(path)
+            self.db.execute("DELETE FROM jobs WHERE job_id = ?", [row["job_id"]])
+        return len(rows)
+
+    def _job(self, row):
+        job = dict(row)
+        job["spec"] = json.loads(job.pop("spec_json"))
+        job["outputs"] = json.loads(job.pop("outputs_json") or "{}")
+        job["timing"] = json.loads(job.pop("timing_json") or "null")
+        return job
+
+    def close(self):
+        self.db.close()
+
+
+class JobEmitter(ProgressEmitter):
+    """
+    Progress events of a queued job update its row instead of going to a client connection.
+    """
+    def __init__(self, queue, job_id):
+        super().__init__()
+        self.queue = queue
+        self.job_id = job_id
+
+    def emit(self, event, **fields):
+        if event == "start":
+            self.queue.update(self.job_id, total=fields["total"])
+        elif event == "draft":
+            self.queue.count_progress(self.job_id, fields["status"] == "ok")
+        elif event == "timing":
+            self.queue.update(self.job_id, timing=fields)
+        elif event == "done":
+            self.queue.update(self.job_id, status="done", rows=fields["rows"], outputs=fields["outputs"])
+        elif event == "error":
+            self.queue.update(self.job_id, status="failed", error=fields["message"])
+        elif event == "cancelled":
+            self.queue.update(self.job_id, status="cancelled")
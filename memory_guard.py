@@ -0,0 +1,127 @@
+import os
+from collections import defaultdict
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Long runs recycle the browser context (Playwright) or the driver (Selenium) so the dashboard
+# SPA's heap and Chromium's caches cannot grow without bound. The session is carried over,
+# so recycling never needs a new login or OTP. 0 disables either trigger.
+RECYCLE_EVERY_DRAFTS = int(os.getenv("RECYCLE_EVERY_DRAFTS", "100"))
+RECYCLE_RSS_MB = int(os.getenv("RECYCLE_RSS_MB", "1024"))  # Python + driver + browser processes
+RECYCLE_MIN_DRAFTS = 10  # after a recycle, drafts to do before the RSS threshold can trigger again
+
+# ==========================================
+# MEMORY SAMPLING (Linux /proc)
+# ==========================================
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def processes():
+    """
+    {pid: (ppid, rss bytes, command)} for every readable process.
+    """
+    procs = {}
+    if not os.path.isdir("/proc"):
+        return procs
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{entry}/statm") as f:
+                rss = int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+        # comm is in parentheses and may contain spaces
+        comm = stat[stat.index("(") + 1:stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        procs[int(entry)] = (ppid, rss, comm)
+    return procs
+
+
+def process_tree(root, procs):
+    """
+    PIDs of root and all its descendants.
+    """
+    children = {}
+    for pid, (ppid, _, _) in procs.items():
+        children.setdefault(ppid, []).append(pid)
+    tree, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return [pid for pid in tree if pid in procs]
+
+# ==========================================
+# GUARD
+# ==========================================
+class MemoryGuard:
+    """
+    Tracks the RSS of this process and everything it started (driver, browser), keeps the
+    peaks for the run report and decides when a context or driver is due for recycling.
+    Counters are kept per key, so workspaces extracted side by side recycle independently.
+    """
+    def __init__(self, every=RECYCLE_EVERY_DRAFTS, rss_mb=RECYCLE_RSS_MB):
+        self.every = every
+        self.rss_mb = rss_mb
+        self.since_recycle = defaultdict(int)
+        self.recycles = defaultdict(int)
+        self.peak_mb = 0.0
+        self.peak_python_mb = 0.0
+        self.peak_browser_mb = 0.0
+        self.last_mb = 0.0
+
+    def sample(self):
+        """
+        Current RSS of the whole process tree in MB; updates the peaks.
+        """
+        procs = processes()
+        pid = os.getpid()
+        if pid not in procs:
+            return 0.0
+        tree = process_tree(pid, procs)
+        total = sum(procs[p][1] for p in tree) / 2 ** 20
+        python = procs[pid][1] / 2 ** 20
+        self.last_mb = total
+        self.peak_mb = max(self.peak_mb, total)
+        self.peak_python_mb = max(self.peak_python_mb, python)
+        self.peak_browser_mb = max(self.peak_browser_mb, total - python)
+        return total
+
+    def draft_done(self, key=None):
+        self.since_recycle[key] += 1
+
+    def due(self, key=None):
+        """
+        Why the context or driver for key should be recycled now, or None.
+        """
+        done = self.since_recycle[key]
+        if self.every and done >= self.every:
+            return f"{done} drafts since the last restart"
+        rss = self.sample()
+        if self.rss_mb and done >= RECYCLE_MIN_DRAFTS and rss >= self.rss_mb:
+            return f"RSS {rss:.0f} MB over the {self.rss_mb} MB limit"
+        return None
+
+    def recycled(self, key=None, reason=""):
+        self.since_recycle[key] = 0
+        self.recycles[key] += 1
+        label = f" ({key})" if key else ""
+        print(f" Recycled the browser session{label}: {reason}")
+
+    def summary(self):
+        self.sample()
+        return {
+            "peak_rss_mb": round(self.peak_mb, 1),
+            "peak_python_rss_mb": round(self.peak_python_mb, 1),
+            "peak_browser_rss_mb": round(self.peak_browser_mb, 1),
+            "recycles": sum(self.recycles.values()),
+        }
+
+    def lines(self):
+        s = self.summary()
+        return [f"Peak memory: {s['peak_rss_mb']:.0f} MB total ({s['peak_python_rss_mb']:.0f} MB Python, "
+                f"{s['peak_browser_rss_mb']:.0f} MB driver/browser), {s['recycles']} recycle(s)"]
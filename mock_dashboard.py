@@ -0,0 +1,381 @@
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from zoneinfo import ZoneInfo
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Local stand-in for the MoEngage dashboard: the login/2FA pages, the workspace dropdown,
+# the SMS campaign listing and the SMS draft editor, with the DOM both extractors expect. Point them at it with
+# MOENGAGE_DASHBOARD_URL=http://127.0.0.1:<port>. Used by benchmark.py.
+MOCK_DEFAULTS = {
+    "latency_ms": 300,          # draft API response delay
+    "latency_jitter_ms": 100,   # +/- uniform jitter on the draft API delay
+    "page_latency_ms": 50,      # delay before the dashboard HTML is served
+    "step_latency_ms": 150,     # step click -> section rendered (only with lazy_steps)
+    "lazy_steps": False,        # render Content/Schedule only after their step is clicked, like the real editor
+    "twofa": True,              # ask for an OTP after the password
+    "missing_fields": [],       # field names never rendered (e.g. "Template ID")
+    "missing_rate": 0.0,        # share of drafts that also lose one random field
+    "listed_drafts": 250,       # SMS drafts in the campaign listing (draft_listing.py)
+    "list_page_cap": 50,        # most campaigns the listing API returns per page, whatever the limit asked
+    "workspaces": ["Collections_TC", "Tata Capital", "TataCapital_UAT", "Services_TC", "Wealth_TC", "Moneyfy"],
+}
+DISPLAY_TIMEZONE = ZoneInfo("Asia/Kolkata")
+SESSION_COOKIE = "mock_session"
+
+# Fields the editor can drop; names match the dom_snapshot tables
+OPTIONAL_FIELDS = [
+    "Campaign Name", "User Attribute", "Campaign Tags", "Audience Selection",
+    "SMS Sender", "Template ID", "Message Body", "Conversion Goals", "Request Limit",
+]
+
+# ==========================================
+# SYNTHETIC DRAFTS
+# ==========================================
+def synthetic_draft(draft_id, config):
+    """
+    Deterministic draft payload for an ID, shaped like the draft-detail JSON draft_payload.py reads.
+    "_mock" carries what the page needs to render it: missing fields and display date/time.
+    """
+    rng = random.Random(draft_id)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=rng.randint(0, 90), minutes=15 * rng.randint(0, 95))
+    local = start.astimezone(DISPLAY_TIMEZONE)
+    link = "https://tcl.example/o/" + draft_id[-6:] if rng.random() > 0.1 else "www.tcl.example"
+    missing = list(config["missing_fields"])
+    if rng.random() < config["missing_rate"]:
+        missing.append(rng.choice(OPTIONAL_FIELDS))
+
+    draft = {
+        "_id": draft_id,
+        "campaign_name": f"Bench campaign {draft_id[-6:]}",
+        "basic_details": {"user_attribute": rng.choice(["Mobile Number", "Alternate Mobile", "Registered Mobile"])},
+        "tags": rng.sample(["collections", "reminder", "emi", "bounce", "pre-due"], rng.randint(1, 3)),
+        # Enums as API identifiers; the page shows them as labels (see draft_payload.PAYLOAD_LABELS)
+        "message_type": rng.choice(["PROMOTIONAL", "TRANSACTIONAL"]),
+        "segmentation_details": {
+            "audience_type": rng.choice(["CUSTOM_SEGMENT", "CUSTOM_SEGMENT", "ALL_USERS"]),
+            "exclude_users": rng.random() < 0.3,
+            "send_to_opted_out": rng.random() < 0.2,
+            "limit_audience": rng.random() < 0.2,
+        },
+        "control_group": {"enabled": rng.random() < 0.5},
+        "content": {
+            "sender_name": rng.choice(["TATACP", "TCLSMS", "TCHFIN"]),
+            "template_id": str(rng.randint(10 ** 18, 10 ** 19 - 1)),
+            "message": f"Dear customer, your EMI is due. Pay now: {link} -Tata Capital",
+        },
+        "scheduling_details": {
+            "delivery_type": rng.choice(["asap", "specific_date_time", "specific_date_time"]),
+            "start_time": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+        "conversion_goals": [{"name": rng.choice(["Payment Done", "App Open", "Link Click"])}],
+        "delivery_controls": {"frequency_capping": rng.random() < 0.5, "throttle_rpm": rng.choice([500, 1000, 5000])},
+        "updated_at": (start - timedelta(days=3)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "_mock": {
+            "missing": missing,
+            "date": local.strftime("%d %b %Y"),
+            "hours": local.strftime("%I"),
+            "minutes": local.strftime("%M"),
+            "ampm": local.strftime("%p"),
+        },
+    }
+    # What the page does not show, the API does not return either
+    for name, (section, key) in {
+        "Campaign Name": (None, "campaign_name"),
+        "SMS Sender": ("content", "sender_name"),
+        "Template ID": ("content", "template_id"),
+        "Message Body": ("content", "message"),
+        "Request Limit": ("delivery_controls", "throttle_rpm"),
+    }.items():
+        if name in missing:
+            (draft[section] if section else draft).pop(key, None)
+    return draft
+
+def listed_draft_ids(config):
+    """
+    IDs of the drafts in the mock campaign listing: 24-hex, deterministic.
+    """
+    return [f"{0x650000000000000000000000 + i:024x}" for i in range(config["listed_drafts"])]
+
+
+def listing_page(page, limit, config):
+    """
+    One page (1-based) of the campaign-listing JSON, shaped like what draft_listing.py reads.
+    """
+    size = max(1, min(limit, config["list_page_cap"]))
+    ids = listed_draft_ids(config)
+    campaigns = []
+    for draft_id in ids[(page - 1) * size:page * size]:
+        draft = synthetic_draft(draft_id, config)
+        campaigns.append({
+            "_id": draft_id,
+            "campaign_name": draft.get("campaign_name", ""),
+            "tags": draft["tags"],
+            "created_at": draft["updated_at"],
+            "status": "DRAFT",
+            "channel": "SMS",
+        })
+    return {"data": {"campaigns": campaigns, "total": len(ids)}}
+
+# ==========================================
+# DASHBOARD PAGE
+# ==========================================
+WORKSPACE_DROPDOWN_CLASS = (
+    "ignore-lang tether-target tether-enabled tether-element-attached-top tether-element-attached-right "
+    "tether-target-attached-bottom tether-target-attached-right tether-out-of-bounds tether-out-of-bounds-left "
+    "tether-out-of-bounds-top"
+)
+
+DASHBOARD_HTML = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>Mock MoEngage Dashboard</title></head>
+<body>
+<div id="app"></div>
+<script>
+const CONFIG = __CONFIG__;
+const app = document.getElementById("app");
+const esc = (s) => String(s).replace(/[&<>"']/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c]));
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+const loggedIn = () => document.cookie.split("; ").some(c => c.startsWith("__COOKIE__="));
+const header = `<div class="mds-header"><div class="mds-header__user-profile">QA</div>
+  <div class="__DROPDOWN__" id="workspace-dropdown">Workspace</div></div>
+  <div id="workspace-menu" hidden>${CONFIG.workspaces.map(w => `<div class="workspace-option">${esc(w)}</div>`).join("")}</div>`;
+
+function route() {
+  if (!loggedIn()) return renderLogin();
+  const hash = location.hash || "";
+  if (hash.startsWith("#/sms/create")) {
+    return renderEditor(new URLSearchParams(hash.split("?")[1] || "").get("draftId"));
+  }
+  if (hash.startsWith("#/campaigns")) return renderCampaignList();
+  renderDashboard();
+}
+
+function renderLogin() {
+  app.innerHTML = `<form id="login-form"><input id="email" type="email" placeholder="Email">
+    <input id="password" type="password" placeholder="Password"><button type="submit">Log in</button></form>`;
+  document.getElementById("login-form").addEventListener("submit", async (e) => {
+    e.preventDefault();
+    const res = await fetch("/api/login", {method: "POST", body: JSON.stringify({email: document.getElementById("email").value})});
+    (await res.json()).twofa ? renderTwoFactor() : route();
+  });
+}
+
+function renderTwoFactor() {
+  app.innerHTML = `<div id="passCodeInput">${[0, 1, 2, 3, 4, 5].map(i => `<input id="${i}" maxlength="1">`).join("")}</div>
+    <input id="otp_code" maxlength="6" placeholder="OTP"><button class="twofa-action-btn">Verify</button>`;
+  const verify = async () => { await fetch("/api/verify", {method: "POST"}); route(); };
+  app.querySelector(".twofa-action-btn").addEventListener("click", verify);
+  document.getElementById("otp_code").addEventListener("keydown", (e) => { if (e.key === "Enter") verify(); });
+}
+
+function renderDashboard() {
+  app.innerHTML = header + `<div class="dashboard-home">Campaigns</div>`;
+  wireWorkspaceMenu();
+}
+
+async function renderCampaignList() {
+  app.innerHTML = header + `<div class="loading">Loading campaigns...</div>`;
+  const res = await fetch("/v4/api/campaigns?page=1&limit=20&channel=SMS&status=DRAFT");
+  const campaigns = (await res.json()).data.campaigns;
+  app.innerHTML = header + `<div class="campaign-list">${campaigns.map(c => `<div class="campaign-row">${esc(c.campaign_name)}</div>`).join("")}</div>`;
+  wireWorkspaceMenu();
+}
+
+function wireWorkspaceMenu() {
+  const menu = document.getElementById("workspace-menu");
+  document.getElementById("workspace-dropdown").addEventListener("click", () => { menu.hidden = false; });
+  menu.querySelectorAll(".workspace-option").forEach(option => option.addEventListener("click", () => {
+    menu.hidden = true;
+    const modal = document.createElement("div");
+    modal.className = "mds-modal";
+    modal.innerHTML = `<button>Change Workspace</button>`;
+    modal.querySelector("button").addEventListener("click", () => modal.remove());
+    document.body.appendChild(modal);
+  }));
+}
+
+const sw = (on, attrs) => `<span role="switch" aria-checked="${on ? "true" : "false"}" ${attrs || ""}></span>`;
+const radio = (name, label, checked, id) => `<label><input type="radio" name="${name}" ${id ? `id="${id}"` : ""} ${checked ? "checked" : ""}> ${esc(label)}</label>`;
+
+function targetSection(d, has) {
+  const seg = d.segmentation_details;
+  return `<div class="target-step">
+    <div class="mds-segmentation__section mds-segmentation__header">
+      ${has("Audience Selection") ? radio("audience", "All Users", seg.audience_type === "ALL_USERS") + radio("audience", "Custom Segment", seg.audience_type !== "ALL_USERS") : ""}
+    </div>
+    ${has("Campaign Name") ? `<input placeholder="Campaign Name" value="${esc(d.campaign_name)}">` : ""}
+    ${has("User Attribute") ? `<div class="mds-dropdown"><span class="mds-dropdown__trigger__inner__single--value">${esc(d.basic_details.user_attribute)}</span></div>` : ""}
+    ${has("Campaign Tags") ? d.tags.map(t => `<div class="mds-input__input--tags__list--item"><span>${esc(t)}</span><span>x</span></div>`).join("") : ""}
+    <div class="dashboard-ui-103k3sf e441wj90">${radio("messageType", "Promotional", d.message_type === "PROMOTIONAL")}${radio("messageType", "Transactional", d.message_type === "TRANSACTIONAL")}</div>
+    <input type="checkbox" id="exclude-user" ${seg.exclude_users ? "checked" : ""}>
+    <div class="mds-preferenceManagement">${sw(seg.send_to_opted_out)}</div>
+    ${sw(seg.limit_audience, 'aria-labelledby="Limit the number of users who will receive the campaign."')}
+    ${sw(d.control_group.enabled, 'aria-labelledby="Campaign control group"')}
+  </div>`;
+}
+
+function contentSection(d, has) {
+  return `<div class="content-step">
+    ${has("SMS Sender") ? `<div placeholder="Select a connector"><span class="mds-dropdown__trigger__inner__single--value">${esc(d.content.sender_name)}</span></div>` : ""}
+    ${has("Template ID") ? `<input id="template_id" value="${esc(d.content.template_id)}">` : ""}
+    ${has("Message Body") ? `<div id="personalization_container">${esc(d.content.message)}</div>` : ""}
+  </div>`;
+}
+
+function scheduleSection(d, has) {
+  const m = d._mock, asap = d.scheduling_details.delivery_type === "asap";
+  return `<div class="schedule-step">
+    ${radio("gCampaignType", "As soon as possible", asap, "asap")}${radio("gCampaignType", "At specific date and time", !asap, "specificDateTime")}
+    <div class="mds-csc__sch__body__section">${radio("startType", "Send in user's time zone", false)}${radio("startType", "Send in account time zone", true)}</div>
+    <input placeholder="Select date" value="${m.date}">
+    <div class="mds-timepicker__col"><input type="number" value="${m.hours}"></div>
+    <div class="mds-timepicker__col"><input type="number" value="${m.minutes}"></div>
+    <div class="mds-button-group"><button class="mds-button ${m.ampm === "AM" ? "mds-button--primary" : ""}">AM</button><button class="mds-button ${m.ampm === "PM" ? "mds-button--primary" : ""}">PM</button></div>
+    ${has("Conversion Goals") ? `<div class="mds-cg"><div class="mds-cg__section">${esc(d.conversion_goals[0].name)}</div></div>` : ""}
+    <div><input type="hidden" name="Frequency capping">${sw(d.delivery_controls.frequency_capping)}</div>
+    ${has("Request Limit") ? `<input placeholder="Requests per/min..." value="${d.delivery_controls.throttle_rpm}">` : ""}
+  </div>`;
+}
+
+const STEPS = [["Target users", null], ["Content", contentSection], ["Schedule and goals", scheduleSection]];
+
+async function renderEditor(draftId) {
+  app.innerHTML = header + `<div class="loading">Loading draft...</div>`;
+  const res = await fetch(`/v4/api/draft/${encodeURIComponent(draftId)}`);
+  if (!location.hash.includes(draftId)) return;  // navigated to another draft meanwhile
+  if (!res.ok) { app.innerHTML = header + `<div class="error">Draft not found</div>`; return; }
+  const d = (await res.json()).data;
+  const has = (name) => !d._mock.missing.includes(name);
+  const steps = STEPS.map(([title]) => `<div class="mds-steps__item"><div>${title}</div><div role="button" tabindex="0"></div></div>`).join("");
+  app.innerHTML = header + `<div class="mds-steps">${steps}</div>` + targetSection(d, has)
+    + (CONFIG.lazy_steps ? "" : contentSection(d, has) + scheduleSection(d, has));
+  wireWorkspaceMenu();
+  app.querySelectorAll(".mds-steps__item").forEach((item, i) => item.querySelector("[role=button]").addEventListener("click", async () => {
+    const render = STEPS[i][1];
+    if (!CONFIG.lazy_steps || !render || item.dataset.rendered) return;
+    item.dataset.rendered = "1";
+    await sleep(CONFIG.step_latency_ms);
+    app.insertAdjacentHTML("beforeend", render(d, has));
+  }));
+}
+
+window.addEventListener("hashchange", route);
+route();
+</script>
+</body>
+</html>
+"""
+
+# ==========================================
+# SERVER
+# ==========================================
+class MockDashboardHandler(BaseHTTPRequestHandler):
+    config = MOCK_DEFAULTS
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload, headers=None):
+        self._send(200, json.dumps(payload), "application/json", headers)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/v4/api/campaigns":
+            params = dict(parse_qsl(query))
+            time.sleep(self.config["latency_ms"] / 1000)
+            self._json(listing_page(int(params.get("page", 1)), int(params.get("limit", 20)), self.config))
+        elif path.startswith("/v4/api/draft/"):
+            draft_id = path.rsplit("/", 1)[-1]
+            jitter = random.uniform(-1, 1) * self.config["latency_jitter_ms"]
+            time.sleep(max(0, self.config["latency_ms"] + jitter) / 1000)
+            self._json({"data": synthetic_draft(draft_id, self.config)})
+        elif path == "/favicon.ico":
+            self._send(404, "", "text/plain")
+        else:
+            # Every other path is the single-page dashboard; it routes on the URL hash
+            time.sleep(self.config["page_latency_ms"] / 1000)
+            config = {k: self.config[k] for k in ("lazy_steps", "step_latency_ms", "workspaces")}
+            html = (DASHBOARD_HTML.replace("__CONFIG__", json.dumps(config))
+                    .replace("__COOKIE__", SESSION_COOKIE)
+                    .replace("__DROPDOWN__", WORKSPACE_DROPDOWN_CLASS))
+            self._send(200, html, "text/html; charset=utf-8")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        session = {"Set-Cookie": f"{SESSION_COOKIE}=1; Path=/"}
+        if self.path == "/api/login":
+            twofa = self.config["twofa"]
+            self._json({"twofa": twofa}, None if twofa else session)
+        elif self.path == "/api/verify":
+            self._json({"ok": True}, session)
+        else:
+            self._send(404, "", "text/plain")
+
+
+def start_server(port=0, **overrides):
+    """
+    Serves the mock dashboard on 127.0.0.1 in a background thread.
+    Returns (server, base URL); stop it with server.shutdown().
+    """
+    config = dict(MOCK_DEFAULTS, **overrides)
+    handler = type("ConfiguredMockDashboardHandler", (MockDashboardHandler,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_scenario_arguments(parser):
+    parser.add_argument("--latency-ms", type=int, default=MOCK_DEFAULTS["latency_ms"], help="Draft API delay (default: %(default)s)")
+    parser.add_argument("--latency-jitter-ms", type=int, default=MOCK_DEFAULTS["latency_jitter_ms"])
+    parser.add_argument("--page-latency-ms", type=int, default=MOCK_DEFAULTS["page_latency_ms"])
+    parser.add_argument("--step-latency-ms", type=int, default=MOCK_DEFAULTS["step_latency_ms"])
+    parser.add_argument("--lazy-steps", action="store_true", help="Render Content/Schedule only after their step is clicked")
+    parser.add_argument("--no-2fa", dest="twofa", action="store_false", help="Log in without an OTP prompt")
+    parser.add_argument("--missing-fields", default="", help=f"Comma-separated fields never rendered, from: {', '.join(OPTIONAL_FIELDS)}")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Share of drafts missing one random field")
+
+
+def scenario_from_args(args):
+    return {
+        "latency_ms": args.latency_ms,
+        "latency_jitter_ms": args.latency_jitter_ms,
+        "page_latency_ms": args.page_latency_ms,
+        "step_latency_ms": args.step_latency_ms,
+        "lazy_steps": args.lazy_steps,
+        "twofa": args.twofa,
+        "missing_fields": [f.strip() for f in args.missing_fields.split(",") if f.strip()],
+        "missing_rate": args.missing_rate,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the mock MoEngage dashboard")
+    parser.add_argument("--port", type=int, default=8765)
+    add_scenario_arguments(parser)
+    args = parser.parse_args()
+    server, url = start_server(args.port, **scenario_from_args(args))
+    print(f"Mock dashboard on {url} (set MOENGAGE_DASHBOARD_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
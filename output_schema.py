@@ -0,0 +1,222 @@
+import os
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Output format -> file extension. Parquet keeps the column types; xlsx needs openpyxl installed.
+OUTPUT_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "csv.gz": ".csv.gz",
+    "xlsx": ".xlsx",
+}
+DEFAULT_FORMATS = [f.strip() for f in os.getenv("OUTPUT_FORMATS", "csv,parquet").split(",") if f.strip()]
+MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "csv.gz": "application/gzip",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Reading CSV/xlsx back: only empty cells are missing. pandas' default NA strings would turn
+# the "N/A" text values (see DATA_COLUMNS) into NaN, so a file would not match its Parquet twin.
+READ_NA_OPTIONS = {"keep_default_na": False, "na_values": [""]}
+
+# pandas and the validation engine are imported where frames are built, so the column
+# and path helpers below stay cheap to import for the entry points and the app.
+
+# ==========================================
+# OUTPUT SCHEMA
+# ==========================================
+# (column, dtype, section of the nested extraction dict it comes from)
+# Both extractors write exactly these columns, in this order; fields an extractor does not
+# read stay empty. "N/A" is kept in text/category columns and becomes missing in typed ones.
+DATA_COLUMNS = [
+    ("Draft ID", "string", None),
+    ("Workspace", "category", None),
+    # Target Users
+    ("Campaign Name", "string", "Target Users"),
+    ("User Attribute", "category", "Target Users"),
+    ("Campaign Tags", "string", "Target Users"),
+    ("Message Type", "category", "Target Users"),
+    ("Audience Selection", "category", "Target Users"),
+    ("Exclude User", "boolean", "Target Users"),
+    ("User Opted Out Toggle", "boolean", "Target Users"),
+    ("Audience Limit Toggle", "boolean", "Target Users"),
+    ("Control Group Toggle", "boolean", "Target Users"),
+    # Content
+    ("SMS Sender", "category", "Content"),
+    ("Template ID", "string", "Content"),
+    ("Message Body", "string", "Content"),
+    # Schedule and Goals
+    ("Send Campaign Toggle", "category", "Schedule and Goals"),
+    ("Start Date", "string", "Schedule and Goals"),
+    ("Send Time", "string", "Schedule and Goals"),
+    ("Scheduled Datetime", "datetime64[ns]", "Schedule and Goals"),
+    ("Conversion Goals", "category", "Schedule and Goals"),
+    ("Frequency Cap Toggle", "boolean", "Schedule and Goals"),
+    ("Request Limit", "Int64", "Schedule and Goals"),
+]
+# Selenium extractor bookkeeping, and whether the row came from the result cache
+TRAILING_COLUMNS = [
+    ("Login Status", "category"),
+    ("Status", "category"),
+    ("From Cache", "boolean"),
+]
+
+
+def section_columns(section):
+    return [name for name, _, source in DATA_COLUMNS if source == section]
+
+
+def output_dtypes(rules=None):
+    if rules is None:
+        from validation import RULES as rules
+    dtypes = {name: dtype for name, dtype, _ in DATA_COLUMNS}
+    dtypes["Validation Message"] = "string"
+    dtypes.update({f"{rule.name} Validation": "boolean" for rule in rules})
+    dtypes.update(dict(TRAILING_COLUMNS))
+    return dtypes
+
+# ==========================================
+# COLUMNAR BUILDER
+# ==========================================
+_TRUE = {True, "True", "true", 1, "1"}
+_FALSE = {False, "False", "false", 0, "0"}
+
+
+def _as_bool(value):
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    return None  # missing once cast to the boolean dtype
+
+
+def _typed(values, dtype):
+    import pandas as pd
+
+    column = pd.Series(values, dtype=object)
+    if dtype == "datetime64[ns]":
+        return pd.to_datetime(column, errors="coerce", format="ISO8601")
+    if dtype == "Int64":
+        return pd.to_numeric(column, errors="coerce").round().astype("Int64")
+    if dtype == "boolean":
+        return column.map(_as_bool).astype("boolean")
+    return column.astype(dtype)
+
+
+class ColumnarBuilder:
+    """
+    Collects flat extraction rows straight into one buffer per schema column,
+    and turns them into a typed DataFrame once at the end.
+    """
+    def __init__(self, dtypes=None):
+        self.dtypes = dtypes or output_dtypes()
+        self.buffers = {name: [] for name in self.dtypes}
+        self.seen = set()  # columns at least one row actually had
+
+    def append(self, row):
+        for name, buffer in self.buffers.items():
+            buffer.append(row.get(name))
+        self.seen.update(name for name in row if name in self.buffers)
+
+    def __len__(self):
+        return len(self.buffers["Draft ID"])
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({name: _typed(values, self.dtypes[name]) for name, values in self.buffers.items()})
+
+
+def build_frame(rows, workspace=None):
+    """
+    Typed output frame for flat extraction rows, validated with the workspace's rules.
+    Rules for fields no row has (e.g. schedule fields from the Selenium extractor) are
+    left empty rather than reported as failures.
+    """
+    from validation import rules_for, validate_frame
+
+    rules = rules_for(workspace)
+    dtypes = output_dtypes(rules)
+    builder = ColumnarBuilder(dtypes)
+    for row in rows:
+        builder.append(row)
+    df = validate_frame(builder.to_frame(), rules=[r for r in rules if r.field in builder.seen])
+    # validate_frame adds its columns untyped, and reindex leaves added columns as object;
+    # cast the whole schema so the written files match the declared types
+    return df.reindex(columns=list(dtypes)).astype(dtypes)
+
+
+def output_paths(base_path, formats=None):
+    """
+    {format: path} for an output base path; a trailing .csv on the base is dropped.
+    """
+    formats = formats or DEFAULT_FORMATS
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)} (choose from {', '.join(OUTPUT_FORMATS)})")
+    stem = base_path[:-len(".csv")] if base_path.endswith(".csv") else base_path
+    return {fmt: stem + OUTPUT_FORMATS[fmt] for fmt in formats}
+
+
+def write_frame(df, path, fmt):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "csv.gz":
+        df.to_csv(path, index=False, compression="gzip")
+    elif fmt == "xlsx":
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def combined_frame(journals):
+    """
+    One frame over {workspace: journal}, each workspace's rows validated with its own rules
+    and tagged with the workspace, in workspace then input order.
+    """
+    import pandas as pd
+
+    frames = []
+    for workspace, journal in journals.items():
+        frame = build_frame(journal.rows(), workspace)
+        frame["Workspace"] = workspace
+        frames.append(frame)
+    # Categories differ per workspace, so concat falls back to object; restore the schema types
+    dtypes = {}
+    for frame in frames:
+        for name, dtype in frame.dtypes.items():
+            dtypes[name] = "category" if isinstance(dtype, pd.CategoricalDtype) else dtype
+    dtypes["Workspace"] = "category"
+    df = pd.concat(frames, ignore_index=True).reindex(columns=list(dtypes))
+    return df.astype(dtypes)
+
+
+def write_results(journals, output_path, formats=None):
+    """
+    Writes the rows of {workspace: journal} as one typed, validated table, once per output
+    format. Returns (number of rows, {format: path}).
+    """
+    df = combined_frame(journals)
+    paths = output_paths(output_path, formats)
+    for fmt, path in paths.items():
+        write_frame(df, path, fmt)
+    return len(df), paths
+
+
+def read_results(paths):
+    """
+    Loads a written result, preferring the typed Parquet file. Returns None if none exists.
+    """
+    import pandas as pd
+
+    for fmt in ("parquet", "csv", "csv.gz", "xlsx"):
+        path = paths.get(fmt)
+        if path and os.path.exists(path):
+            if fmt == "parquet":
+                return pd.read_parquet(path)
+            if fmt == "xlsx":
+                return pd.read_excel(path, **READ_NA_OPTIONS)
+            return pd.read_csv(path, **READ_NA_OPTIONS)
+    return None
@@ -0,0 +1,67 @@
+import json
+import sys
+import time
+
+# ==========================================
+# PROGRESS EVENTS
+# ==========================================
+# One JSON object per line, always with an "event" key:
+#   {"event": "start", "total": N}
+#   {"event": "draft", "index": i, "draft_id": ..., "status": "ok" | "skipped" | "error", "row": {...}, "workspace": ..., "elapsed_s": ...}
+#   {"event": "timing", "phases": [...], "slowest_drafts": [...], "memory": {...}}   (timing.SpanRecorder.summary,
+#                                                                     memory_guard.MemoryGuard.summary)
+#   {"event": "done", "output": path, "rows": n, "outputs": {format: path}}
+#   {"event": "error", "message": ...}
+#   {"event": "cancelled"}
+# Anything else on the same stream is plain log output.
+
+
+class ProgressEmitter:
+    def __init__(self, stream=None, enabled=True):
+        self.stream = stream or sys.stdout
+        self.enabled = enabled
+        self.started = time.monotonic()
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        line = json.dumps({"event": event, **fields}, default=str)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def start(self, total):
+        self.started = time.monotonic()
+        self.emit("start", total=total)
+
+    def draft(self, index, draft_id, status, row=None, error=None, workspace=None):
+        self.emit("draft", index=index, draft_id=draft_id, status=status, row=row, error=error,
+                  workspace=workspace, elapsed_s=round(time.monotonic() - self.started, 2))
+
+    def timing(self, summary):
+        self.emit("timing", **summary)
+
+    def done(self, output, rows, outputs=None):
+        self.emit("done", output=output, rows=rows, outputs=outputs or {})
+
+    def error(self, message):
+        self.emit("error", message=message)
+
+
+def parse_event(line):
+    """
+    Returns the event dict for a progress line, or None for plain log output.
+    """
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and "event" in event else None
+
+
+def eta_seconds(done, total, elapsed):
+    if not done or done >= total:
+        return 0.0
+    return elapsed / done * (total - done)
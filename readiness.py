@@ -0,0 +1,228 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Per-signal timeouts in milliseconds
+TIMEOUTS = {
+    "login": 30000,       # login form submitted -> OTP prompt or dashboard header
+    "dashboard": 30000,   # OTP submitted -> dashboard header
+    "editor": 20000,      # draft navigation -> campaign editor root
+    "step": 10000,        # step click -> step section rendered
+    "network_quiet": 10000,
+    "dom_settled": 3000,
+}
+NETWORK_QUIET_MS = 500   # no XHR/fetch in flight for this long counts as quiet
+DOM_QUIET_MS = 300       # no DOM mutations for this long counts as settled
+
+EDITOR_ROOT_XPATH = "//div[contains(@class,'mds-segmentation__section')]"
+CONTENT_READY_XPATH = "//input[@id='template_id'] | //div[@id='personalization_container']"
+SCHEDULE_READY_XPATH = "//input[@name='gCampaignType']"
+DASHBOARD_READY_CSS = "div.mds-header__user-profile"
+
+# ==========================================
+# WAIT REPORT
+# ==========================================
+class WaitReport:
+    """
+    Collects how long each readiness wait actually took, as running totals per signal.
+    """
+    def __init__(self):
+        self.stats = {}
+
+    def record(self, signal, seconds, ok):
+        s = self.stats.setdefault(signal, {"count": 0, "total_s": 0.0, "max_s": 0.0, "timeouts": 0})
+        s["count"] += 1
+        s["total_s"] += seconds
+        s["max_s"] = max(s["max_s"], seconds)
+        if not ok:
+            s["timeouts"] += 1
+
+    def summary(self):
+        return {signal: {k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()}
+                for signal, s in self.stats.items()}
+
+    def lines(self):
+        out = ["Readiness waits (signal: count, total, max, timeouts):"]
+        for signal, s in sorted(self.summary().items(), key=lambda kv: -kv[1]["total_s"]):
+            out.append(f"  {signal}: {s['count']}x, {s['total_s']:.2f}s total, {s['max_s']:.2f}s max, {s['timeouts']} timeout(s)")
+        return out
+
+    def reset(self):
+        self.stats = {}
+
+
+wait_report = WaitReport()
+# Like timing's recorder: a job in the extraction worker sets its own report for its tasks
+_current = ContextVar("wait_report", default=None)
+
+
+def current_report():
+    return _current.get() or wait_report
+
+
+def use(report):
+    """
+    Makes report the one waits record into for this task (and tasks it starts). Returns it.
+    """
+    _current.set(report)
+    return report
+
+
+class _timed:
+    def __init__(self, signal, report):
+        self.signal = signal
+        self.report = report or current_report()
+        self.ok = True
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.report.record(self.signal, time.perf_counter() - self.start, self.ok and exc_type is None)
+        return False
+
+# ==========================================
+# PLAYWRIGHT (ASYNC) SIGNALS
+# ==========================================
+DOM_SETTLED_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let timer = setTimeout(done, quietMs);
+    const deadline = setTimeout(done, timeoutMs);
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    function done() {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve(true);
+    }
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})
+"""
+
+
+async def wait_for_selector(page, selector, signal, timeout_ms=None, report=None, state="attached"):
+    """
+    Waits for a concrete element. Returns False instead of raising on timeout.
+    """
+    timeout_ms = TIMEOUTS.get(signal, 5000) if timeout_ms is None else timeout_ms
+    with _timed(signal, report) as t:
+        try:
+            await page.wait_for_selector(selector, timeout=timeout_ms, state=state)
+        except Exception:
+            t.ok = False
+    return t.ok
+
+
+async def wait_for_dom_settled(page, quiet_ms=DOM_QUIET_MS, timeout_ms=None, report=None):
+    """
+    Waits until the DOM has had no mutations for quiet_ms (capped at timeout_ms).
+    """
+    timeout_ms = TIMEOUTS["dom_settled"] if timeout_ms is None else timeout_ms
+    with _timed("dom_settled", report):
+        await page.evaluate(DOM_SETTLED_JS, [quiet_ms, timeout_ms])
+
+
+class NetworkQuietTracker:
+    """
+    Counts in-flight XHR/fetch requests of a page so callers can wait for a quiet window.
+    Attach before navigating.
+    """
+    def __init__(self, page, url_pattern=None, resource_types=("xhr", "fetch")):
+        self.page = page
+        self.url_pattern = url_pattern
+        self.resource_types = resource_types
+        self.in_flight = set()
+        self.last_change = time.monotonic()
+        page.on("request", self._on_start)
+        page.on("requestfinished", self._on_end)
+        page.on("requestfailed", self._on_end)
+
+    def _tracked(self, request):
+        if request.resource_type not in self.resource_types:
+            return False
+        return self.url_pattern is None or self.url_pattern in request.url
+
+    def _on_start(self, request):
+        if self._tracked(request):
+            self.in_flight.add(request)
+            self.last_change = time.monotonic()
+
+    def _on_end(self, request):
+        if request in self.in_flight:
+            self.in_flight.discard(request)
+            self.last_change = time.monotonic()
+
+    async def wait_quiet(self, quiet_ms=NETWORK_QUIET_MS, timeout_ms=None, report=None):
+        timeout_ms = TIMEOUTS["network_quiet"] if timeout_ms is None else timeout_ms
+        deadline = time.monotonic() + timeout_ms / 1000
+        with _timed("network_quiet", report) as t:
+            while True:
+                now = time.monotonic()
+                if not self.in_flight and now - self.last_change >= quiet_ms / 1000:
+                    break
+                if now >= deadline:
+                    t.ok = False
+                    break
+                await asyncio.sleep(0.05)
+        return t.ok
+
+# ==========================================
+# SELENIUM SIGNALS
+# ==========================================
+def wait_for_element(driver, locators, signal, timeout_ms=None, report=None, visible=False):
+    """
+    Waits until any of the (By, locator) pairs is present (or visible).
+    Returns the first matching element, or None on timeout.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    timeout_ms = TIMEOUTS.get(signal, 5000) if timeout_ms is None else timeout_ms
+
+    def _find(drv):
+        for by, locator in locators:
+            for elem in drv.find_elements(by, locator):
+                if not visible or elem.is_displayed():
+                    return elem
+        return False
+
+    with _timed(signal, report) as t:
+        try:
+            return WebDriverWait(driver, timeout_ms / 1000, poll_frequency=0.1).until(_find)
+        except Exception:
+            t.ok = False
+            return None
+
+
+DOM_SETTLED_SELENIUM_JS = """
+const [quietMs, timeoutMs, callback] = arguments;
+let timer = setTimeout(done, quietMs);
+const deadline = setTimeout(done, timeoutMs);
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(done, quietMs);
+});
+function done() {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(deadline);
+    callback(true);
+}
+observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+"""
+
+
+def wait_for_dom_settled_selenium(driver, quiet_ms=DOM_QUIET_MS, timeout_ms=None, report=None):
+    timeout_ms = TIMEOUTS["dom_settled"] if timeout_ms is None else timeout_ms
+    with _timed("dom_settled", report) as t:
+        driver.set_script_timeout(timeout_ms / 1000 + 1)
+        try:
+            driver.execute_async_script(DOM_SETTLED_SELENIUM_JS, quiet_ms, timeout_ms)
+        except Exception:
+            t.ok = False
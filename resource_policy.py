@@ -0,0 +1,202 @@
+import json
+import os
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# RESOURCE_POLICY: "block" aborts matching requests, "measure" only counts what would be
+# blocked (including bytes), "off" disables the policy.
+POLICY_MODE = os.getenv("RESOURCE_POLICY", "block").strip().lower()
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+BLOCKED_URL_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "fullstory.com",
+    "mixpanel.com",
+    "segment.io",
+    "segment.com",
+    "amplitude.com",
+    "newrelic.com",
+    "nr-data.net",
+    "intercom.io",
+    "intercomcdn.com",
+    "zendesk.com",
+    "zdassets.com",
+    "freshchat.com",
+    "pendo.io",
+]
+
+# XHR/fetch requests matching these are never blocked (the draft editor's own API calls)
+ALLOWED_RESOURCE_TYPES = {"xhr", "fetch", "document"}
+ALLOWED_URL_PATTERNS = [
+    "moengage.com/v4/",
+    "moengage.com/api",
+]
+
+# setBlockedURLs only matches URLs, so resource types are approximated by extension
+_TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "svg", "ico"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "mp3", "ogg"],
+}
+
+
+def _env_list(name):
+    return [p.strip() for p in os.getenv(name, "").split(",") if p.strip()]
+
+# ==========================================
+# POLICY
+# ==========================================
+class BlockStats:
+    """
+    Per-run request counters. In "measure" mode bytes_blocked is what blocking would have saved;
+    in "block" mode aborted requests never get a response, so only their count is known.
+    Sizes are body bytes as received: content-length when sent, else the measured body size.
+    """
+    def __init__(self):
+        self.requests_total = 0
+        self.requests_blocked = 0
+        self.bytes_allowed = 0
+        self.bytes_blocked = 0
+        self.unsized = 0  # responses whose size could not be read
+        self.blocked_by_reason = {}
+
+    def count(self, blocked, reason=None, size=0):
+        self.requests_total += 1
+        if size is None:
+            self.unsized += 1
+            size = 0
+        if blocked:
+            self.requests_blocked += 1
+            self.bytes_blocked += size
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        else:
+            self.bytes_allowed += size
+
+    def lines(self, mode):
+        verb = "would be blocked" if mode == "measure" else "blocked"
+        line = f"Resource policy ({mode}): {self.requests_blocked}/{self.requests_total} requests {verb}, "
+        if mode == "measure":
+            line += f"{self.bytes_blocked / 1024:.1f} KiB {verb}, "
+        line += f"{self.bytes_allowed / 1024:.1f} KiB loaded"
+        if self.unsized:
+            line += f" ({self.unsized} response(s) of unknown size not counted)"
+        out = [line]
+        for reason, n in sorted(self.blocked_by_reason.items(), key=lambda kv: -kv[1]):
+            out.append(f"  {reason}: {n}")
+        return out
+
+
+class ResourcePolicy:
+    def __init__(self, mode=POLICY_MODE, blocked_types=None, blocked_patterns=None, allowed_patterns=None):
+        self.mode = mode if mode in ("block", "measure", "off") else "block"
+        self.blocked_types = set(BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.blocked_patterns = list(BLOCKED_URL_PATTERNS if blocked_patterns is None else blocked_patterns)
+        self.blocked_patterns += _env_list("RESOURCE_POLICY_BLOCK")
+        self.allowed_patterns = list(ALLOWED_URL_PATTERNS if allowed_patterns is None else allowed_patterns)
+        self.allowed_patterns += _env_list("RESOURCE_POLICY_ALLOW")
+        self.stats = BlockStats()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def block_reason(self, url, resource_type):
+        """
+        Returns why a request should be blocked, or None if it must go through.
+        """
+        resource_type = (resource_type or "").lower()
+        if resource_type in ALLOWED_RESOURCE_TYPES and any(p in url for p in self.allowed_patterns):
+            return None
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        for p in self.blocked_patterns:
+            if p in url:
+                return f"url:{p}"
+        return None
+
+    def lines(self):
+        return self.stats.lines(self.mode)
+
+    # ---------- Playwright ----------
+    async def install_playwright(self, context):
+        """
+        Routes every request of the context through the policy.
+        """
+        if not self.enabled:
+            return
+
+        async def handle(route, request):
+            reason = self.block_reason(request.url, request.resource_type)
+            if reason and self.mode == "block":
+                self.stats.count(True, reason)
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+
+        async def on_response(response):
+            request = response.request
+            reason = self.block_reason(request.url, request.resource_type)
+            try:
+                size = int(response.headers["content-length"])
+            except (KeyError, ValueError):
+                # Chunked responses send no content-length; ask the browser what the body took
+                try:
+                    size = (await request.sizes())["responseBodySize"]
+                except Exception:
+                    size = None
+            self.stats.count(bool(reason), reason, size)
+
+        if self.mode == "block":
+            await context.route("**/*", handle)
+        context.on("response", on_response)
+
+    # ---------- Selenium (CDP) ----------
+    def blocked_url_globs(self):
+        globs = [f"*{p}*" for p in self.blocked_patterns]
+        for resource_type in self.blocked_types:
+            globs += [f"*.{ext}" for ext in _TYPE_EXTENSIONS.get(resource_type, [])]
+            globs += [f"*.{ext}?*" for ext in _TYPE_EXTENSIONS.get(resource_type, [])]
+        return globs
+
+    def install_selenium(self, driver):
+        """
+        Blocks by URL through CDP. The allow-list cannot be expressed in setBlockedURLs,
+        so allowed patterns only affect the counters here.
+        """
+        if not self.enabled:
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        if self.mode == "block":
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_url_globs()})
+
+    def count_selenium_log(self, driver):
+        """
+        Drains the performance log and updates the counters.
+        Needs the "goog:loggingPrefs" {"performance": "ALL"} capability.
+        """
+        if not self.enabled:
+            return
+        requests = {}
+        for entry in driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                requests[params["requestId"]] = (params["request"]["url"], params.get("type", ""))
+            elif method == "Network.loadingFinished" and params.get("requestId") in requests:
+                url, resource_type = requests.pop(params["requestId"])
+                reason = self.block_reason(url, resource_type)
+                self.stats.count(bool(reason), reason, int(params.get("encodedDataLength", 0)))
+            elif method == "Network.loadingFailed" and params.get("requestId") in requests:
+                url, resource_type = requests.pop(params["requestId"])
+                if params.get("blockedReason") == "inspector":
+                    self.stats.count(True, self.block_reason(url, resource_type) or "url:blocked")
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE", "on").strip().lower() != "off"
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", "result_cache.sqlite")
+RESULT_CACHE_TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", "1"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000"))
+
+# ==========================================
+# CACHE
+# ==========================================
+def content_hash(row):
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Extracted rows keyed by (workspace, draft ID), with a TTL and size-bounded LRU eviction.
+    Entries past the TTL are not discarded: their last-modified value lets the extractor
+    skip a full re-extract when the draft has not changed.
+    """
+    def __init__(self, path=RESULT_CACHE_DB, ttl_hours=RESULT_CACHE_TTL_HOURS, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                workspace     TEXT NOT NULL,
+                draft_id      TEXT NOT NULL,
+                row_json      TEXT NOT NULL,
+                content_hash  TEXT NOT NULL,
+                last_modified TEXT,
+                fetched_at    REAL NOT NULL,
+                accessed_at   REAL NOT NULL,
+                PRIMARY KEY (workspace, draft_id)
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+        self.db.commit()
+
+    def get_many(self, workspace, draft_ids):
+        """
+        Returns {draft_id: entry} for the cached drafts; entry has row, content_hash,
+        last_modified, fetched_at and fresh (still within the TTL).
+        """
+        entries = {}
+        now = time.time()
+        draft_ids = list(dict.fromkeys(draft_ids))
+        for start in range(0, len(draft_ids), 500):
+            chunk = draft_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for draft_id, row_json, digest, last_modified, fetched_at in self.db.execute(
+                f"SELECT draft_id, row_json, content_hash, last_modified, fetched_at FROM results "
+                f"WHERE workspace = ? AND draft_id IN ({placeholders})", [workspace, *chunk]
+            ):
+                entries[draft_id] = {
+                    "row": json.loads(row_json),
+                    "content_hash": digest,
+                    "last_modified": last_modified,
+                    "fetched_at": fetched_at,
+                    "fresh": now - fetched_at <= self.ttl_seconds,
+                }
+            self.db.execute(
+                f"UPDATE results SET accessed_at = ? WHERE workspace = ? AND draft_id IN ({placeholders})",
+                [now, workspace, *chunk]
+            )
+        self.db.commit()
+        return entries
+
+    def put(self, workspace, draft_id, row, last_modified=None):
+        """
+        Stores a freshly extracted row. Returns True when its content differs from the cached one.
+        """
+        digest = content_hash(row)
+        now = time.time()
+        previous = self.db.execute(
+            "SELECT content_hash FROM results WHERE workspace = ? AND draft_id = ?", (workspace, draft_id)
+        ).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (workspace, draft_id, json.dumps(row, default=str), digest, last_modified, now, now)
+        )
+        self._evict()
+        self.db.commit()
+        return previous is None or previous[0] != digest
+
+    def touch(self, workspace, draft_id):
+        """
+        Marks a cached row as verified unchanged now (restarts its TTL).
+        """
+        now = time.time()
+        self.db.execute(
+            "UPDATE results SET fetched_at = ?, accessed_at = ? WHERE workspace = ? AND draft_id = ?",
+            (now, now, workspace, draft_id)
+        )
+        self.db.commit()
+
+    def invalidate(self, workspace=None, draft_ids=None):
+        """
+        Drops cached rows: given drafts of a workspace, a whole workspace, or everything.
+        """
+        if workspace is None:
+            self.db.execute("DELETE FROM results")
+        elif draft_ids is None:
+            self.db.execute("DELETE FROM results WHERE workspace = ?", (workspace,))
+        else:
+            self.db.executemany(
+                "DELETE FROM results WHERE workspace = ? AND draft_id = ?",
+                [(workspace, d) for d in draft_ids]
+            )
+        self.db.commit()
+
+    def _evict(self):
+        # Least recently used rows go first once the cache is over its size bound
+        (count,) = self.db.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def close(self):
+        self.db.close()
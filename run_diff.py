@@ -0,0 +1,156 @@
+import io
+import os
+from output_schema import READ_NA_OPTIONS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Rows are matched on these columns; Workspace only when both sides have it (older results don't)
+KEY_COLUMNS = ("Workspace", "Draft ID")
+# Bookkeeping that changes from run to run without the draft changing
+DIFF_IGNORED_COLUMNS = ("From Cache", "Login Status", "Validation Message")
+DIFF_COLUMNS = ["Workspace", "Draft ID", "Change", "Column", "Before", "After"]
+
+# ==========================================
+# DIFF
+# ==========================================
+# A diff has one row per change, in the current result's draft order:
+#   Change "changed": Column, Before and After give one field whose value differs
+#                     (validation flags included, so a flipped check shows up as its own row)
+#   Change "added":   the draft is only in the current result
+#   Change "removed": the draft is only in the baseline
+# Drafts that did not change are left out.
+
+
+def read_table(name, data=None):
+    """
+    Reads a result file in any output format, from a path or from uploaded bytes.
+    Text formats are read as text (typed later), so e.g. long template IDs never become floats
+    and "N/A" stays "N/A", as in the Parquet file.
+    """
+    import pandas as pd
+
+    source = io.BytesIO(data) if data is not None else name
+    lower = name.lower()
+    if lower.endswith(".parquet"):
+        return pd.read_parquet(source)
+    if lower.endswith(".xlsx"):
+        return pd.read_excel(source, dtype=str, **READ_NA_OPTIONS)
+    return pd.read_csv(source, dtype=str, compression="gzip" if lower.endswith(".gz") else None, **READ_NA_OPTIONS)
+
+
+def read_result(paths):
+    """
+    Reads a written result ({format: path}), preferring the typed Parquet file.
+    """
+    for fmt in ("parquet", "csv", "csv.gz", "xlsx"):
+        path = paths.get(fmt)
+        if path and os.path.exists(path):
+            return read_table(path)
+    raise FileNotFoundError("No result file to compare")
+
+
+def load_baseline(source):
+    """
+    Baseline frame from a previous result file, or from the journal of a previous run (run ID).
+    """
+    if os.path.exists(source):
+        return read_table(source)
+    from output_schema import combined_frame
+    from run_journal import RunJournal
+
+    return combined_frame(RunJournal.open_group(source))
+
+
+def _comparable(column, dtype):
+    # Both sides go through the output schema's types (a CSV baseline comes back untyped),
+    # then to text, so 5 and "5.0", True and "True" or NaN and None compare equal
+    from output_schema import _typed
+
+    if dtype is not None:
+        column = _typed(column.array, dtype).set_axis(column.index)
+    return column.astype("string").fillna("")
+
+
+def _indexed(frame, keys):
+    import pandas as pd
+    from output_schema import output_dtypes
+
+    dtypes = output_dtypes()
+    frame = frame.dropna(subset=["Draft ID"])
+    df = pd.DataFrame({name: _comparable(frame[name], dtypes.get(name)) for name in frame.columns})
+    df = df.set_index(keys)
+    return df[~df.index.duplicated(keep="last")]
+
+
+def diff_frames(baseline, current, ignore=DIFF_IGNORED_COLUMNS):
+    """
+    Changes from baseline to current, matched on Draft ID (and Workspace). Returns a frame
+    with DIFF_COLUMNS. Both sides are indexed once and compared a whole column at a time.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if "Draft ID" not in baseline.columns or "Draft ID" not in current.columns:
+        raise ValueError("Both results need a Draft ID column")
+    keys = [k for k in KEY_COLUMNS if k in baseline.columns and k in current.columns]
+    before = _indexed(baseline, keys)
+    after = _indexed(current, keys)
+
+    common = after.index[after.index.isin(before.index)]
+    b, a = before.reindex(common), after.reindex(common)
+    columns = [c for c in after.columns if c in before.columns and c not in ignore]
+    parts = []
+    for position, column in enumerate(columns):
+        changed = b[column].ne(a[column]).to_numpy()
+        if changed.any():
+            parts.append(pd.DataFrame({
+                "Change": "changed", "Column": column,
+                "Before": b[column].to_numpy()[changed], "After": a[column].to_numpy()[changed],
+                "_column": position,
+            }, index=common[changed]))
+    added = after.index[~after.index.isin(before.index)]
+    removed = before.index[~before.index.isin(after.index)]
+    parts.append(pd.DataFrame({"Change": "added", "_column": -1}, index=added))
+    parts.append(pd.DataFrame({"Change": "removed", "_column": -1}, index=removed))
+
+    diff = pd.concat(parts)
+    # Current draft order, baseline-only drafts last; fields in column order within a draft
+    order = after.index.get_indexer(diff.index)
+    diff["_row"] = np.where(order >= 0, order, len(after) + np.arange(len(diff)))
+    diff = diff.reset_index().sort_values(["_row", "_column"], kind="stable")
+    return diff.reindex(columns=DIFF_COLUMNS).reset_index(drop=True)
+
+
+def diff_summary(diff):
+    """
+    Counts for a diff: drafts changed, added and removed, and changes per column.
+    """
+    changes = diff[diff["Change"] == "changed"]
+    return {
+        "changed_drafts": len(changes.drop_duplicates(subset=list(KEY_COLUMNS))),
+        "added": int((diff["Change"] == "added").sum()),
+        "removed": int((diff["Change"] == "removed").sum()),
+        "columns": changes["Column"].value_counts().to_dict(),
+    }
+
+
+def summary_lines(summary):
+    out = [f"Diff: {summary['changed_drafts']} draft(s) changed, {summary['added']} added, "
+           f"{summary['removed']} removed"]
+    if summary["columns"]:
+        out.append("Changed fields: " + ", ".join(f"{c}: {n}" for c, n in summary["columns"].items()))
+    return out
+
+
+def write_diff(diff, output_path, formats=None):
+    """
+    Writes a diff next to the result: "<output>_diff.<ext>" per output format. Returns {format: path}.
+    """
+    from output_schema import output_paths, write_frame
+
+    stem = output_path[:-len(".csv")] if output_path.endswith(".csv") else output_path
+    paths = output_paths(stem + "_diff", formats)
+    for fmt, path in paths.items():
+        write_frame(diff, path, fmt)
+    return paths
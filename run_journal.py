@@ -0,0 +1,186 @@
+import glob
+import json
+import os
+import re
+import time
+import uuid
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+RUNS_DIR = os.getenv("RUN_JOURNAL_DIR", "runs")
+
+# ==========================================
+# RUN JOURNAL
+# ==========================================
+# Append-only JSONL file per run:
+#   {"type": "run", "run_id": ..., "workspace": ..., "draft_ids": [...], "created_at": ...}   (first line)
+#   {"type": "draft", "draft_id": ..., "status": "ok" | "skipped" | "error", "row": {...} | null, "at": ...}
+# A draft can appear more than once when a resumed run retries it; the last record wins.
+# A multi-workspace run keeps one journal per workspace, "<run_id>@<workspace>.jsonl"; they
+# share the run ID (group_id) and one spans file.
+
+
+def _new_run_id():
+    return time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+def _slug(workspace):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", workspace)
+
+
+class RunJournal:
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+
+    @property
+    def run_id(self):
+        return self.header["run_id"]
+
+    @property
+    def group_id(self):
+        return self.run_id.split("@", 1)[0]
+
+    @property
+    def workspace(self):
+        return self.header["workspace"]
+
+    @property
+    def draft_ids(self):
+        return self.header["draft_ids"]
+
+    @property
+    def spans_path(self):
+        """
+        Where the run's per-phase timing spans go (see timing.py), next to the journal.
+        All journals of a multi-workspace run share it.
+        """
+        return os.path.join(os.path.dirname(self.path), f"{self.group_id}.spans.jsonl")
+
+    @classmethod
+    def create(cls, workspace, draft_ids, run_id=None, runs_dir=RUNS_DIR):
+        run_id = run_id or _new_run_id()
+        os.makedirs(runs_dir, exist_ok=True)
+        path = os.path.join(runs_dir, f"{run_id}.jsonl")
+        if os.path.exists(path):
+            raise FileExistsError(f"Run {run_id} already exists; resume it instead.")
+        header = {"type": "run", "run_id": run_id, "workspace": workspace,
+                  "draft_ids": list(draft_ids), "created_at": time.time()}
+        journal = cls(path, header)
+        journal._append(header)
+        return journal
+
+    @classmethod
+    def open(cls, run_id, runs_dir=RUNS_DIR):
+        path = os.path.join(runs_dir, f"{run_id}.jsonl")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No journal for run {run_id} in {runs_dir}/")
+        with open(path, "rb+") as f:
+            header = json.loads(f.readline())
+            # Terminate a line torn by a crash so new records start on their own line
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        return cls(path, header)
+
+    @classmethod
+    def create_group(cls, workspace_drafts, run_id=None, runs_dir=RUNS_DIR):
+        """
+        Journals for a run over {workspace: draft IDs}, as {workspace: journal}.
+        A single workspace gets a plain journal named after the run ID.
+        """
+        run_id = run_id or _new_run_id()
+        if len(workspace_drafts) == 1:
+            [(workspace, draft_ids)] = workspace_drafts.items()
+            return {workspace: cls.create(workspace, draft_ids, run_id, runs_dir)}
+        if cls.find_group(run_id, runs_dir):
+            raise FileExistsError(f"Run {run_id} already exists; resume it instead.")
+        return {
+            workspace: cls.create(workspace, draft_ids, f"{run_id}@{_slug(workspace)}", runs_dir)
+            for workspace, draft_ids in workspace_drafts.items()
+        }
+
+    @classmethod
+    def find_group(cls, run_id, runs_dir=RUNS_DIR):
+        paths = sorted(glob.glob(os.path.join(glob.escape(runs_dir), f"{glob.escape(run_id)}@*.jsonl")))
+        return [os.path.basename(p)[:-len(".jsonl")] for p in paths if not p.endswith(".spans.jsonl")]
+
+    @classmethod
+    def open_group(cls, run_id, runs_dir=RUNS_DIR):
+        """
+        {workspace: journal} for a run created with create_group (or create).
+        """
+        if os.path.exists(os.path.join(runs_dir, f"{run_id}.jsonl")):
+            journals = [cls.open(run_id, runs_dir)]
+        else:
+            journals = [cls.open(member, runs_dir) for member in cls.find_group(run_id, runs_dir)]
+            if not journals:
+                raise FileNotFoundError(f"No journal for run {run_id} in {runs_dir}/")
+        return {journal.workspace: journal for journal in journals}
+
+    def _append(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, draft_id, status, row=None):
+        self._append({"type": "draft", "draft_id": draft_id, "status": status, "row": row, "at": time.time()})
+
+    def _records(self):
+        """
+        Yields (offset, record) for every draft record. A torn last line from a crash is ignored.
+        """
+        with open(self.path, "rb") as f:
+            f.readline()  # header
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    return
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "draft":
+                    yield offset, record
+
+    def completed_ids(self):
+        """
+        Draft IDs whose latest record is a successful extraction; resume skips these.
+        """
+        latest = {}
+        for _, record in self._records():
+            latest[record["draft_id"]] = record["status"]
+        return {draft_id for draft_id, status in latest.items() if status == "ok"}
+
+    def pending_ids(self):
+        done = self.completed_ids()
+        return [d for d in self.draft_ids if d not in done]
+
+    def _latest_rows(self):
+        """
+        Returns ({draft_id: offset of its latest row record}, ordered column names).
+        """
+        offsets, fieldnames = {}, {}
+        for offset, record in self._records():
+            if record.get("row"):
+                offsets[record["draft_id"]] = offset
+                fieldnames.update(dict.fromkeys(record["row"]))
+            else:
+                offsets.pop(record["draft_id"], None)
+        return offsets, list(fieldnames)
+
+    def rows(self):
+        """
+        Yields the latest row of every draft in input order, reading one row at a time.
+        """
+        offsets, _ = self._latest_rows()
+        with open(self.path, "rb") as journal:
+            for draft_id in dict.fromkeys(self.draft_ids):
+                if draft_id in offsets:
+                    journal.seek(offsets[draft_id])
+                    yield json.loads(journal.readline())["row"]
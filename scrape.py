@@ -1,548 +1,815 @@
 # FileName: MultipleFiles/scrape.py
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import async_playwright, TimeoutError
+import argparse
+import json
+import asyncio
 import time
-from datetime import datetime
-import pandas as pd
-import streamlit as st # Keep streamlit import for logging/feedback within the subprocess if needed, though app.py handles main UI
+from datetime import date, datetime
 import os
-import re # Import re for regex operations
 import sys # Import sys to access command-line arguments
-from playwright_stealth import stealth_sync
+from playwright_stealth import stealth_async
+from session_store import load_session, save_session, clear_session
+import readiness
+import timing
+from readiness import NetworkQuietTracker, EDITOR_ROOT_XPATH, CONTENT_READY_XPATH, SCHEDULE_READY_XPATH, DASHBOARD_READY_CSS
+from resource_policy import ResourcePolicy
+from progress import ProgressEmitter
+from run_journal import RunJournal
+from output_schema import section_columns, write_results, OUTPUT_FORMATS, DEFAULT_FORMATS
+from result_cache import ResultCache, RESULT_CACHE_ENABLED
+from dom_snapshot import ABSENT, TARGET_USERS_FIELDS, CONTENT_FIELDS, SCHEDULE_FIELDS, snapshot_fields, resolve_fields
+from draft_payload import CROSS_CHECK_FIELDS, DraftPayloadCapture, cross_checked, payload_report, payload_values, payload_version
+from draft_id_input import chunked, read_id_file, DRAFT_ID_CHUNK_SIZE
+from shards import default_shards, run_shards
+from memory_guard import MemoryGuard
+from draft_listing import discover_drafts
+from run_diff import diff_frames, diff_summary, load_baseline, read_result, summary_lines, write_diff
 
 # --- Constants ---
-MOENGAGE_BASE_URL = "https://dashboard-03.moengage.com/v4/#/sms/create?type=one-time&draftId="
-MESSAGE_BODY_CHAR_LIMIT = 4096
+MOENGAGE_ORIGIN = os.getenv("MOENGAGE_DASHBOARD_URL", "https://dashboard-03.moengage.com").rstrip("/") # mock_dashboard.py for benchmarks
+MOENGAGE_BASE_URL = MOENGAGE_ORIGIN + "/v4/#/sms/create?type=one-time&draftId="
+MOENGAGE_AUTH_URL = MOENGAGE_ORIGIN + "/v4/#/auth"
+DEFAULT_CONCURRENCY = 1 # Number of drafts extracted at once (tabs in the logged-in context)
+EXTRACTION_MODES = ("dom", "api") # "api" reads the draft JSON off the wire, DOM only for missing fields
+DEFAULT_MODE = "dom"
 # CDP_URL = "http://localhost:9222" # Not directly used for launching, but good to keep in mind for debug mode
 
-# --- Global Playwright and Browser Context (managed by context manager in attach_and_login) ---
-_playwright_instance = None
-_browser_context_instance = None
-
-def add_validations(all_data):
+def flatten_campaign_data_with_single_message(all_data):
     """
-    Adds validation columns and messages for each campaign.
+    One flat row per draft with the output schema's data columns, read section by section.
     """
+    flat = []
     for d in all_data:
-        target = d.get("Target Users", {})
-        content = d.get("Content", {})
-        schedule = d.get("Schedule and Goals", {})
-
-        # -------------------- Target Users --------------------
-        # Campaign Name
-        target["Campaign Name Validation"] = bool(target.get("Campaign Name") and target["Campaign Name"] != "N/A")
-        target["Campaign Name Message"] = "" if target["Campaign Name Validation"] else "Campaign Name is missing"
-
-        # User Attributes
-        target["User Attribute Validation"] = bool(target.get("User Attribute") and target["User Attribute"] != "N/A")
-        target["User Attribute Message"] = "" if target["User Attribute Validation"] else "User Attribute is missing"
-
-        # Campaign Tags
-        target["Campaign Tags Validation"] = bool(target.get("Campaign Tags") and target["Campaign Tags"] != "N/A")
-        target["Campaign Tags Message"] = "" if target["Campaign Tags Validation"] else "Campaign Tags are missing"
-
-        # Message Type
-        target["Message Type Validation"] = True
-        target["Message Type Message"] = ""
-
-        # Audience Selection
-        aud_sel = target.get("Audience Selection", "")
-        if not aud_sel or aud_sel == "N/A":
-            target["Audience Selection Validation"] = False
-            target["Audience Selection Message"] = "Audience selection missing"
-        elif "All Users" in aud_sel:
-            target["Audience Selection Validation"] = False
-            target["Audience Selection Message"] = "Audience set to All Users (usually not desired for targeted campaigns)"
-        else:
-            target["Audience Selection Validation"] = True
-            target["Audience Selection Message"] = ""
-
-        # Exclude User
-        target["Exclude User Validation"] = True
-        target["Exclude User Message"] = ""
-
-        # User Opted Out Toggle
-        target["User Opted Out Toggle Validation"] = True
-        target["User Opted Out Toggle Message"] = ""
-
-        # Audience Limit Toggle
-        target["Audience Limit Toggle Validation"] = True
-        target["Audience Limit Toggle Message"] = ""
-
-        # Control Group Toggle
-        target["Control Group Toggle Validation"] = True
-        target["Control Group Toggle Message"] = ""
-
-        # -------------------- Content --------------------
-        # SMS Sender
-        content["SMS Sender Validation"] = bool(content.get("SMS Sender") and content["SMS Sender"] != "N/A")
-        content["SMS Sender Message"] = "" if content["SMS Sender Validation"] else "SMS Sender missing"
-
-        # Template ID
-        content["Template ID Validation"] = bool(content.get("Template ID") and content["Template ID"] != "N/A")
-        content["Template ID Message"] = "" if content["Template ID Validation"] else "Template ID missing"
-
-        # Message Body
-        msg = content.get("Message Body", "")
-        msg_valid = True
-        msg_message = ""
-
-        if not msg or msg == "N/A":
-            msg_valid = False
-            msg_message = "Message body is missing"
-        else:
-            # Check character limit
-            if len(msg) > MESSAGE_BODY_CHAR_LIMIT:
-                msg_valid = False
-                msg_message = f"Message exceeds character limit of {MESSAGE_BODY_CHAR_LIMIT}"
-
-            # Check for link presence (basic check)
-            url_pattern = r"https?://\S+"
-            if not re.search(url_pattern, msg):
-                msg_valid = False
-                msg_message = "Message link missing or invalid (requires http/https URL)"
-
-        content["Message Validation"] = msg_valid
-        content["Message Message"] = msg_message
-
-        # -------------------- Schedule and Goals --------------------
-        # Send Campaign Toggle
-        send_toggle = schedule.get("Send Campaign Toggle", "")
-        if send_toggle.lower() == "as soon as possible":
-            schedule["Send Campaign Toggle Validation"] = False
-            schedule["Send Campaign Toggle Message"] = "Send Campaign set to 'As soon as possible' (might not be desired for scheduled campaigns)"
-        else:
-            schedule["Send Campaign Toggle Validation"] = True
-            schedule["Send Campaign Toggle Message"] = ""
-
-        # Date & Time
-        schedule["Date & Time Validation"] = bool(schedule.get("Scheduled Datetime") and schedule["Scheduled Datetime"] != "N/A")
-        schedule["Date & Time Message"] = "" if schedule["Date & Time Validation"] else "Scheduled Date & Time is missing or invalid"
-
-        # Conversion Goal
-        schedule["Conversion Goal Validation"] = bool(schedule.get("Conversion Goals") and schedule["Conversion Goals"] != "N/A")
-        schedule["Conversion Goal Message"] = "" if schedule["Conversion Goal Validation"] else "Conversion Goal is missing"
+        row = {"Draft ID": d["Draft ID"]}
+        for section in ("Target Users", "Content", "Schedule and Goals"):
+            values = d.get(section, {})
+            for col in section_columns(section):
+                row[col] = values.get(col, "N/A")
+        flat.append(row)
+    return flat
 
-        # Frequency Cap Toggle
-        schedule["Frequency Cap Toggle Validation"] = True
-        schedule["Frequency Cap Toggle Message"] = ""
 
-        # Request Limit
-        schedule["Request Limit Validation"] = bool(schedule.get("Request Limit") is not None)
-        schedule["Request Limit Message"] = "" if schedule["Request Limit Validation"] else "Request Limit is missing"
+def build_schedule_data(draft_id, snapshot):
+    """
+    Builds the Schedule and Goals section from a SCHEDULE_FIELDS snapshot.
+    """
+    raw = resolve_fields(snapshot, SCHEDULE_FIELDS)
+    schedule_data = {}
+
+    sid = raw.pop("Send Campaign Type")
+    if sid == "asap":
+        schedule_data["Send Campaign Toggle"] = "As soon as possible"
+    elif sid == "specificDateTime":
+        schedule_data["Send Campaign Toggle"] = "At specific date and time"
+    else:
+        schedule_data["Send Campaign Toggle"] = sid
+
+    schedule_data["Start Date"] = raw["Start Date"]
+
+    hours, minutes, am_pm = raw["Hours"], raw["Minutes"], raw["AM/PM"]
+    if hours != "N/A" and minutes != "N/A" and am_pm != "N/A":
+        schedule_data["Send Time"] = f"{hours}:{minutes} {am_pm}"
+    else:
+        schedule_data["Send Time"] = "N/A"
+
+    date_str = schedule_data["Start Date"]
+    time_str = schedule_data["Send Time"]
+
+    if date_str != "N/A" and time_str != "N/A":
+        dt_str = f"{date_str} {time_str}"
+        try:
+            schedule_data["Scheduled Datetime"] = datetime.strptime(dt_str, "%d %b %Y %I:%M %p")
+        except ValueError:
+            print(f" Datetime parsing failed for Draft ID {draft_id} with '{dt_str}'. Setting to N/A.")
+            schedule_data["Scheduled Datetime"] = "N/A"
+    else:
+        schedule_data["Scheduled Datetime"] = "N/A"
 
-    return all_data
+    schedule_data["Conversion Goals"] = raw["Conversion Goals"]
+    schedule_data["Frequency Cap Toggle"] = raw["Frequency Cap Toggle"]
+    schedule_data["Request Limit"] = raw["Request Limit"]
+    return schedule_data
 
 
-def flatten_campaign_data_with_single_message(all_data):
-    flat = []
-    for d in all_data:
-        row = {"Draft ID": d["Draft ID"]}
+async def open_step(page, draft_id, step_title, label, data_name, ready_xpath):
+    """
+    Clicks a step of the campaign editor and waits for its fields to render.
+    """
+    try:
+        step_button = await page.wait_for_selector(f"//div[contains(@class,'mds-steps__item') and .//div[text()='{step_title}']]//div[@role='button']", timeout=10000)
+        await step_button.click()
+        if await readiness.wait_for_selector(page, ready_xpath, "step"):
+            await readiness.wait_for_dom_settled(page)
+    except TimeoutError:
+        print(f" Could not click {label} step for Draft ID {draft_id}. Proceeding without {data_name} data.")
+    except Exception as e:
+        print(f" Error clicking {label} step for Draft ID {draft_id}: {e}")
+
+
+async def read_section(page, fields, payload=None, open_section=None):
+    """
+    Reads a field table from the draft payload when there is one, and from the DOM for
+    whatever the payload lacks. open_section is awaited first, only if the DOM is needed.
+    Without open_section (the section is on screen) CROSS_CHECK_FIELDS are read from both,
+    and the page wins where they disagree.
+    """
+    snapshot = payload_values(payload, fields) if payload is not None else {f.name: ABSENT for f in fields}
+    missing = [f for f in fields if snapshot[f.name] is ABSENT]
+    # Payload enums of the section already on screen are checked against the page in the same snapshot
+    checked = [f for f in fields if payload is not None and open_section is None
+               and f.name in CROSS_CHECK_FIELDS and snapshot[f.name] is not ABSENT]
+    if missing and open_section:
+        await open_section()
+    if missing or checked:
+        page_values = await snapshot_fields(page, missing + checked)
+        snapshot.update({f.name: page_values[f.name] for f in missing})
+        snapshot.update(cross_checked(snapshot, page_values, checked))
+    return snapshot
+
+
+async def extract_campaign(page, draft_id, mode=DEFAULT_MODE, known_version=None):
+    """
+    Extracts a single draft on an already opened page.
+    In "api" mode fields come from the draft JSON the editor fetches, and steps are only
+    clicked for fields the payload lacks.
+    When known_version (the cached last-modified value) matches the payload, the draft is
+    reported as {"Draft ID": ..., "Unchanged": True} without reading any fields.
+    Returns None when the draft could not be opened or is not a valid campaign page.
+    """
+    url = MOENGAGE_BASE_URL + draft_id
+    print(f" Opening {url} in a new tab...") # Use print for subprocess output
+
+    network = NetworkQuietTracker(page)
+    capture = DraftPayloadCapture(page, draft_id) if mode == "api" or known_version else None
+    try:
+        with timing.span("goto", draft_id):
+            await page.goto(url, wait_until="domcontentloaded", timeout=20000)
+    except Exception:
+        print(f" Campaign {draft_id} could not be opened (timeout/redirect). Skipping...")
+        return None
+
+    # Quick check: is this actually a valid campaign page?
+    with timing.span("editor", draft_id) as editor:
+        editor.ok = await readiness.wait_for_selector(page, EDITOR_ROOT_XPATH, "editor")
+    if not editor.ok:
+        print(f" Campaign {draft_id} not found or not in Drafts anymore. Skipping...")
+        return None
+    # The form is filled from the draft XHR, so let it finish before reading
+    with timing.span("network_quiet", draft_id):
+        await network.wait_quiet()
+    print(f" Campaign {draft_id} loaded successfully.")
+
+    payload = None
+    if capture:
+        with timing.span("payload", draft_id) as waited:
+            payload = await capture.wait()
+            waited.ok = payload is not None
+    version = payload_version(payload) if payload else None
+    if known_version and version == known_version:
+        print(f" Draft {draft_id} unchanged since it was cached.")
+        return {"Draft ID": draft_id, "Unchanged": True, "Last Modified": version}
+    if mode != "api":
+        payload = None  # only captured for change detection
+    elif payload is None:
+        print(f" Draft payload for {draft_id} was not captured. Reading all fields from the page.")
+
+    # --- Target Users section ---
+    with timing.span("target_users", draft_id):
+        target_users = resolve_fields(await read_section(page, TARGET_USERS_FIELDS, payload), TARGET_USERS_FIELDS)
+
+    # --- Content section ---
+    with timing.span("content", draft_id):
+        content_data = resolve_fields(
+            await read_section(page, CONTENT_FIELDS, payload, lambda: open_step(
+                page, draft_id, "Content", "Content", "content", CONTENT_READY_XPATH)),
+            CONTENT_FIELDS
+        )
+
+    # --- Schedule and goals section ---
+    with timing.span("schedule", draft_id):
+        schedule_data = build_schedule_data(
+            draft_id,
+            await read_section(page, SCHEDULE_FIELDS, payload, lambda: open_step(
+                page, draft_id, "Schedule and goals", "Schedule and Goals", "schedule", SCHEDULE_READY_XPATH))
+        )
+
+    data = {
+        "Draft ID": draft_id,
+        "Target Users": target_users,
+        "Content": content_data,
+        "Schedule and Goals": schedule_data
+    }
+    data.update(target_users)
+    data["Last Modified"] = version
+    print(f" Extracted data for Draft ID: {draft_id}")
+    return data
+
+
+async def extract_one(context, draft_id, mode=DEFAULT_MODE, known_version=None):
+    """
+    Extracts one draft in a new tab of the logged-in context. Returns (status, data):
+    ("ok", data), ("skipped", None) or ("error", {"Draft ID", "Error"}).
+    """
+    page = None
+    try:
+        page = await context.new_page()
+        with timing.span("draft", draft_id) as draft_span:
+            data = await extract_campaign(page, draft_id, mode, known_version)
+            draft_span.ok = data is not None
+        return ("skipped", None) if data is None else ("ok", data)
 
-        # -------------------- 1. Extract all data columns --------------------
-        # Target Users
-        target = d.get("Target Users", {})
-        target_cols = ["Campaign Name", "User Attribute", "Campaign Tags", "Message Type",
-                       "Audience Selection", "Exclude User", "User Opted Out Toggle",
-                       "Audience Limit Toggle", "Control Group Toggle"]
-        for col in target_cols:
-            row[col] = target.get(col, "N/A")
-
-        # Content
-        content = d.get("Content", {})
-        content_cols = ["SMS Sender", "Template ID", "Message Body"]
-        for col in content_cols:
-            row[col] = content.get(col, "N/A")
-
-        # Schedule and Goals
-        sched = d.get("Schedule and Goals", {})
-        sched_cols = ["Send Campaign Toggle", "Start Date", "Send Time",
-                      "Scheduled Datetime", "Conversion Goals", "Frequency Cap Toggle",
-                      "Request Limit"]
-        for col in sched_cols:
-            row[col] = sched.get(col, "N/A")
-
-        # -------------------- 2. Combine all validation messages into one column --------------------
-        validation_messages = []
-
-        # Target Users validations
-        for key, msg in target.items():
-            if key.endswith("Message") and msg:
-                validation_messages.append(msg)
-
-        # Content validations
-        for key, msg in content.items():
-            if key.endswith("Message") and msg:
-                validation_messages.append(msg)
-
-        # Schedule validations
-        for key, msg in sched.items():
-            if key.endswith("Message") and msg:
-                validation_messages.append(msg)
-
-        row["Validation Message"] = " | ".join(validation_messages) if validation_messages else ""
-
-        # -------------------- 3. Add all dedicated validation columns --------------------
-        # Target Users validations
-        for key, val in target.items():
-            if key.endswith("Validation"):
-                row[key] = val
-
-        # Content validations
-        for key, val in content.items():
-            if key.endswith("Validation"):
-                row[key] = val
-
-        # Schedule validations
-        for key, val in sched.items():
-            if key.endswith("Validation"):
-                row[key] = val
+    except Exception as e:
+        print(f" Unexpected error for Draft ID {draft_id}: {e}")
+        return "error", {"Draft ID": draft_id, "Error": str(e)}
 
-        flat.append(row)
-    return flat
+    finally:
+        if page:
+            await page.close()
 
 
-def process_campaigns(context, draft_ids):
-    all_data = []
+async def process_campaigns(context, draft_ids, concurrency=DEFAULT_CONCURRENCY, mode=DEFAULT_MODE, on_result=None, collect=True, known_versions=None, stop=None):
+    """
+    Extracts every draft in its own tab of the logged-in context.
+    At most `concurrency` tabs are open at once; results keep the order of `draft_ids`
+    and skipped drafts are left out, same as a sequential run.
+    on_result(index, draft_id, status, data) is called as each draft finishes,
+    with status "ok", "skipped" or "error". With collect=False results are only
+    handed to on_result and not kept in memory. known_versions maps draft IDs to cached
+    last-modified values for change detection. When stop() returns true, tabs finish the
+    draft they are on and take no new ones; the rest are left out of the results.
+    """
+    known_versions = known_versions or {}
+    results = [None] * len(draft_ids)
     skipped_campaigns = []
-
-    for draft_id in draft_ids:
-        url = MOENGAGE_BASE_URL + draft_id
-        print(f" Opening {url} in a new tab...") # Use print for subprocess output
-
-        page = None
-        try:
-            page = context.new_page()
+    queue = asyncio.Queue()
+    for index, draft_id in enumerate(draft_ids):
+        queue.put_nowait((index, draft_id))
+
+    async def tab_worker():
+        while True:
+            if stop and stop():
+                return
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=20000)
-                page.wait_for_load_state("networkidle")
-            except Exception:
-                print(f" Campaign {draft_id} could not be opened (timeout/redirect). Skipping...")
-                skipped_campaigns.append(draft_id)
-                continue
+                index, draft_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
 
-            # Quick check: is this actually a valid campaign page?
-            try:
-                page.wait_for_selector(
-                    "//div[contains(@class,'mds-segmentation__section')]",
-                    timeout=5000
-                )
-                print(f" Campaign {draft_id} loaded successfully.")
-            except Exception:
-                print(f" Campaign {draft_id} not found or not in Drafts anymore. Skipping...")
+            status, data = await extract_one(context, draft_id, mode, known_versions.get(draft_id))
+            if status == "skipped":
                 skipped_campaigns.append(draft_id)
-                continue
+            else:
+                results[index] = data
 
-            data = {"Draft ID": draft_id}
-            target_users = {}
+            if on_result:
+                on_result(index, draft_id, status, results[index])
+            if not collect:
+                results[index] = None
 
-            # --- Target Users section ---
-            try:
-                target_users["Campaign Name"] = page.input_value("//input[@placeholder='Campaign Name']")
-            except:
-                target_users["Campaign Name"] = "N/A"
+    workers = max(1, min(concurrency, len(draft_ids)))
+    await asyncio.gather(*(tab_worker() for _ in range(workers)))
 
-            # User Attribute
-            try:
-                target_users["User Attribute"] = page.inner_text("//span[@class='mds-dropdown__trigger__inner__single--value']")
-            except:
-                target_users["User Attribute"] = "N/A"
+    if skipped_campaigns:
+        print(f" Skipped {len(skipped_campaigns)} campaign(s): {', '.join(skipped_campaigns)}")
+    return [data for data in results if data is not None]
 
-            # Campaign Tags
-            try:
-                page.wait_for_selector("//div[@class='mds-input__input--tags__list--item']/span[1]", timeout=5000)
-                tag_elements = page.query_selector_all("//div[@class='mds-input__input--tags__list--item']/span[1]")
-                tags = [el.inner_text().strip() for el in tag_elements]
-                target_users["Campaign Tags"] = ", ".join(tags) if tags else "N/A"
-            except Exception as e:
-                target_users["Campaign Tags"] = "N/A"
-
-            # Message Type
-            try:
-                selected = page.query_selector("//div[@class='dashboard-ui-103k3sf e441wj90']//input[@checked]")
-                if selected:
-                    # get the label text (the parent label’s text)
-                    label = selected.evaluate("el => el.parentElement.innerText")
-                    target_users["Message Type"] = label.strip()
-                else:
-                    target_users["Message Type"] = "N/A"
-            except Exception as e:
-                target_users["Message Type"] = "N/A"
 
-            # Audience Selection
-            try:
-                page.wait_for_selector(
-                    "//div[@class='mds-segmentation__section mds-segmentation__header']//input",
-                    timeout=5000
-                )
-                # Get the label containing the checked input
-                selected_label = page.query_selector(
-                    "//div[@class='mds-segmentation__section mds-segmentation__header']//input[@checked]/.."
-                )
-                if selected_label:
-                    label_text = selected_label.inner_text().strip()
-                    target_users["Audience Selection"] = label_text
-                else:
-                    target_users["Audience Selection"] = "N/A"
-            except Exception:
-                target_users["Audience Selection"] = "N/A"
+async def open_context(browser, storage_state=None, policy=None):
+    """
+    Opens a browser context (optionally restoring a stored session) and its first stealth page.
+    """
+    context = await browser.new_context(viewport={"width": 1920, "height": 1080}, storage_state=storage_state)
+    if policy:
+        await policy.install_playwright(context)
+    page = await context.new_page()
+    await stealth_async(page)
+    return context, page
 
 
-            # Exclude User checkbox
-            try:
-                selected = page.query_selector("//input[@id='exclude-user']")
-                target_users["Exclude User"] = selected.is_checked() if selected else False
-            except:
-                target_users["Exclude User"] = False
+async def login(browser, email, password, db_name, otp_code=None, policy=None, dashboard_timeout_ms=0):
+    """
+    Logs in (reusing the stored session when it is still valid), selects the workspace
+    and returns the authenticated context. dashboard_timeout_ms=0 waits indefinitely
+    for the login to complete (e.g. for a manually typed OTP).
+    """
+    session_state = load_session(email, db_name)
+    context, page = await open_context(browser, session_state, policy)
 
-            # User Opted Out Toggle
-            try:
-                toggle_attr = page.get_attribute("//div[@class='mds-preferenceManagement']//span[@role='switch']", "aria-checked")
-                target_users["User Opted Out Toggle"] = toggle_attr == "true"
-            except:
-                target_users["User Opted Out Toggle"] = False
+    await page.goto(MOENGAGE_AUTH_URL, wait_until="domcontentloaded")
 
-            # Audience Limit Toggle
-            try:
-                toggle_attr = page.get_attribute("//span[@aria-labelledby='Limit the number of users who will receive the campaign.']", "aria-checked")
-                target_users["Audience Limit Toggle"] = toggle_attr == "true"
-            except:
-                target_users["Audience Limit Toggle"] = False
+    # Check if already logged in (only possible with a stored session)
+    logged_in = False
+    if session_state:
+        try:
+            await page.wait_for_selector("div.mds-header__user-profile", timeout=5000)
+            logged_in = True
+            print("Already logged in with stored session, skipping login step.")
+        except TimeoutError:
+            print("Stored session expired, falling back to full login...")
+            clear_session(email, db_name)
+            await context.close()
+            context, page = await open_context(browser, policy=policy)
+            await page.goto(MOENGAGE_AUTH_URL, wait_until="domcontentloaded")
+
+    if not logged_in:
+        print("Not logged in, attempting login...")
+        try:
+            # wait for email field to exist and be visible
+            await page.wait_for_selector("input#email", timeout=30000, state="visible")
+            await page.fill("input#email", email)
+        except Exception as e:
+            print(f" Could not find #email field: {e}")
+            await page.screenshot(path="debug_email.png")
+            with open("debug_email.html", "w", encoding="utf-8") as f:
+                f.write(await page.content())
+            raise
+        await page.fill("#password", password)
+        await page.click('button[type="submit"]')
+        await page.wait_for_load_state("networkidle", timeout=15000)
+
+        # Detect 2FA page by presence of OTP inputs container
+        try:
+            await page.wait_for_selector("#passCodeInput", timeout=5000)
+            print("2FA verification required!")
+            if otp_code and len(otp_code) == 6 and otp_code.isdigit():
+                print("Filling OTP code automatically...")
+                await enter_otp_code(page, otp_code)
+                print("OTP submitted, waiting for login to complete...")
+            else:
+                print("No valid OTP code provided. Please enter the 6-digit code manually in the browser window.")
+            
+        except TimeoutError:
+            print("No 2FA prompt detected. Waiting for login to complete...")
 
-        
-            # Control Group Toggle
-            try:
-                toggle_attr = page.get_attribute("//span[@aria-labelledby='Campaign control group']", "aria-checked")
-                target_users["Control Group Toggle"] = toggle_attr == "true"
-            except:
-                target_users["Control Group Toggle"] = False
+        # Wait for the database dropdown to appear (indefinitely by default)
+        await page.wait_for_selector("//div[contains(@class,'ignore-lang') and contains(@class,'tether-target')]", timeout=dashboard_timeout_ms)
+        print("Login successful, database dropdown loaded.")
 
-            # --- Content section ---
-            try:
-                content_step_button = page.wait_for_selector("//div[contains(@class,'mds-steps__item') and .//div[text()='Content']]//div[@role='button']", timeout=10000)
-                content_step_button.click()
-                page.wait_for_load_state("domcontentloaded")
-                page.wait_for_timeout(1000)
-            except TimeoutError:
-                print(f" Could not click Content step for Draft ID {draft_id}. Proceeding without content data.")
-            except Exception as e:
-                print(f" Error clicking Content step for Draft ID {draft_id}: {e}")
-
-            content_data = {}
-            sms_sender_span = page.query_selector("//div[@placeholder='Select a connector']//span[@class='mds-dropdown__trigger__inner__single--value']")
-            content_data["SMS Sender"] = sms_sender_span.inner_text() if sms_sender_span else "N/A"
-
-            template_id_input = page.query_selector("//input[@id='template_id']")
-            content_data["Template ID"] = template_id_input.input_value() if template_id_input else "N/A"
-
-            message_body_div = page.query_selector("//div[@id='personalization_container']")
-            content_data["Message Body"] = message_body_div.inner_text() if message_body_div else "N/A"
-
-            # --- Schedule and goals section ---
-            try:
-                schedule_step_button = page.wait_for_selector("//div[contains(@class,'mds-steps__item') and .//div[text()='Schedule and goals']]//div[@role='button']", timeout=10000)
-                schedule_step_button.click()
-                page.wait_for_load_state("domcontentloaded")
-                page.wait_for_timeout(1000)
-            except TimeoutError:
-                print(f" Could not click Schedule and Goals step for Draft ID {draft_id}. Proceeding without schedule data.")
-            except Exception as e:
-                print(f" Error clicking Schedule and Goals step for Draft ID {draft_id}: {e}")
-
-            schedule_data = {}
-
-            selected_schedule_input = page.query_selector("//input[@name='gCampaignType' and @checked]")
-            if selected_schedule_input:
-                sid = selected_schedule_input.get_attribute("id")
-                if sid == "asap":
-                    schedule_data["Send Campaign Toggle"] = "As soon as possible"
-                elif sid == "specificDateTime":
-                    schedule_data["Send Campaign Toggle"] = "At specific date and time"
-                else:
-                    schedule_data["Send Campaign Toggle"] = sid
-            else:
-                schedule_data["Send Campaign Toggle"] = "N/A"
+    await select_workspace(page, db_name)
+    await store_session(context, email, db_name)
+
+    await page.close()
+    return context
 
-            preferred_time_label = page.query_selector("//div[contains(@class,'mds-csc__sch__body__section')]//label[input[@name='startType'] and input[@checked]]")
-            schedule_data["Preferred Time"] = preferred_time_label.inner_text().strip() if preferred_time_label else "N/A"
 
-            start_date_input = page.query_selector("//input[@placeholder='Select date']")
-            schedule_data["Start Date"] = start_date_input.input_value() if start_date_input else "N/A"
+async def select_workspace(page, db_name):
+    """
+    Switches the logged-in dashboard page to the given workspace (database).
+    """
+    try:
+        # Open the workspace dropdown
+        await page.click(
+        "//div[@class='ignore-lang tether-target tether-enabled tether-element-attached-top tether-element-attached-right tether-target-attached-bottom tether-target-attached-right tether-out-of-bounds tether-out-of-bounds-left tether-out-of-bounds-top']"
+    )
+        
+        # Click the DB option by visible text
+        await page.click(f"text={db_name}")
+        print(f" Database option clicked: {db_name}")
+
+        # Handle "Change Workspace" confirmation popup if it appears
+        try:
+            await page.wait_for_selector("//button[normalize-space()='Change Workspace']", timeout=3000)
+            await page.click("//button[normalize-space()='Change Workspace']")
+            print(f" Changed workspace to: {db_name}")
+        except TimeoutError:
+            # No popup means already in correct DB
+            print(f"Already in database: {db_name}, no confirmation needed.")
+    except Exception as e:
+        print(f" Could not select database: {e}")
+        raise RuntimeError(f"Could not select database {db_name}: {e}")
+
+
+async def store_session(context, email, db_name):
+    # Keep the authenticated session so the next run can skip login and OTP
+    try:
+        save_session(email, db_name, await context.storage_state())
+    except Exception as e:
+        print(f" Could not store session: {e}")
+
+
+async def open_workspace(browser, email, storage_state, db_name, policy=None):
+    """
+    Opens one more workspace for an account that is already authenticated: a new, isolated
+    context from the account's storage state (or the workspace's own stored session),
+    switched to db_name. No second login or OTP.
+    """
+    context, page = await open_context(browser, load_session(email, db_name) or storage_state, policy)
+    try:
+        await page.goto(MOENGAGE_AUTH_URL, wait_until="domcontentloaded")
+        if not await readiness.wait_for_selector(page, DASHBOARD_READY_CSS, "dashboard"):
+            raise RuntimeError(f"Session was not accepted when opening workspace {db_name}")
+        await select_workspace(page, db_name)
+    except Exception:
+        await context.close()
+        raise
+    await store_session(context, email, db_name)
+    await page.close()
+    return context
+
+
+async def login_workspaces(browser, email, password, workspaces, otp_code=None, policy=None, dashboard_timeout_ms=0):
+    """
+    Authenticates once and returns {workspace: context}, one isolated context per workspace
+    in the same browser. The first workspace goes through login(); the others are opened
+    in parallel from its session.
+    """
+    first, *others = workspaces
+    contexts = {first: await login(browser, email, password, first, otp_code, policy, dashboard_timeout_ms)}
+    if others:
+        state = await contexts[first].storage_state()
+        opened = await asyncio.gather(
+            *(open_workspace(browser, email, state, ws, policy) for ws in others), return_exceptions=True
+        )
+        failed = [result for result in opened if isinstance(result, Exception)]
+        for ws, result in zip(others, opened):
+            if not isinstance(result, Exception):
+                contexts[ws] = result
+        if failed:
+            for context in contexts.values():
+                await context.close()
+            raise failed[0]
+    return contexts
+
+
+def campaign_row(data):
+    """
+    Flattened row for a single extracted draft; validation runs over the whole batch in write_results.
+    """
+    return flatten_campaign_data_with_single_message([data])[0]
 
-            hours_input = page.query_selector("(//div[contains(@class,'mds-timepicker__col')]//input[@type='number'])[1]")
-            hours = hours_input.input_value() if hours_input else "N/A"
 
-            minutes_input = page.query_selector("(//div[contains(@class,'mds-timepicker__col')]//input[@type='number'])[2]")
-            minutes = minutes_input.input_value() if minutes_input else "N/A"
+def progress_positions(workspace_drafts):
+    """
+    {workspace: {draft_id: progress index}}: one index space over the drafts of every
+    workspace in input order, shared by cache-served and extracted drafts.
+    """
+    positions, offset = {}, 0
+    for workspace, draft_ids in workspace_drafts.items():
+        positions[workspace] = {draft_id: offset + i for i, draft_id in enumerate(draft_ids)}
+        offset += len(draft_ids)
+    return positions
 
-            am_pm_button = page.query_selector("//div[contains(@class,'mds-button-group')]//button[contains(@class,'mds-button--primary')]")
-            am_pm = am_pm_button.inner_text() if am_pm_button else "N/A"
 
-            if hours != "N/A" and minutes != "N/A" and am_pm != "N/A":
-                schedule_data["Send Time"] = f"{hours}:{minutes} {am_pm}"
-            else:
-                schedule_data["Send Time"] = "N/A"
-
-            date_str = schedule_data["Start Date"]
-            time_str = schedule_data["Send Time"]
-
-            if date_str != "N/A" and time_str != "N/A":
-                dt_str = f"{date_str} {time_str}"
-                try:
-                    schedule_data["Scheduled Datetime"] = datetime.strptime(dt_str, "%d %b %Y %I:%M %p")
-                except ValueError:
-                    print(f" Datetime parsing failed for Draft ID {draft_id} with '{dt_str}'. Setting to N/A.")
-                    schedule_data["Scheduled Datetime"] = "N/A"
-            else:
-                schedule_data["Scheduled Datetime"] = "N/A"
+def result_callback(emitter, journal=None, cache=None, workspace=None, cached_entries=None, positions=None):
+    """
+    process_campaigns on_result hook: resolves unchanged drafts from the cache, caches
+    fresh rows, records each finished draft in the run journal and emits its progress event.
+    positions (see progress_positions) gives the event index of each draft.
+    """
+    def on_result(index, draft_id, status, data):
+        from_cache = False
+        if data and data.get("Unchanged"):
+            row = dict(cached_entries[draft_id]["row"])
+            cache.touch(workspace, draft_id)
+            from_cache = True
+        else:
+            row = campaign_row(data) if data else None
+            if cache and status == "ok":
+                cache.put(workspace, draft_id, row, data.get("Last Modified"))
+        if row is not None:
+            row["From Cache"] = from_cache
+        if journal:
+            journal.record(draft_id, status, row)
+        error = data.get("Error") if data else None
+        index = positions[draft_id] if positions else index
+        emitter.draft(index, draft_id, status, row=row, error=error, workspace=workspace)
+    return on_result
+
+
+def serve_from_cache(cache, workspace, draft_ids, emitter, journal=None, positions=None):
+    """
+    Answers drafts whose cached row is still within the TTL without opening them.
+    Returns (draft IDs still to extract, cache entries for them).
+    """
+    if cache is None:
+        return list(draft_ids), {}
+    entries = cache.get_many(workspace, draft_ids)
+    to_fetch = []
+    for index, draft_id in enumerate(draft_ids):
+        entry = entries.get(draft_id)
+        if entry is None or not entry["fresh"]:
+            to_fetch.append(draft_id)
+            continue
+        row = dict(entry["row"], **{"From Cache": True})
+        if journal:
+            journal.record(draft_id, "ok", row)
+        emitter.draft(positions[draft_id] if positions else index, draft_id, "ok", row=row, workspace=workspace)
+    if len(to_fetch) < len(draft_ids):
+        print(f" {len(draft_ids) - len(to_fetch)} draft(s) in {workspace} served from the result cache.")
+    return to_fetch, {d: entries[d] for d in to_fetch if d in entries}
+
+
+async def recycle_context(context, policy=None):
+    """
+    Replaces a logged-in context with a fresh one in the same browser, carrying its
+    cookies and local storage over. Returns the new context.
+    """
+    state = await context.storage_state()
+    browser = context.browser
+    await context.close()
+    context, page = await open_context(browser, state, policy)
+    await page.close()
+    return context
 
-            conversion_goal_div = page.query_selector("//div[@class='mds-cg']//div[contains(@class,'mds-cg__section')]")
-            schedule_data["Conversion Goals"] = conversion_goal_div.inner_text() if conversion_goal_div else "N/A"
 
-            frequency_cap_toggle = page.query_selector("//span[@role='switch' and ../input[@name='Frequency capping']]")
-            schedule_data["Frequency Cap Toggle"] = frequency_cap_toggle.get_attribute("aria-checked") == "true" if frequency_cap_toggle else False
+async def extract_drafts(context, workspace, draft_ids, emitter, journal, cache, cached, concurrency=DEFAULT_CONCURRENCY, mode=DEFAULT_MODE, positions=None, chunk_size=DRAFT_ID_CHUNK_SIZE, guard=None, policy=None):
+    """
+    Extracts draft_ids in one logged-in workspace context, chunk_size drafts at a time,
+    so the tab queue and cached-version lookups stay bounded for very long ID lists.
+    With a MemoryGuard the context is recycled whenever the guard says it is due.
+    Returns the context in use at the end (a new one if it was recycled).
+    """
+    on_result = result_callback(emitter, journal, cache, workspace, cached, positions)
+    for _, chunk in chunked(draft_ids, chunk_size):
+        known_versions = {d: cached[d]["last_modified"] for d in chunk if d in cached and cached[d]["last_modified"]}
+        done = set()
+
+        def record(index, draft_id, status, data):
+            done.add(draft_id)
+            if guard:
+                guard.draft_done(workspace)
+            on_result(index, draft_id, status, data)
+
+        todo = chunk
+        while todo:
+            await process_campaigns(context, todo, concurrency, mode, record, collect=False,
+                                    known_versions=known_versions, stop=guard and (lambda: guard.due(workspace)))
+            todo = [d for d in todo if d not in done]
+            reason = guard and guard.due(workspace)
+            if reason:
+                context = await recycle_context(context, policy)
+                guard.recycled(workspace, reason)
+    return context
+
+
+async def extract_sharded(contexts, to_fetch, emitter, journals, cache, cached, shard_count, concurrency=DEFAULT_CONCURRENCY, mode=DEFAULT_MODE, positions=None, guard=None):
+    """
+    Hands the drafts of every workspace to shard_count extractor processes, which reuse the
+    logged-in sessions of contexts. Results are journaled and cached here, as they arrive.
+    """
+    storage_states = {}
+    for ws in to_fetch:
+        storage_states[ws] = await contexts[ws].storage_state()
+        await contexts[ws].close()
+    work, callbacks = [], {}
+    for ws, ids in to_fetch.items():
+        callbacks[ws] = result_callback(emitter, journals[ws], cache, ws, cached[ws], (positions or {}).get(ws))
+        work.extend((ws, index, d, cached[ws].get(d, {}).get("last_modified")) for index, d in enumerate(ids))
 
-            request_limit_input = page.query_selector("//input[@placeholder='Requests per/min...']")
-            try:
-                schedule_data["Request Limit"] = int(request_limit_input.input_value()) if request_limit_input else None
-            except ValueError:
-                schedule_data["Request Limit"] = None
-
-            data = {
-                "Draft ID": draft_id,
-                "Target Users": target_users,
-                "Content": content_data,
-                "Schedule and Goals": schedule_data
-            }
-            data.update(target_users)
-            all_data.append(data)
-            print(f" Extracted data for Draft ID: {draft_id}")
+    def on_result(ws, index, draft_id, status, data):
+        callbacks[ws](index, draft_id, status, data)
 
-        except Exception as e:
-            print(f" Unexpected error for Draft ID {draft_id}: {e}")
-            all_data.append({"Draft ID": draft_id, "Error": str(e)})
+    await run_shards(shard_count, work, storage_states, mode, concurrency, on_result, timing.recorder(), guard)
 
-        finally:
-            if page:
-                page.close()
 
-    return all_data
+def run_scraper(email, password, draft_ids, output_csv_path, db_name, otp_code=None, concurrency=DEFAULT_CONCURRENCY, mode=DEFAULT_MODE, progress=False, run_id=None, resume=False, use_cache=RESULT_CACHE_ENABLED, invalidate_cache=False, formats=None, workspace_drafts=None, shards=None, diff_against=None, discover=None):
+    """
+    workspace_drafts ({workspace: draft IDs}) extracts several workspaces in one run after a
+    single login; db_name and draft_ids are then ignored.
+    shards: number of extractor processes, "auto" to size it from CPUs and memory,
+    or None to extract in this process.
+    diff_against: a previous result file or run ID; the changes from it are written next to the output.
+    discover: discover_drafts filters (may be empty) to extract every listed draft of the
+    workspaces in db_name (comma-separated) instead of given IDs.
+    """
+    if discover is not None:
+        workspace_drafts = {ws.strip(): [] for ws in db_name.split(",") if ws.strip()}
+    workspace_drafts = workspace_drafts or {db_name: draft_ids}
+    asyncio.run(_run_scraper(email, password, workspace_drafts, output_csv_path, otp_code, concurrency, mode, progress, run_id, resume, use_cache, invalidate_cache, formats, shards, diff_against, discover))
 
 
-def run_scraper(email, password, draft_ids, output_csv_path, db_name,otp_code=None):
-    with sync_playwright() as p:
-        # Launch browser in non-headless mode so user can interact for OTP
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
-        page = context.new_page()
-        stealth_sync(page)
+async def discover_workspaces(contexts, filters):
+    """
+    {workspace: draft IDs} from the draft listing of every logged-in workspace context.
+    filters are discover_drafts keyword arguments (tag, created_from, created_to, name_pattern).
+    """
+    listed = await asyncio.gather(*(discover_drafts(context, **filters) for context in contexts.values()))
+    workspace_drafts = {}
+    for ws, drafts in zip(contexts, listed):
+        print(f" Found {len(drafts)} draft(s) in {ws}.")
+        if drafts:
+            workspace_drafts[ws] = [d["Draft ID"] for d in drafts]
+    if not workspace_drafts:
+        raise RuntimeError("No drafts matched in the selected workspace(s)")
+    return workspace_drafts
+
+
+async def _run_scraper(email, password, workspace_drafts, output_csv_path, otp_code, concurrency, mode, progress, run_id, resume, use_cache, invalidate_cache, formats, shards=None, diff_against=None, discover=None):
+    emitter = ProgressEmitter(enabled=progress)
+    # Read before this run's output can overwrite it
+    baseline = load_baseline(diff_against) if diff_against else None
+    async with async_playwright() as p:
+        # Headless: the OTP comes in as otp_code (or a stored session skips it), nobody types into the browser
+        browser = await p.chromium.launch(headless=True)
+        policy = ResourcePolicy()
+        guard = MemoryGuard()
+        contexts, group_id, cache, spans = {}, None, None, None
+        discovery = {}
 
         try:
-            page.goto("https://dashboard-03.moengage.com/v4/#/auth", wait_until="domcontentloaded")
-
-            # Check if already logged in
-            try:
-                page.wait_for_selector("div.mds-header__user-profile", timeout=5000)
-                print("Already logged in, skipping login step.")
-            except TimeoutError:
-                print("Not logged in, attempting login...")
-                try:
-                    # wait for email field to exist and be visible
-                    page.wait_for_selector("input#email", timeout=30000, state="visible")
-                    page.fill("input#email", email)
-                except Exception as e:
-                    print(f" Could not find #email field: {e}")
-                    page.screenshot(path="debug_email.png")
-                    with open("debug_email.html", "w", encoding="utf-8") as f:
-                        f.write(page.content())
-                    raise
-                page.fill("#password", password)
-                page.click('button[type="submit"]')
-                page.wait_for_load_state("networkidle", timeout=15000)
-
-                # Detect 2FA page by presence of OTP inputs container
-                try:
-                    page.wait_for_selector("#passCodeInput", timeout=5000)
-                    print("2FA verification required!")
-                    if otp_code and len(otp_code) == 6 and otp_code.isdigit():
-                        print("Filling OTP code automatically...")
-                        # Fill each digit into the 6 separate inputs with ids 0 to 5
-                        for i, digit in enumerate(otp_code):
-                            page.fill(f"input[id='{i}']", digit)
-                        # Click the Verify button
-                        page.click("button.twofa-action-btn")
-                        print("OTP submitted, waiting for login to complete...")
-                    else:
-                        print("No valid OTP code provided. Please enter the 6-digit code manually in the browser window.")
-                    
-                except TimeoutError:
-                    print("No 2FA prompt detected. Waiting for login to complete...")
-
-                # Wait indefinitely for the database dropdown to appear
-                page.wait_for_selector("//div[contains(@class,'ignore-lang') and contains(@class,'tether-target')]", timeout=0)
-                print("Login successful, database dropdown loaded.")
-
-            # --- Select database/workspace ---
-            try:
-                # Open the workspace dropdown
-                page.click(
-                "//div[@class='ignore-lang tether-target tether-enabled tether-element-attached-top tether-element-attached-right tether-target-attached-bottom tether-target-attached-right tether-out-of-bounds tether-out-of-bounds-left tether-out-of-bounds-top']"
-            )
-                
-                # Click the DB option by visible text
-                page.click(f"text={db_name}")
-                print(f" Database option clicked: {db_name}")
-
-                # Handle "Change Workspace" confirmation popup if it appears
-                try:
-                    page.wait_for_selector("//button[normalize-space()='Change Workspace']", timeout=3000)
-                    page.click("//button[normalize-space()='Change Workspace']")
-                    print(f" Changed workspace to: {db_name}")
-                except TimeoutError:
-                    # No popup means already in correct DB
-                    print(f"Already in database: {db_name}, no confirmation needed.")
-            except Exception as e:
-                print(f" Could not select database: {e}")
-                sys.exit(1)
-
-            # After successful login and DB selection, proceed to extract campaigns
-            all_data = process_campaigns(context, draft_ids)
-            all_data = add_validations(all_data)
-            flat_data = flatten_campaign_data_with_single_message(all_data)
-            df = pd.DataFrame(flat_data)
-            df.to_csv(output_csv_path, index=False)
-            print(f"Data successfully extracted and saved to {output_csv_path}")
+            if discover is not None and not resume:
+                # The draft IDs come from the workspaces' listings, so the login comes first
+                started = time.monotonic()
+                contexts = await login_workspaces(browser, email, password, list(workspace_drafts), otp_code, policy)
+                discovery["login"] = time.monotonic() - started
+                started = time.monotonic()
+                workspace_drafts = await discover_workspaces(contexts, discover)
+                discovery["listing"] = time.monotonic() - started
+
+            # Every finished draft goes to the run journal, so a crash or timeout loses nothing
+            if resume:
+                journals = RunJournal.open_group(run_id)
+            else:
+                journals = RunJournal.create_group(workspace_drafts, run_id)
+            group_id = next(iter(journals.values())).group_id
+            print(f"Run ID: {group_id} (resume with --resume {group_id})")
+            pending = {ws: journal.pending_ids() for ws, journal in journals.items()}
+            if resume:
+                done = sum(len(journal.draft_ids) for journal in journals.values()) - sum(map(len, pending.values()))
+                print(f"Resuming: {done} draft(s) already done, {sum(map(len, pending.values()))} to go.")
+
+            cache = ResultCache() if use_cache or invalidate_cache else None
+            if invalidate_cache:
+                for ws, ids in pending.items():
+                    cache.invalidate(ws, ids)
+                print(f"Dropped cached results for {sum(map(len, pending.values()))} draft(s).")
+                if not use_cache:
+                    cache.close()
+                    cache = None
+
+            spans = timing.use(timing.SpanRecorder(journals[next(iter(journals))].spans_path))
+            for phase, seconds in discovery.items():
+                spans.record(phase, seconds, workspaces=len(contexts))
+
+            emitter.start(sum(map(len, pending.values())))
+            # Drafts cached within the TTL are answered without logging in or opening them.
+            # Progress indexes run on across workspaces.
+            to_fetch, cached = {}, {}
+            positions = progress_positions(pending)
+            for ws, ids in pending.items():
+                fetch, cached[ws] = serve_from_cache(cache, ws, ids, emitter, journals[ws], positions[ws])
+                if fetch:
+                    to_fetch[ws] = fetch
+
+            if to_fetch:
+                if not contexts:
+                    # One login; every workspace then gets its own isolated context in this browser
+                    with spans.span("login", workspaces=len(to_fetch)):
+                        contexts = await login_workspaces(browser, email, password, list(to_fetch), otp_code, policy)
+
+                total = sum(map(len, to_fetch.values()))
+                shard_count = default_shards(total) if shards == "auto" else min(shards or 1, total)
+                if shard_count > 1:
+                    await extract_sharded(contexts, to_fetch, emitter, journals, cache, cached,
+                                          shard_count, concurrency, mode, positions, guard)
+                else:
+                    # After successful login and DB selection, extract all workspaces in parallel
+                    await asyncio.gather(*(
+                        extract_drafts(contexts[ws], ws, ids, emitter, journals[ws], cache, cached[ws],
+                                       concurrency, mode, positions[ws], guard=guard, policy=policy)
+                        for ws, ids in to_fetch.items()
+                    ))
+
+            with spans.span("output"):
+                rows, outputs = write_results(journals, output_csv_path, formats)
+            print(f"Data successfully extracted and saved to {', '.join(outputs.values())}")
+            if baseline is not None:
+                with spans.span("diff"):
+                    diff = diff_frames(baseline, read_result(outputs))
+                    diff_outputs = write_diff(diff, output_csv_path, formats)
+                for line in summary_lines(diff_summary(diff)):
+                    print(line)
+                print(f"Changes saved to {', '.join(diff_outputs.values())}")
+            for line in readiness.wait_report.lines() + policy.lines() + payload_report.lines() + spans.lines() + guard.lines():
+                print(line)
+            emitter.timing({**spans.summary(), "memory": guard.summary()})
+            emitter.done(next(iter(outputs.values())), rows, outputs)
 
         except Exception as e:
             print(f"An error occurred during the Playwright session: {e}")
+            if group_id:
+                print(f"Completed drafts are kept; resume with --resume {group_id}")
+            emitter.error(str(e))
             sys.exit(1)  # Exit with an error code to signal failure to the parent process
         finally:
             if browser:
-                browser.close()
+                await browser.close()
+            if cache:
+                cache.close()
+            if spans:
+                spans.close()
 
-def enter_otp_code(page, otp_code):
+async def enter_otp_code(page, otp_code):
     if len(otp_code) != 6 or not otp_code.isdigit():
         raise ValueError("OTP code must be a 6-digit string of digits.")
 
+    # Fill each digit into the 6 separate inputs with ids 0 to 5
     for i, digit in enumerate(otp_code):
         selector = f"input[id='{i}']"
-        page.fill(selector, digit)
+        await page.fill(selector, digit)
 
     # Click the Verify button
-    page.click("button.twofa-action-btn")
-
-if __name__ == "__main__":
-    # Order: email, password, db_name, draft_ids, csv_filename
-    if len(sys.argv) < 7:
-        print("Usage: python scrape.py <email> <password> <db_name> <comma_separated_draft_ids> <output_csv_path> <otp_code>")
-        sys.exit(1)
+    await page.click("button.twofa-action-btn")
+
+def main():
+    # Order: email, password, db_name, draft_ids, csv_filename, otp_code
+    parser = argparse.ArgumentParser(
+        usage="python scrape.py <email> <password> <db_name> <comma_separated_draft_ids> <output_csv_path> <otp_code> [--concurrency N] [--mode dom|api] [--progress] [--run-id ID | --resume ID] [--no-cache] [--invalidate-cache] [--format csv,parquet,...] [--workspace-map FILE] [--draft-ids-file FILE] [--shards [K]] [--diff-against RESULT|RUN_ID] [--discover [--tag TAG] [--created-from DATE] [--created-to DATE] [--name PATTERN]]"
+    )
+    parser.add_argument("email")
+    parser.add_argument("password")
+    parser.add_argument("db_name")
+    parser.add_argument("draft_ids")
+    parser.add_argument("output_csv_path")
+    parser.add_argument("otp_code")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Number of drafts extracted at once (default: %(default)s)")
+    parser.add_argument("--mode", choices=EXTRACTION_MODES, default=DEFAULT_MODE,
+                        help="dom: read every step from the page; api: read the draft JSON payload (default: %(default)s)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Emit JSON-lines progress events on stdout")
+    run_group = parser.add_mutually_exclusive_group()
+    run_group.add_argument("--run-id", help="ID for the run journal of a new run (default: generated)")
+    run_group.add_argument("--resume", metavar="RUN_ID",
+                           help="Resume a journaled run; its draft IDs are used and completed drafts are skipped")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Extract every draft even if a recent result is cached")
+    parser.add_argument("--invalidate-cache", action="store_true",
+                        help="Drop cached results for these drafts before running")
+    parser.add_argument("--format", default=",".join(DEFAULT_FORMATS),
+                        help=f"Comma-separated output formats: {', '.join(OUTPUT_FORMATS)} (default: %(default)s); "
+                             "output_csv_path's extension is replaced per format")
+    parser.add_argument("--workspace-map", metavar="FILE",
+                        help='JSON file {"workspace": ["draft ID", ...] or "ID file", ...}: extract several workspaces in one run '
+                             "after a single login (pass - for db_name and draft_ids)")
+    parser.add_argument("--draft-ids-file", metavar="FILE",
+                        help="File with one draft ID per line, for long lists (pass - for draft_ids)")
+    parser.add_argument("--shards", nargs="?", const="auto", metavar="K",
+                        help="Extract in K processes, each with its own browser and --concurrency tabs, "
+                             "sharing the login; without K, sized from CPUs and free memory")
+    parser.add_argument("--diff-against", metavar="RESULT|RUN_ID",
+                        help="Compare with a previous result file or run and write only the changed drafts "
+                             "and fields to <output>_diff")
+    parser.add_argument("--discover", action="store_true",
+                        help="Extract every SMS draft listed in the workspace(s) instead of given IDs "
+                             "(pass - for draft_ids; db_name may list several workspaces, comma-separated)")
+    parser.add_argument("--tag", help="With --discover: only drafts with this campaign tag")
+    parser.add_argument("--created-from", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="With --discover: only drafts created on or after this date")
+    parser.add_argument("--created-to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="With --discover: only drafts created on or before this date")
+    parser.add_argument("--name", metavar="PATTERN",
+                        help='With --discover: only drafts whose name matches this glob, e.g. "*EMI*"')
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    shards = args.shards
+    if shards not in (None, "auto"):
+        if not shards.isdigit() or int(shards) < 1:
+            parser.error("--shards takes a positive number")
+        shards = int(shards)
+
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    if not formats or any(f not in OUTPUT_FORMATS for f in formats):
+        parser.error(f"--format takes one or more of: {', '.join(OUTPUT_FORMATS)}")
+
+    discover = None
+    if args.discover:
+        if args.workspace_map or args.draft_ids_file:
+            parser.error("--discover lists the draft IDs itself; drop --workspace-map and --draft-ids-file")
+        discover = {"tag": args.tag, "created_from": args.created_from, "created_to": args.created_to,
+                    "name_pattern": args.name}
+    elif any((args.tag, args.created_from, args.created_to, args.name)):
+        parser.error("--tag, --created-from, --created-to and --name need --discover")
+
+    workspace_drafts = None
+    if args.discover:
+        draft_ids = []
+    elif args.workspace_map:
+        with open(args.workspace_map, encoding="utf-8") as f:
+            workspace_map = json.load(f)
+        # Each workspace maps to a list of IDs or to an ID file (one per line)
+        workspace_drafts = {
+            ws: read_id_file(ids) if isinstance(ids, str) else list(dict.fromkeys(str(d).strip() for d in ids if str(d).strip()))
+            for ws, ids in workspace_map.items()
+        }
+        workspace_drafts = {ws: ids for ws, ids in workspace_drafts.items() if ids}
+        if not workspace_drafts and not args.resume:
+            parser.error("--workspace-map has no draft IDs")
+        draft_ids = []
+    else:
+        if args.draft_ids_file:
+            draft_ids = read_id_file(args.draft_ids_file)
+        else:
+            draft_ids = [d.strip() for d in args.draft_ids.split(',') if d.strip()]
+        if not draft_ids and not args.resume:
+            parser.error("at least one draft ID is required")
 
-    email = sys.argv[1]
-    password = sys.argv[2]
-    db_name = sys.argv[3]
-    draft_ids_str = sys.argv[4]
-    output_csv_path = sys.argv[5]
-    otp_code = sys.argv[6]
+    run_scraper(args.email, args.password, draft_ids, args.output_csv_path, args.db_name, args.otp_code,
+                args.concurrency, args.mode, args.progress, args.resume or args.run_id, bool(args.resume),
+                RESULT_CACHE_ENABLED and not args.no_cache, args.invalidate_cache, formats, workspace_drafts, shards, args.diff_against, discover)
 
-    draft_ids = [d.strip() for d in draft_ids_str.split(',') if d.strip()]
 
-    run_scraper(email, password, draft_ids, output_csv_path, db_name, otp_code)
+if __name__ == "__main__":
+    main()
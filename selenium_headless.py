@@ -1,116 +1,249 @@
 import logging
 import os
 import sys
+import threading
 import time
-import pandas as pd
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-# ==========================================
-# LOGGING SETUP
-# ==========================================
-logging.basicConfig(
-    filename='selenium_debug.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logging.info("=== Starting MoEngage Headless Scraper ===")
+from collections import Counter
+import readiness
+import timing
+from readiness import EDITOR_ROOT_XPATH, DASHBOARD_READY_CSS
+from resource_policy import ResourcePolicy
+from progress import ProgressEmitter
+from run_journal import RunJournal
+from output_schema import write_results
+from result_cache import ResultCache, RESULT_CACHE_ENABLED
+from session_store import load_session, save_session, clear_session, to_selenium_cookies, from_selenium, local_storage_for
+from draft_id_input import read_id_file
+from memory_guard import MemoryGuard
+from dom_snapshot import ABSENT, TARGET_USERS_FIELDS, CONTENT_FIELDS, snapshot_fields_selenium, resolve_fields
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
-MOENGAGE_URL = "https://dashboard-03.moengage.com/"
-SMS_CREATE_BASE_URL = "https://dashboard-03.moengage.com/v4/#/sms/create?type=one-time&draftId="
+MOENGAGE_ORIGIN = os.getenv("MOENGAGE_DASHBOARD_URL", "https://dashboard-03.moengage.com").rstrip("/")  # mock_dashboard.py for benchmarks
+MOENGAGE_URL = MOENGAGE_ORIGIN + "/"
+OTP_INPUT_XPATH = "//input[@id='otp_code']"  # Replace XPath if needed
+SMS_CREATE_BASE_URL = MOENGAGE_ORIGIN + "/v4/#/sms/create?type=one-time&draftId="
 
 USERNAME = os.getenv("MOENGAGE_EMAIL", "").strip()
 PASSWORD = os.getenv("MOENGAGE_PASSWORD", "").strip()
 WORKSPACE = os.getenv("WORKSPACE", "Collections_TC").strip()
 DRAFT_IDS = [d.strip() for d in os.getenv("DRAFT_IDS", "").split(",") if d.strip()]
+DRAFT_IDS_FILE = os.getenv("DRAFT_IDS_FILE", "").strip()  # one ID per line; preferred over DRAFT_IDS for long lists
 OTP_CODE = os.getenv("OTP_CODE", "").strip()  # Step 3: OTP
-OUTPUT_FILE = f"{WORKSPACE}_campaigns_headless.csv"
+RUN_ID = os.getenv("RUN_ID", "").strip() or None  # Run journal ID for a new run (generated if empty)
+RESUME_RUN_ID = os.getenv("RESUME_RUN_ID", "").strip()  # Resume this journaled run instead
+OUTPUT_FILE = f"{WORKSPACE}_campaigns_headless.csv"  # base name; OUTPUT_FORMATS picks the files written
+PROGRESS_EVENTS = os.getenv("PROGRESS_EVENTS", "").strip() == "1"  # JSON-lines progress on stdout
+CONNECTIVITY_PROBE_URL = os.getenv("CONNECTIVITY_PROBE_URL", "").strip()  # e.g. https://www.google.com; empty skips it
+CONNECTIVITY_PROBE_TIMEOUT = 10
 
-if not USERNAME or not PASSWORD or not DRAFT_IDS:
-    logging.error("Missing credentials or draft IDs. Please check environment variables.")
-    sys.exit(1)
+# Fields read from each draft, with the Playwright extractor's XPaths (dom_snapshot.py). All are
+# read in one pass once the editor is ready; an absent optional field gets its default at once.
+# Required fields still absent are re-read a few times in case the editor is still rendering.
+SELENIUM_FIELD_NAMES = ("Campaign Name", "User Attribute", "Campaign Tags", "SMS Sender", "Template ID", "Message Body")
+FIELDS = [f for f in TARGET_USERS_FIELDS + CONTENT_FIELDS if f.name in SELENIUM_FIELD_NAMES]
+REQUIRED_FIELDS = [f.strip() for f in os.getenv("SELENIUM_REQUIRED_FIELDS", "Campaign Name,Message Body").split(",") if f.strip()]
+REQUIRED_FIELD_RETRIES = 3
+REQUIRED_FIELD_RETRY_DELAY = 1  # seconds
 
-logging.info(f"Workspace: {WORKSPACE}")
-logging.info(f"Draft IDs: {DRAFT_IDS}")
+# Selenium is imported where the browser is used, so importing this module is cheap;
+# main() runs the extraction and sets the browser state below.
+progress = ProgressEmitter(enabled=PROGRESS_EVENTS)
+driver = None
+wait = None
+spans = timing.recorder()
+login_status = "Failed"
+field_report = {"absent": Counter(), "timed_out": Counter()}  # field name -> drafts
+
+# ==========================================
+# LOGGING SETUP
+# ==========================================
+def setup_logging():
+    logging.basicConfig(
+        filename='selenium_debug.log',
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logging.info("=== Starting MoEngage Headless Scraper ===")
 
 # ==========================================
 # CHROME OPTIONS — HEADLESS
 # ==========================================
-chrome_options = Options()
-chrome_options.add_argument("--headless=new")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--window-size=1920,1080")
-chrome_options.add_argument("--disable-software-rasterizer")
-chrome_options.add_argument("--disable-extensions")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_argument("--no-proxy-server")
-chrome_options.add_argument("--ignore-certificate-errors")
-chrome_options.add_argument("--log-level=3")
-
-try:
-    driver = webdriver.Chrome(options=chrome_options)
-    wait = WebDriverWait(driver, 20)
-    logging.info("Chrome headless started successfully.")
-except Exception as e:
-    logging.error(f"Failed to start Chrome: {e}")
-    sys.exit(1)
+def start_chrome(resource_policy):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--no-proxy-server")
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--log-level=3")
+
+    if resource_policy.enabled:
+        # Performance log feeds the blocked/loaded request counters
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    new_driver = webdriver.Chrome(options=chrome_options)
+    resource_policy.install_selenium(new_driver)
+    return new_driver, WebDriverWait(new_driver, 20)
 
 # ==========================================
 # INTERNET CHECK
 # ==========================================
-try:
-    r = requests.get("https://www.google.com", timeout=10)
-    logging.info(f"Internet OK ({r.status_code})")
-except Exception as e:
-    logging.warning(f"Internet check failed: {e}")
+def start_connectivity_probe(url, timeout=CONNECTIVITY_PROBE_TIMEOUT):
+    """
+    Checks outbound connectivity in a background thread that only logs the outcome;
+    the run never waits for it.
+    """
+    def probe():
+        import requests
+
+        try:
+            r = requests.get(url, timeout=timeout)
+            logging.info(f"Internet OK ({r.status_code})")
+        except Exception as e:
+            logging.warning(f"Internet check failed: {e}")
+
+    thread = threading.Thread(target=probe, name="connectivity-probe", daemon=True)
+    thread.start()
+    return thread
 
 # ==========================================
-# SAFE ELEMENT FETCHER
+# FIELD LOOKUP
 # ==========================================
-def safe_get(xpath, attr=None, retries=3, delay=2):
-    for _ in range(retries):
-        try:
-            elem = wait.until(EC.presence_of_element_located((By.XPATH, xpath)))
-            if attr:
-                return elem.get_attribute(attr) or "N/A"
-            text = elem.text.strip()
-            return text if text else elem.get_attribute("value") or "N/A"
-        except Exception:
-            time.sleep(delay)
-    return "N/A"
+def _present(value):
+    return value is not ABSENT and not (isinstance(value, str) and not value.strip())
+
+
+def _cleaned(value):
+    # Text is stripped; empty text counts as missing, same as an absent element
+    if isinstance(value, str):
+        return value.strip() or "N/A"
+    return value
+
+
+def read_fields(draft_id):
+    """
+    Reads all fields of the open draft without waiting on any single element.
+    Returns (field dict, absent optional field names, required field names that timed out).
+    """
+    with spans.span("fields", draft_id) as span:
+        snapshot = snapshot_fields_selenium(driver, FIELDS)
+        missing = [f for f in FIELDS if f.name in REQUIRED_FIELDS and not _present(snapshot[f.name])]
+        for attempt in range(REQUIRED_FIELD_RETRIES):
+            if not missing:
+                break
+            time.sleep(REQUIRED_FIELD_RETRY_DELAY)
+            snapshot.update(snapshot_fields_selenium(driver, missing))
+            missing = [f for f in missing if not _present(snapshot[f.name])]
+            span.detail["retries"] = attempt + 1
+        timed_out = [f.name for f in missing]
+        absent = [f.name for f in FIELDS if not _present(snapshot[f.name]) and f.name not in timed_out]
+        span.detail.update(absent=absent, timed_out=timed_out)
+        span.ok = not timed_out
+
+    data = {name: _cleaned(value) for name, value in resolve_fields(snapshot, FIELDS).items()}
+    field_report["absent"].update(absent)
+    field_report["timed_out"].update(timed_out)
+    return data, absent, timed_out
+
+
+def field_report_lines():
+    out = []
+    for kind, label in (("absent", "Absent fields"), ("timed_out", "Required fields that timed out")):
+        if field_report[kind]:
+            counts = ", ".join(f"{name}: {n}" for name, n in field_report[kind].most_common())
+            out.append(f"{label} (drafts): {counts}")
+    return out
 
 # ==========================================
 # LOGIN PROCESS + OTP VERIFICATION
 # ==========================================
-login_status = "Failed"
+def restore_session():
+    """
+    Loads the stored session for this account/workspace into the browser and probes it.
+    Returns True when the dashboard accepts it, so login and OTP can be skipped.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    state = load_session(USERNAME, WORKSPACE)
+    if not state:
+        return False
+    try:
+        driver.get(MOENGAGE_URL)
+        for cookie in to_selenium_cookies(state):
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass  # Cookie for another domain
+        local_storage = local_storage_for(state, MOENGAGE_ORIGIN)
+        if local_storage:
+            driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) { localStorage.setItem(k, v); }",
+                local_storage
+            )
+        driver.get(MOENGAGE_URL)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.mds-header__user-profile"))
+        )
+        return True
+    except Exception as e:
+        logging.info(f"Stored session rejected, falling back to full login: {e}")
+        clear_session(USERNAME, WORKSPACE)
+        driver.delete_all_cookies()
+        driver.execute_script("localStorage.clear();")
+        return False
+
+def store_session():
+    try:
+        local_storage = driver.execute_script("return Object.assign({}, window.localStorage);")
+        save_session(USERNAME, WORKSPACE, from_selenium(driver.get_cookies(), MOENGAGE_ORIGIN, local_storage))
+        logging.info("Session stored for next run.")
+    except Exception as e:
+        logging.warning(f"Could not store session: {e}")
 
 def login():
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support import expected_conditions as EC
+
     global login_status
+    if restore_session():
+        logging.info("Reused stored session, login and OTP skipped.")
+        login_status = "Success"
+        print("Login successful (stored session)!")
+        return
+
     logging.info("Attempting login...")
     try:
         driver.get(MOENGAGE_URL)
         wait.until(EC.visibility_of_element_located((By.ID, "email"))).send_keys(USERNAME)
         driver.find_element(By.ID, "password").send_keys(PASSWORD)
         driver.find_element(By.ID, "password").send_keys(Keys.RETURN)
-        time.sleep(5)
+        # Login either lands on the OTP prompt or straight on the dashboard
+        readiness.wait_for_element(
+            driver, [(By.XPATH, OTP_INPUT_XPATH), (By.CSS_SELECTOR, DASHBOARD_READY_CSS)], "login", visible=True
+        )
 
         # Step 3: OTP verification (if provided)
         if OTP_CODE:
             try:
-                otp_input = wait.until(EC.visibility_of_element_located((By.XPATH, "//input[@id='otp_code']")))  # Replace XPath if needed
+                otp_input = wait.until(EC.visibility_of_element_located((By.XPATH, OTP_INPUT_XPATH)))
                 otp_input.send_keys(OTP_CODE)
                 otp_input.send_keys(Keys.RETURN)
-                time.sleep(5)
+                if readiness.wait_for_element(driver, [(By.CSS_SELECTOR, DASHBOARD_READY_CSS)], "dashboard") is None:
+                    raise TimeoutError("dashboard did not load after OTP")
                 logging.info("OTP verified successfully.")
             except Exception as e:
                 logging.warning(f"OTP input failed or skipped: {e}")
@@ -119,70 +252,198 @@ def login():
         logging.info("Login successful.")
         login_status = "Success"
         print("Login successful!")
+        store_session()
     except Exception as e:
         logging.error(f"Login failed: {e}")
         login_status = f"Failed: {e}"
+        progress.error(f"Login failed: {e}")
         driver.quit()
         sys.exit(1)
 
-login()
-
 # ==========================================
 # SCRAPE DRAFTS
 # ==========================================
-results = []
+def recycle_driver(resource_policy):
+    """
+    Restarts Chrome to release the memory the SPA has piled up, carrying the session over
+    (stored, then restored in the new driver); logs in again only if that is rejected.
+    """
+    global driver, wait
+    store_session()
+    driver.quit()
+    driver, wait = start_chrome(resource_policy)
+    if not restore_session():
+        login()
 
-for draft_id in DRAFT_IDS:
-    logging.info(f"Opening Draft: {draft_id}")
-    url = f"{SMS_CREATE_BASE_URL}{draft_id}"
-    try:
-        driver.get(url)
-        time.sleep(5)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-    except Exception as e:
-        logging.error(f"Failed to open draft {draft_id}: {e}")
-        results.append({
+
+def scrape_drafts(draft_ids, journal, cache, cache_key, resource_policy, guard=None, positions=None):
+    """
+    Extracts draft_ids one by one. positions maps each draft ID to its progress index
+    (its place among the run's pending drafts, which cache-served drafts share).
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    for index, draft_id in enumerate(draft_ids):
+        index = positions[draft_id] if positions else index
+        reason = guard and guard.due()
+        if reason:
+            with spans.span("recycle"):
+                recycle_driver(resource_policy)
+            guard.recycled(reason=reason)
+            logging.info(f"Restarted Chrome: {reason}")
+        logging.info(f"Opening Draft: {draft_id}")
+        url = f"{SMS_CREATE_BASE_URL}{draft_id}"
+        draft_started = time.monotonic()
+        stage = "open"
+        try:
+            with spans.span("goto", draft_id):
+                driver.get(url)
+                wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            with spans.span("editor", draft_id) as editor:
+                editor.ok = readiness.wait_for_element(driver, [(By.XPATH, EDITOR_ROOT_XPATH)], "editor") is not None
+                if editor.ok:
+                    readiness.wait_for_dom_settled_selenium(driver)
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                readiness.wait_for_dom_settled_selenium(driver)
+            stage = "read"
+            fields, absent, timed_out = read_fields(draft_id)
+        except Exception as e:
+            logging.error(f"Failed to {stage} draft {draft_id}: {e}")
+            failed = {
+                "Draft ID": draft_id,
+                "Login Status": login_status,
+                "Status": f"Failed to {stage}: {e}",
+                "Campaign Name": "N/A",
+                "User Attribute": "N/A",
+                "Campaign Tags": "N/A",
+                "SMS Sender": "N/A",
+                "Template ID": "N/A",
+                "Message Body": "N/A"
+            }
+            spans.record("draft", time.monotonic() - draft_started, draft_id, ok=False)
+            if guard:
+                guard.draft_done()
+            journal.record(draft_id, "error", failed)
+            progress.draft(index, draft_id, "error", row=failed, error=str(e))
+            continue
+
+        data = {
             "Draft ID": draft_id,
             "Login Status": login_status,
-            "Status": f"Failed to open: {e}",
-            "Campaign Name": "N/A",
-            "User Attribute": "N/A",
-            "Campaign Tags": "N/A",
-            "SMS Sender": "N/A",
-            "Template ID": "N/A",
-            "Message Body": "N/A"
-        })
-        continue
-
-    data = {
-        "Draft ID": draft_id,
-        "Login Status": login_status,
-        "Status": "Opened successfully",
-        "Campaign Name": safe_get("//input[@placeholder='Campaign Name']", "value"),
-        "User Attribute": safe_get("//span[@class='mds-dropdown__trigger__inner__single--value']"),
-        "Campaign Tags": ", ".join([t.text.strip() for t in driver.find_elements(By.XPATH, "//div[@class='mds-input__input--tags__list--item']/span[1]")]) or "N/A",
-        "SMS Sender": safe_get("//div[@placeholder='Select a connector']//span[@class='mds-dropdown__trigger__inner__single--value']"),
-        "Template ID": safe_get("//input[@id='template_id']", "value"),
-        "Message Body": safe_get("//div[@id='personalization_container']")
-    }
-
-    results.append(data)
-    logging.info(f"Extracted draft: {draft_id}")
-
-# ==========================================
-# SAVE RESULTS
-# ==========================================
-if results:
-    df = pd.DataFrame(results)
-    df.to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
-    logging.info(f"Saved results to {OUTPUT_FILE}")
-    print(f"Saved results to {OUTPUT_FILE}")
-else:
-    logging.warning("No data extracted — check login or draft IDs.")
-    print("No data extracted — check login or draft IDs.")
-
-driver.quit()
-logging.info("Script completed successfully.")
-print("Script completed successfully.")
+            "Status": "Opened successfully",
+            **fields
+        }
+        if absent or timed_out:
+            logging.info(f"Draft {draft_id}: absent {absent or 'none'}, timed out {timed_out or 'none'}")
+        spans.record("draft", time.monotonic() - draft_started, draft_id)
+        if guard:
+            guard.draft_done()
+        if cache:
+            cache.put(cache_key, draft_id, data)
+        data["From Cache"] = False
+
+        journal.record(draft_id, "ok", data)
+        progress.draft(index, draft_id, "ok", row=data)
+        resource_policy.count_selenium_log(driver)
+        logging.info(f"Extracted draft: {draft_id}")
+
+# ==========================================
+# MAIN
+# ==========================================
+def main():
+    global driver, wait, spans
+
+    setup_logging()
+    requested_ids = read_id_file(DRAFT_IDS_FILE) if DRAFT_IDS_FILE else DRAFT_IDS
+    if not USERNAME or not PASSWORD or not (requested_ids or RESUME_RUN_ID):
+        logging.error("Missing credentials or draft IDs. Please check environment variables.")
+        progress.error("Missing credentials or draft IDs.")
+        sys.exit(1)
+
+    # Every finished draft goes to the run journal, so a crash or timeout loses nothing
+    if RESUME_RUN_ID:
+        journal = RunJournal.open(RESUME_RUN_ID)
+        draft_ids = journal.draft_ids
+    else:
+        journal = RunJournal.create(WORKSPACE, requested_ids, RUN_ID)
+        draft_ids = requested_ids
+    pending_ids = journal.pending_ids()
+    spans = timing.use(timing.SpanRecorder(journal.spans_path))
+
+    # Rows differ from the Playwright extractor's, so they are cached under their own key.
+    # No draft payload here, so only the TTL applies: stale rows are extracted again.
+    cache_key = f"{WORKSPACE}:selenium"
+    cache = ResultCache() if RESULT_CACHE_ENABLED else None
+    cached = cache.get_many(cache_key, pending_ids) if cache else {}
+    progress.start(len(pending_ids))
+    for index, draft_id in enumerate(pending_ids):
+        if draft_id in cached and cached[draft_id]["fresh"]:
+            row = dict(cached[draft_id]["row"], **{"From Cache": True})
+            journal.record(draft_id, "ok", row)
+            progress.draft(index, draft_id, "ok", row=row)
+    to_fetch = [d for d in pending_ids if not (d in cached and cached[d]["fresh"])]
+
+    logging.info(f"Run ID: {journal.run_id}")
+    print(f"Run ID: {journal.run_id} (resume with RESUME_RUN_ID={journal.run_id})")
+    logging.info(f"Workspace: {WORKSPACE}")
+    logging.info(f"Draft IDs: {len(draft_ids)}")
+    if RESUME_RUN_ID:
+        logging.info(f"Resuming: {len(draft_ids) - len(pending_ids)} done, {len(pending_ids)} to go.")
+    if len(to_fetch) < len(pending_ids):
+        logging.info(f"{len(pending_ids) - len(to_fetch)} draft(s) served from the result cache.")
+
+    # Runs alongside Chrome startup and login; its result only goes to the log
+    if CONNECTIVITY_PROBE_URL:
+        start_connectivity_probe(CONNECTIVITY_PROBE_URL)
+
+    resource_policy = ResourcePolicy()
+    guard = MemoryGuard()
+    if to_fetch:
+        try:
+            driver, wait = start_chrome(resource_policy)
+            logging.info("Chrome headless started successfully.")
+        except Exception as e:
+            logging.error(f"Failed to start Chrome: {e}")
+            progress.error(f"Failed to start Chrome: {e}")
+            sys.exit(1)
+
+        with spans.span("login"):
+            login()
+        positions = {draft_id: index for index, draft_id in enumerate(pending_ids)}
+        scrape_drafts(to_fetch, journal, cache, cache_key, resource_policy, guard, positions)
+
+    # ==========================================
+    # SAVE RESULTS
+    # ==========================================
+    with spans.span("output"):
+        row_count, output_paths = write_results({WORKSPACE: journal}, OUTPUT_FILE)
+    if row_count:
+        logging.info(f"Saved results to {', '.join(output_paths.values())}")
+        print(f"Saved results to {', '.join(output_paths.values())}")
+    else:
+        for path in output_paths.values():
+            os.remove(path)
+        output_paths = {}
+        logging.warning("No data extracted — check login or draft IDs.")
+        print("No data extracted — check login or draft IDs.")
+
+    for line in readiness.wait_report.lines() + resource_policy.lines() + field_report_lines() + spans.lines() + guard.lines():
+        logging.info(line)
+        print(line)
+    progress.timing({**spans.summary(), "memory": guard.summary()})
+    spans.close()
+
+    progress.done(next(iter(output_paths.values()), None), row_count, output_paths)
+
+    if cache:
+        cache.close()
+
+    if driver:
+        driver.quit()
+    logging.info("Script completed successfully.")
+    print("Script completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
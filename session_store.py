@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import time
+from cryptography.fernet import Fernet, InvalidToken
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+SESSION_STORE_DIR = os.getenv("SESSION_STORE_DIR", ".sessions")
+SESSION_KEY_FILE = os.path.join(SESSION_STORE_DIR, "session.key")
+SESSION_MAX_AGE_HOURS = float(os.getenv("SESSION_MAX_AGE_HOURS", "12"))
+
+# ==========================================
+# ENCRYPTION
+# ==========================================
+def _fernet():
+    """
+    Returns the cipher for the session files.
+    Uses SESSION_STORE_KEY when set, otherwise a key generated once and kept next to the sessions.
+    """
+    key = os.getenv("SESSION_STORE_KEY", "").strip()
+    if key:
+        return Fernet(key.encode())
+
+    os.makedirs(SESSION_STORE_DIR, exist_ok=True)
+    if not os.path.exists(SESSION_KEY_FILE):
+        fd = os.open(SESSION_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(Fernet.generate_key())
+    with open(SESSION_KEY_FILE, "rb") as f:
+        return Fernet(f.read().strip())
+
+
+def _session_path(email, workspace):
+    # Hash the key so account names never show up in file names
+    digest = hashlib.sha256(f"{email.strip().lower()}|{workspace}".encode("utf-8")).hexdigest()
+    return os.path.join(SESSION_STORE_DIR, f"{digest}.session")
+
+# ==========================================
+# STORE
+# ==========================================
+def save_session(email, workspace, storage_state):
+    """
+    Encrypts and stores a Playwright-style storage_state ({"cookies": [...], "origins": [...]}).
+    """
+    os.makedirs(SESSION_STORE_DIR, exist_ok=True)
+    payload = json.dumps({"saved_at": time.time(), "storage_state": storage_state}).encode("utf-8")
+    path = _session_path(email, workspace)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(_fernet().encrypt(payload))
+    os.replace(tmp_path, path)
+
+
+def load_session(email, workspace, max_age_hours=SESSION_MAX_AGE_HOURS):
+    """
+    Returns the stored storage_state, or None when there is none, it is too old or it cannot be decrypted.
+    """
+    path = _session_path(email, workspace)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = json.loads(_fernet().decrypt(f.read()))
+    except (InvalidToken, ValueError, OSError):
+        clear_session(email, workspace)
+        return None
+
+    if time.time() - payload.get("saved_at", 0) > max_age_hours * 3600:
+        clear_session(email, workspace)
+        return None
+    return payload.get("storage_state")
+
+
+def has_session(email, workspace):
+    return load_session(email, workspace) is not None
+
+
+def clear_session(email, workspace):
+    try:
+        os.remove(_session_path(email, workspace))
+    except FileNotFoundError:
+        pass
+
+# ==========================================
+# SELENIUM CONVERSION
+# ==========================================
+def to_selenium_cookies(storage_state):
+    """
+    Converts storage_state cookies into dicts accepted by driver.add_cookie.
+    """
+    cookies = []
+    for c in storage_state.get("cookies", []):
+        cookie = {
+            "name": c["name"],
+            "value": c["value"],
+            "domain": c.get("domain"),
+            "path": c.get("path", "/"),
+            "secure": c.get("secure", False),
+            "httpOnly": c.get("httpOnly", False),
+        }
+        if c.get("expires", -1) and c.get("expires", -1) > 0:
+            cookie["expiry"] = int(c["expires"])
+        if c.get("sameSite") in ("Strict", "Lax", "None"):
+            cookie["sameSite"] = c["sameSite"]
+        cookies.append(cookie)
+    return cookies
+
+
+def from_selenium(cookies, origin, local_storage):
+    """
+    Builds a storage_state from driver.get_cookies() and the localStorage of one origin.
+    """
+    return {
+        "cookies": [
+            {
+                "name": c["name"],
+                "value": c["value"],
+                "domain": c.get("domain", ""),
+                "path": c.get("path", "/"),
+                "expires": c.get("expiry", -1),
+                "httpOnly": c.get("httpOnly", False),
+                "secure": c.get("secure", False),
+                "sameSite": c.get("sameSite", "Lax"),
+            }
+            for c in cookies
+        ],
+        "origins": [
+            {
+                "origin": origin,
+                "localStorage": [{"name": k, "value": v} for k, v in (local_storage or {}).items()],
+            }
+        ],
+    }
+
+
+def local_storage_for(storage_state, origin):
+    for entry in storage_state.get("origins", []):
+        if entry.get("origin") == origin:
+            return {item["name"]: item["value"] for item in entry.get("localStorage", [])}
+    return {}
@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from collections import defaultdict
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Sharded mode: K processes, each with its own Chromium, pull drafts from one shared queue.
+# They reuse the parent's logged-in storage state (no extra login), and only the parent
+# writes the journal, cache and progress events, so the output is merged once, in input order.
+SHARD_MEMORY_MB = int(os.getenv("SHARD_MEMORY_MB", "700"))  # headroom per shard: Chromium + Python
+MAX_SHARDS = int(os.getenv("MAX_SHARDS", "8"))
+RESULT_POLL_S = 1
+
+# ==========================================
+# SIZING
+# ==========================================
+def _cgroup_available_mb():
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit == "max":
+            return None
+        with open("/sys/fs/cgroup/memory.current") as f:
+            used = int(f.read().strip())
+        return (int(limit) - used) // 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def available_memory_mb():
+    """
+    Memory this process can still use: the container's cgroup limit when there is one,
+    else MemAvailable. None when neither can be read.
+    """
+    candidates = [_cgroup_available_mb()]
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    candidates.append(int(line.split()[1]) // 1024)
+                    break
+    except (OSError, ValueError):
+        pass
+    candidates = [mb for mb in candidates if mb is not None]
+    return min(candidates) if candidates else None
+
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_shards(draft_count):
+    """
+    One shard per usable core, as far as memory allows SHARD_MEMORY_MB each,
+    capped at MAX_SHARDS and at the number of drafts.
+    """
+    shards = usable_cpus()
+    memory = available_memory_mb()
+    if memory is not None:
+        shards = min(shards, memory // SHARD_MEMORY_MB)
+    return max(1, min(shards, MAX_SHARDS, draft_count))
+
+# ==========================================
+# SHARD PROCESS
+# ==========================================
+def shard_main(shard, storage_states, mode, concurrency, tasks, results):
+    """
+    Entry point of a shard process: drafts come from tasks as (workspace, index, draft_id,
+    known_version) until a None sentinel; each result goes back on results as
+    (shard, workspace, index, draft_id, status, data, seconds).
+    """
+    asyncio.run(_run_shard(shard, storage_states, mode, concurrency, tasks, results))
+
+
+async def _run_shard(shard, storage_states, mode, concurrency, tasks, results):
+    from playwright.async_api import async_playwright
+    from memory_guard import MemoryGuard
+    from resource_policy import ResourcePolicy
+    from scrape import extract_one, open_context
+
+    loop = asyncio.get_running_loop()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        policy = ResourcePolicy()
+        guard = MemoryGuard()  # this shard's own process tree
+        contexts, in_flight, retired = {}, defaultdict(int), set()
+        opening = asyncio.Lock()
+
+        async def open_from(state):
+            context, page = await open_context(browser, state, policy)
+            await page.close()
+            return context
+
+        async def acquire(workspace):
+            async with opening:
+                if workspace not in contexts:
+                    contexts[workspace] = await open_from(storage_states[workspace])
+                context = contexts[workspace]
+                in_flight[context] += 1
+            return context
+
+        async def release(workspace, context):
+            # A due context is swapped for a fresh one at once; the old one is closed
+            # when the tabs still working in it are done
+            in_flight[context] -= 1
+            guard.draft_done(workspace)
+            reason = guard.due(workspace)
+            async with opening:
+                if reason and contexts.get(workspace) is context:
+                    contexts[workspace] = await open_from(await context.storage_state())
+                    retired.add(context)
+                    guard.recycled(workspace, reason)
+                if context in retired and not in_flight[context]:
+                    retired.discard(context)
+                    del in_flight[context]
+                    await context.close()
+
+        async def tab_worker():
+            # Work stealing: a tab takes the next draft only when it is free, so one slow
+            # draft never holds back drafts another shard could be doing
+            while True:
+                task = await loop.run_in_executor(None, tasks.get)
+                if task is None:
+                    return
+                workspace, index, draft_id, known_version = task
+                started = time.monotonic()
+                context = None
+                try:
+                    context = await acquire(workspace)
+                    status, data = await extract_one(context, draft_id, mode, known_version)
+                except Exception as e:
+                    status, data = "error", {"Draft ID": draft_id, "Error": str(e)}
+                results.put((shard, workspace, index, draft_id, status, data, time.monotonic() - started))
+                if context is not None:
+                    await release(workspace, context)
+
+        try:
+            await asyncio.gather(*(tab_worker() for _ in range(max(1, concurrency))))
+        finally:
+            await browser.close()
+
+# ==========================================
+# COORDINATOR
+# ==========================================
+async def run_shards(shard_count, work, storage_states, mode, concurrency, on_result, spans=None, guard=None):
+    """
+    Extracts work, a list of (workspace, index, draft_id, known_version), across
+    shard_count processes. on_result(workspace, index, draft_id, status, data) runs in
+    this process, on the event loop, as each draft finishes. Returns the number of drafts
+    that finished; drafts lost with a crashed shard stay pending in the run journal.
+    A MemoryGuard here only records peaks (shards are child processes, so they count);
+    each shard recycles its own contexts.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+    for item in work:
+        tasks.put(item)
+    for _ in range(shard_count * max(1, concurrency)):
+        tasks.put(None)
+
+    processes = [
+        ctx.Process(target=shard_main, args=(k, storage_states, mode, concurrency, tasks, results),
+                    name=f"extract-shard-{k}", daemon=True)
+        for k in range(shard_count)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Extracting {len(work)} draft(s) across {shard_count} shard process(es).")
+
+    loop = asyncio.get_running_loop()
+    per_shard = [0] * shard_count
+    finished = 0
+    try:
+        while finished < len(work):
+            try:
+                result = await loop.run_in_executor(None, results.get, True, RESULT_POLL_S)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    print(f" All shards exited with {len(work) - finished} draft(s) unfinished.")
+                    break
+                continue
+            shard, workspace, index, draft_id, status, data, seconds = result
+            finished += 1
+            per_shard[shard] += 1
+            if spans:
+                spans.record("draft", seconds, draft_id, ok=status == "ok", shard=shard)
+            on_result(workspace, index, draft_id, status, data)
+            if guard:
+                guard.sample()
+    finally:
+        for process in processes:
+            await loop.run_in_executor(None, process.join, 10)
+            if process.is_alive():
+                process.terminate()
+    print(f" Drafts per shard: {', '.join(str(n) for n in per_shard)}")
+    return finished
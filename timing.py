@@ -0,0 +1,189 @@
+import heapq
+import json
+import random
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+# ==========================================
+# SPANS
+# ==========================================
+# One JSON object per line in the spans file:
+#   {"draft_id": ... | null, "phase": ..., "start_s": ..., "duration_s": ..., "ok": true | false, ...detail}
+# start_s is relative to the recorder's creation. Run-level phases (login, output) have no draft ID.
+# Per-draft phases: draft (whole extraction), goto, editor, network_quiet, payload, target_users,
+# content, schedule (Playwright); goto, editor, fields (Selenium; detail lists absent and timed-out fields).
+SLOWEST_DRAFTS = 5
+PHASE_SAMPLE_SIZE = 1000  # durations kept per phase (reservoir sample) for the p95
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct / 100)))]
+
+
+class _PhaseStats:
+    """
+    Running count, total and max of one phase, plus a bounded uniform sample for the p95.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sample = []
+
+    def add(self, seconds, rng):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.sample) < PHASE_SAMPLE_SIZE:
+            self.sample.append(seconds)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < PHASE_SAMPLE_SIZE:
+                self.sample[slot] = seconds
+
+
+class SpanRecorder:
+    """
+    Collects per-draft, per-phase durations; optionally appends each span to a JSONL file.
+    In memory it keeps running aggregates per phase, the phases of drafts still in flight
+    and the slowest finished drafts, so memory does not grow with the number of drafts.
+    """
+    def __init__(self, path=None, keep_slowest=SLOWEST_DRAFTS):
+        self.path = path
+        self.started = time.monotonic()
+        self.by_phase = defaultdict(_PhaseStats)
+        self.by_draft = defaultdict(lambda: defaultdict(float))  # drafts whose "draft" span is still open
+        self.slowest = []  # min-heap of (total, seq, draft_id, phases), at most keep_slowest
+        self.keep_slowest = keep_slowest
+        self.failures = defaultdict(int)
+        self._rng = random.Random(0)
+        self._seq = 0
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def _finish_draft(self, draft_id, seconds):
+        # The "draft" span closes after the draft's other phases; only the slowest are kept
+        phases = dict(self.by_draft.pop(draft_id, {}))
+        phases["draft"] = seconds
+        self._seq += 1
+        entry = (seconds, self._seq, draft_id, phases)
+        if len(self.slowest) < self.keep_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def record(self, phase, seconds, draft_id=None, ok=True, start=None, **detail):
+        start = time.monotonic() - seconds if start is None else start
+        self.by_phase[phase].add(seconds, self._rng)
+        if draft_id is not None:
+            if phase == "draft":
+                self._finish_draft(draft_id, seconds)
+            else:
+                self.by_draft[draft_id][phase] += seconds
+        if not ok:
+            self.failures[phase] += 1
+        if self._file:
+            span = {"draft_id": draft_id, "phase": phase, "start_s": round(start - self.started, 4),
+                    "duration_s": round(seconds, 4), "ok": ok, **detail}
+            self._file.write(json.dumps(span, default=str) + "\n")
+            self._file.flush()
+
+    def span(self, phase, draft_id=None, **detail):
+        """
+        Context manager timing a phase. Set .ok = False on it to mark a soft failure
+        (e.g. a wait that timed out without raising).
+        """
+        return _Span(self, phase, draft_id, detail)
+
+    def summary(self, top=SLOWEST_DRAFTS):
+        phases = [
+            {
+                "phase": phase,
+                "count": stats.count,
+                "total_s": round(stats.total, 3),
+                "mean_s": round(stats.total / stats.count, 3),
+                "p95_s": round(_percentile(stats.sample, 95), 3),
+                "max_s": round(stats.max, 3),
+                "failures": self.failures.get(phase, 0),
+            }
+            for phase, stats in self.by_phase.items()
+        ]
+        phases.sort(key=lambda p: -p["total_s"])
+
+        def draft_total(phases):
+            return phases.get("draft") or sum(phases.values())
+
+        candidates = [(draft_id, phases) for _, _, draft_id, phases in self.slowest] + list(self.by_draft.items())
+        drafts = sorted(candidates, key=lambda kv: -draft_total(kv[1]))[:top]
+        slowest = []
+        for draft_id, draft_phases in drafts:
+            parts = {p: s for p, s in draft_phases.items() if p != "draft"}
+            slowest.append({
+                "draft_id": draft_id,
+                "total_s": round(draft_total(draft_phases), 3),
+                "slowest_phase": max(parts, key=parts.get) if parts else None,
+                "phases": {p: round(s, 3) for p, s in parts.items()},
+            })
+        return {"phases": phases, "slowest_drafts": slowest}
+
+    def lines(self, top=SLOWEST_DRAFTS):
+        summary = self.summary(top)
+        out = ["Phase timings (phase: count, total, mean, p95, max, failures):"]
+        for p in summary["phases"]:
+            out.append(f"  {p['phase']}: {p['count']}x, {p['total_s']:.2f}s total, {p['mean_s']:.2f}s mean, "
+                       f"{p['p95_s']:.2f}s p95, {p['max_s']:.2f}s max, {p['failures']} failure(s)")
+        if summary["slowest_drafts"]:
+            out.append("Slowest drafts:")
+            for d in summary["slowest_drafts"]:
+                out.append(f"  {d['draft_id']}: {d['total_s']:.2f}s (mostly {d['slowest_phase']})")
+        if self.path:
+            out.append(f"Spans written to {self.path}")
+        return out
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class _Span:
+    def __init__(self, recorder, phase, draft_id, detail):
+        self.recorder = recorder
+        self.phase = phase
+        self.draft_id = draft_id
+        self.detail = detail
+        self.ok = True
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(self.phase, time.monotonic() - self.start, self.draft_id,
+                             self.ok and exc_type is None, self.start, **self.detail)
+        return False
+
+# ==========================================
+# CURRENT RECORDER
+# ==========================================
+# A context variable, so concurrent jobs in the extraction worker each get their own recorder;
+# asyncio tasks started inside a job inherit it.
+_default = SpanRecorder()
+_current = ContextVar("span_recorder", default=None)
+
+
+def recorder():
+    return _current.get() or _default
+
+
+def use(new_recorder):
+    """
+    Makes new_recorder the current one for this task (and tasks it starts). Returns it.
+    """
+    _current.set(new_recorder)
+    return new_recorder
+
+
+def span(phase, draft_id=None, **detail):
+    return recorder().span(phase, draft_id, **detail)
@@ -0,0 +1,159 @@
+import re
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+MESSAGE_BODY_CHAR_LIMIT = 4096
+URL_RE = re.compile(r"https?://\S+")
+MESSAGE_SEPARATOR = " | "
+
+# ==========================================
+# PREDICATES
+# ==========================================
+# Each takes the whole column (a Series) and returns a boolean mask of the rows that FAIL.
+
+def _text(column):
+    # Via the string dtype so categorical, boolean and datetime columns work too
+    return column.astype("string").fillna("")
+
+
+def missing(column):
+    """
+    Empty, absent or "N/A".
+    """
+    return column.isna() | _text(column).isin(["", "N/A"])
+
+
+def null(column):
+    return column.isna()
+
+
+def contains(text):
+    return lambda column: _text(column).str.contains(text, regex=False)
+
+
+def equals_ignore_case(text):
+    text = text.lower()
+    return lambda column: _text(column).str.lower() == text
+
+
+def lacks_match(pattern):
+    return lambda column: ~_text(column).str.contains(pattern)
+
+
+def longer_than(limit):
+    return lambda column: _text(column).str.len() > limit
+
+# ==========================================
+# RULES
+# ==========================================
+# name: label of the "<name> Validation" output column
+# field: extracted column the rule looks at
+# cases: (predicate, message, severity) in priority order; the first failing one sets the message.
+#        No cases means the field is always valid.
+# severity: "error" for missing/invalid data, "warning" for settings that are usually unwanted;
+#           a row's error messages come before its warnings in "Validation Message"
+Rule = namedtuple("Rule", ["name", "field", "cases"])
+
+
+def required(name, field, message):
+    return Rule(name, field, [(missing, message, "error")])
+
+
+def always_valid(name, field):
+    return Rule(name, field, [])
+
+
+RULES = [
+    # Target Users
+    required("Campaign Name", "Campaign Name", "Campaign Name is missing"),
+    required("User Attribute", "User Attribute", "User Attribute is missing"),
+    required("Campaign Tags", "Campaign Tags", "Campaign Tags are missing"),
+    always_valid("Message Type", "Message Type"),
+    Rule("Audience Selection", "Audience Selection", [
+        (missing, "Audience selection missing", "error"),
+        (contains("All Users"), "Audience set to All Users (usually not desired for targeted campaigns)", "warning"),
+    ]),
+    always_valid("Exclude User", "Exclude User"),
+    always_valid("User Opted Out Toggle", "User Opted Out Toggle"),
+    always_valid("Audience Limit Toggle", "Audience Limit Toggle"),
+    always_valid("Control Group Toggle", "Control Group Toggle"),
+    # Content
+    required("SMS Sender", "SMS Sender", "SMS Sender missing"),
+    required("Template ID", "Template ID", "Template ID missing"),
+    Rule("Message", "Message Body", [
+        (missing, "Message body is missing", "error"),
+        (lacks_match(URL_RE), "Message link missing or invalid (requires http/https URL)", "error"),
+        (longer_than(MESSAGE_BODY_CHAR_LIMIT), f"Message exceeds character limit of {MESSAGE_BODY_CHAR_LIMIT}", "error"),
+    ]),
+    # Schedule and Goals
+    Rule("Send Campaign Toggle", "Send Campaign Toggle", [
+        (equals_ignore_case("As soon as possible"),
+         "Send Campaign set to 'As soon as possible' (might not be desired for scheduled campaigns)", "warning"),
+    ]),
+    required("Date & Time", "Scheduled Datetime", "Scheduled Date & Time is missing or invalid"),
+    required("Conversion Goal", "Conversion Goals", "Conversion Goal is missing"),
+    always_valid("Frequency Cap Toggle", "Frequency Cap Toggle"),
+    Rule("Request Limit", "Request Limit", [(null, "Request Limit is missing", "error")]),
+]
+
+# Per-workspace rule sets: a rule with the same name replaces the default one, others are added
+WORKSPACE_RULES = {}
+
+
+def register_rule(rule, workspace=None):
+    """
+    Adds or replaces a rule, for every workspace or only the given one.
+    """
+    rules = RULES if workspace is None else WORKSPACE_RULES.setdefault(workspace, [])
+    for i, existing in enumerate(rules):
+        if existing.name == rule.name:
+            rules[i] = rule
+            return
+    rules.append(rule)
+
+
+def rules_for(workspace=None):
+    overrides = {rule.name: rule for rule in WORKSPACE_RULES.get(workspace, [])}
+    rules = [overrides.pop(rule.name, rule) for rule in RULES]
+    return rules + list(overrides.values())
+
+# ==========================================
+# ENGINE
+# ==========================================
+def _joined(left, right):
+    # Element-wise "left | right", without a separator where either side is empty
+    separator = np.where((left != "") & (right != ""), MESSAGE_SEPARATOR, "").astype(object)
+    return left + separator + right
+
+
+def validate_frame(df, workspace=None, rules=None):
+    """
+    Evaluates the rules column-wise over all extracted rows at once.
+    Returns a copy of df with "Validation Message" (failed rule messages joined with " | ",
+    errors first, then warnings) followed by one boolean "<name> Validation" column per rule.
+    """
+    rules = rules_for(workspace) if rules is None else rules
+    n = len(df)
+    by_severity = {"error": np.full(n, "", dtype=object), "warning": np.full(n, "", dtype=object)}
+    flags = {}
+    for rule in rules:
+        column = df[rule.field] if rule.field in df else pd.Series(np.nan, index=df.index, dtype=object)
+        failed = np.zeros(n, dtype=bool)
+        message = {"error": np.full(n, "", dtype=object), "warning": np.full(n, "", dtype=object)}
+        for predicate, text, severity in rule.cases:
+            hit = np.asarray(predicate(column), dtype=bool) & ~failed
+            message["error" if severity == "error" else "warning"][hit] = text
+            failed |= hit
+        flags[f"{rule.name} Validation"] = ~failed
+        if failed.any():
+            for severity, text in message.items():
+                by_severity[severity] = _joined(by_severity[severity], text)
+
+    messages = _joined(by_severity["error"], by_severity["warning"])
+    checks = pd.DataFrame({"Validation Message": messages, **flags}, index=df.index)
+    df = df.drop(columns=[c for c in checks.columns if c in df.columns])
+    return pd.concat([df, checks], axis=1)
@@ -0,0 +1,528 @@
+import asyncio
+import fcntl
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from progress import ProgressEmitter, parse_event
+from job_queue import JobQueue, JobEmitter
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+WORKER_SOCKET = os.getenv("EXTRACTOR_WORKER_SOCKET", "/tmp/moengage_extractor.sock")
+WORKER_LOCK_FILE = WORKER_SOCKET + ".lock"  # held for the worker's lifetime; one worker per socket
+WORKER_IDLE_TIMEOUT = float(os.getenv("EXTRACTOR_WORKER_IDLE_TIMEOUT", "900"))  # seconds without jobs before shutdown
+WORKER_START_TIMEOUT = 30
+WORKER_LOG_FILE = "extractor_worker.log"
+LOGIN_TIMEOUT_MS = 120000  # never wait forever for an OTP nobody can type into a headless worker
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+WORKER_POOL_SIZE = max(1, int(os.getenv("EXTRACTOR_WORKER_POOL", "1")))  # jobs extracted at once, across all users
+JOB_POLL_INTERVAL = 2  # seconds between queue checks when idle
+SECRET_FIELDS = ("password", "otp")  # kept in worker memory only, never in the job queue
+
+# ==========================================
+# SERVER (runs in its own process: python worker.py)
+# ==========================================
+class _SocketStream:
+    """
+    File-like adapter so a ProgressEmitter can write events to a client connection.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        if not self.writer.is_closing():
+            self.writer.write(text.encode("utf-8"))
+
+    def flush(self):
+        pass
+
+
+def _write_line(writer, payload):
+    writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+
+
+class ExtractionWorker:
+    """
+    Keeps one Chromium and a logged-in context per (account, workspace) warm between jobs.
+    Requests arrive as one JSON line per connection on a Unix socket. Queued jobs and
+    streamed extractions share WORKER_POOL_SIZE slots, so at most that many jobs have
+    contexts open in the browser at once, however many users submit.
+    """
+    def __init__(self):
+        self.playwright = None
+        self.browser = None
+        self.policy = None
+        self.sessions = {}
+        self.session_locks = defaultdict(asyncio.Lock)  # one login per (account, workspace) at a time
+        self.browser_lock = asyncio.Lock()
+        self.jobs = {}
+        self.busy = 0
+        self.extracting = 0  # jobs inside extract()
+        self.last_activity = time.monotonic()
+        self.stopped = None
+        self.queue = None
+        self.slots = None
+        self.secrets = {}  # job ID -> credentials of queued jobs
+        self.queued = None  # set when a job is enqueued
+
+    async def ensure_browser(self):
+        from playwright.async_api import async_playwright
+        from resource_policy import ResourcePolicy
+
+        async with self.browser_lock:
+            if self.browser is None or not self.browser.is_connected():
+                if self.playwright is None:
+                    self.playwright = await async_playwright().start()
+                print("Launching Chromium...")
+                self.browser = await self.playwright.chromium.launch(headless=True)
+                self.policy = ResourcePolicy()
+                self.sessions = {}
+        return self.browser
+
+    async def session_for(self, email, password, workspace, otp_code):
+        from scrape import login, open_workspace
+        from session_store import SESSION_MAX_AGE_HOURS
+
+        account = email.strip().lower()
+        key = (account, workspace)
+        # Two jobs asking for the same session at once would otherwise both log in
+        async with self.session_locks[key]:
+            browser = await self.ensure_browser()
+            session = self.sessions.get(key)
+            if session and time.time() - session["logged_in_at"] > SESSION_MAX_AGE_HOURS * 3600:
+                await session["context"].close()
+                session = None
+            if session is None:
+                # Another warm workspace of the same account already holds the login; reuse its cookies
+                sibling = next((s for (a, _), s in self.sessions.items()
+                                if a == account and time.time() - s["logged_in_at"] <= SESSION_MAX_AGE_HOURS * 3600), None)
+                context = None
+                if sibling:
+                    print(f"Opening warm session for {workspace} from the account's existing login...")
+                    try:
+                        context = await open_workspace(browser, email, await sibling["context"].storage_state(),
+                                                       workspace, self.policy)
+                    except Exception as e:
+                        print(f"Could not reuse the existing login ({e}); logging in again.")
+                if context is None:
+                    print(f"Opening warm session for {workspace}...")
+                    context = await login(browser, email, password, workspace, otp_code, self.policy,
+                                          dashboard_timeout_ms=LOGIN_TIMEOUT_MS)
+                session = {"context": context, "lock": asyncio.Lock(), "logged_in_at": time.time()}
+                self.sessions[key] = session
+            return session
+
+    async def extract_workspace(self, job, session, workspace, to_fetch, journal, cache, cached, emitter, positions, guard):
+        from scrape import extract_drafts, DEFAULT_CONCURRENCY, DEFAULT_MODE
+
+        async with session["lock"]:
+            # A recycled context replaces the warm one, so the next job starts from a lean heap
+            session["context"] = await extract_drafts(
+                session["context"], workspace, to_fetch, emitter, journal, cache, cached,
+                job.get("concurrency", DEFAULT_CONCURRENCY), job.get("mode", DEFAULT_MODE), positions,
+                guard=guard, policy=self.policy
+            )
+
+    async def discover(self, job, workspaces):
+        """
+        {workspace: draft IDs} listed in each workspace's warm session, filtered by
+        job["discover"] ({"tag", "created_from", "created_to", "name_pattern"}, dates as ISO strings).
+        """
+        from contextlib import AsyncExitStack
+        from datetime import date
+        from scrape import discover_workspaces
+
+        filters = dict(job["discover"])
+        for key in ("created_from", "created_to"):
+            if filters.get(key):
+                filters[key] = date.fromisoformat(filters[key])
+        first, *others = workspaces
+        sessions = [await self.session_for(job["email"], job["password"], first, job.get("otp"))]
+        sessions += await asyncio.gather(*(
+            self.session_for(job["email"], job["password"], workspace, job.get("otp")) for workspace in others
+        ))
+        async with AsyncExitStack() as stack:
+            # Not while another job extracts in (and may recycle) the same context
+            for session in sessions:
+                await stack.enter_async_context(session["lock"])
+            return await discover_workspaces({ws: s["context"] for ws, s in zip(workspaces, sessions)}, filters)
+
+    async def extract(self, job, emitter):
+        """
+        Runs one job: {"workspace", "draft_ids"} or {"workspaces": {workspace: draft IDs}}.
+        Workspaces are extracted in parallel, each in its own warm context.
+        With "discover" (filters, may be empty) the draft IDs are listed from the workspaces instead.
+        """
+        from scrape import progress_positions, serve_from_cache
+        from memory_guard import MemoryGuard
+        from output_schema import write_results
+        from run_journal import RunJournal
+        from result_cache import ResultCache, RESULT_CACHE_ENABLED
+        from draft_payload import payload_report
+        from resource_policy import BlockStats
+        import readiness
+        import timing
+
+        workspace_drafts = job.get("workspaces") or {job["workspace"]: job.get("draft_ids", [])}
+        if job.get("discover") is not None:
+            workspace_drafts = await self.discover(job, list(workspace_drafts))
+        journals = RunJournal.create_group(workspace_drafts, job.get("job_id"))
+        spans = timing.use(timing.SpanRecorder(next(iter(journals.values())).spans_path))
+        cache = ResultCache() if job.get("use_cache", RESULT_CACHE_ENABLED) else None
+        guard = MemoryGuard()
+        waits = readiness.use(readiness.WaitReport())
+        # Request and payload counters hang off the warm contexts every job shares, so they
+        # cannot be split per job; they start afresh whenever no other job is extracting
+        if not self.extracting:
+            if self.policy:
+                self.policy.stats = BlockStats()
+            payload_report.reset()
+        self.extracting += 1
+        try:
+            emitter.start(sum(map(len, workspace_drafts.values())))
+            to_fetch, cached = {}, {}
+            positions = progress_positions(workspace_drafts)
+            for workspace, draft_ids in workspace_drafts.items():
+                fetch, cached[workspace] = serve_from_cache(cache, workspace, draft_ids, emitter,
+                                                            journals[workspace], positions[workspace])
+                if fetch:
+                    to_fetch[workspace] = fetch
+            if to_fetch:
+                with spans.span("login", workspaces=len(to_fetch)):
+                    # The first login may need the OTP; the rest reuse its cookies
+                    first, *others = to_fetch
+                    sessions = [await self.session_for(job["email"], job["password"], first, job.get("otp"))]
+                    sessions += await asyncio.gather(*(
+                        self.session_for(job["email"], job["password"], workspace, job.get("otp"))
+                        for workspace in others
+                    ))
+                await asyncio.gather(*(
+                    self.extract_workspace(job, session, workspace, ids, journals[workspace], cache, cached[workspace],
+                                           emitter, positions[workspace], guard)
+                    for session, (workspace, ids) in zip(sessions, to_fetch.items())
+                ))
+            with spans.span("output"):
+                rows, outputs = write_results(journals, job["output"], job.get("formats"))
+        finally:
+            self.extracting -= 1
+            if cache:
+                cache.close()
+            spans.close()
+        print(f"Job done: {rows} row(s) written to {', '.join(outputs.values())}")
+        shared = self.policy.lines() + payload_report.lines() if self.policy else []
+        for line in waits.lines() + shared + spans.lines() + guard.lines():
+            print(line)
+        emitter.timing({**spans.summary(), "memory": guard.summary()})
+        emitter.done(next(iter(outputs.values())), rows, outputs)
+
+    def enqueue(self, request):
+        """
+        Queues a job without running it; credentials stay in memory. Returns the job ID.
+        """
+        job_id = request.get("job_id") or uuid.uuid4().hex
+        spec = {k: v for k, v in request.items() if k not in SECRET_FIELDS and k != "op"}
+        self.secrets[job_id] = {k: request.get(k) for k in SECRET_FIELDS}
+        self.queue.submit(spec, job_id)
+        print(f"Job {job_id} queued.")
+        self.queued.set()
+        return job_id
+
+    async def run_queue(self):
+        """
+        One pool member: claims queued jobs while a slot is free and runs them to completion.
+        """
+        while not self.stopped.is_set():
+            async with self.slots:
+                claimed = self.queue.claim()
+                if claimed:
+                    job_id, spec = claimed
+                    await self.run_queued(job_id, spec)
+                    continue
+            self.queued.clear()
+            try:
+                await asyncio.wait_for(self.queued.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_queued(self, job_id, spec):
+        emitter = JobEmitter(self.queue, job_id)
+        secrets = self.secrets.pop(job_id, None)
+        if secrets is None:
+            emitter.error("Job credentials are gone (the worker restarted); submit it again.")
+            return
+        task = asyncio.create_task(self.extract({**spec, **secrets, "job_id": job_id}, emitter))
+        self.jobs[job_id] = task
+        self.busy += 1
+        try:
+            await task
+        except asyncio.CancelledError:
+            print(f"Job {job_id} cancelled.")
+            emitter.emit("cancelled")
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            emitter.error(str(e))
+        finally:
+            self.jobs.pop(job_id, None)
+            self.busy -= 1
+            self.last_activity = time.monotonic()
+
+    async def _cancel_on_disconnect(self, reader, task):
+        # The client sends nothing after its request, so EOF means it went away
+        await reader.read()
+        task.cancel()
+
+    def health(self):
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "browser": bool(self.browser and self.browser.is_connected()),
+            "workspaces": sorted(workspace for _, workspace in self.sessions),
+            "busy": self.busy,
+            "pool_size": WORKER_POOL_SIZE,
+            "queued": self.queue.queued_count(),
+            "idle_s": round(time.monotonic() - self.last_activity, 1),
+        }
+
+    async def handle_client(self, reader, writer):
+        self.busy += 1
+        emitter = ProgressEmitter(_SocketStream(writer))
+        try:
+            request = json.loads(await reader.readline())
+            op = request.get("op")
+            if op == "ping":
+                _write_line(writer, self.health())
+            elif op == "extract":
+                job_id = request["job_id"] = request.get("job_id") or uuid.uuid4().hex
+                task = asyncio.current_task()
+                self.jobs[job_id] = task
+                watcher = asyncio.create_task(self._cancel_on_disconnect(reader, task))
+                try:
+                    async with self.slots:
+                        await self.extract(request, emitter)
+                except asyncio.CancelledError:
+                    print(f"Job {job_id} cancelled.")
+                    emitter.emit("cancelled")
+                finally:
+                    watcher.cancel()
+                    self.jobs.pop(job_id, None)
+            elif op == "enqueue":
+                job_id = self.enqueue(request)
+                _write_line(writer, {"ok": True, "job_id": job_id, "position": self.queue.position(job_id)})
+            elif op == "cancel":
+                job_id = request.get("job_id")
+                task = self.jobs.get(job_id)
+                if task:
+                    task.cancel()
+                # A job still waiting in the queue is simply never started
+                queued = not task and self.queue.cancel_queued(job_id)
+                if queued:
+                    self.secrets.pop(job_id, None)
+                _write_line(writer, {"ok": bool(task) or queued})
+            elif op == "shutdown":
+                _write_line(writer, {"ok": True})
+                self.stopped.set()
+            else:
+                _write_line(writer, {"ok": False, "error": f"Unknown op: {op}"})
+        except Exception as e:
+            print(f"Job failed: {e}")
+            emitter.error(str(e))
+        finally:
+            self.busy -= 1
+            self.last_activity = time.monotonic()
+
+        try:
+            await writer.drain()
+            writer.close()
+        except ConnectionError:
+            pass
+
+    async def idle_watchdog(self):
+        while not self.stopped.is_set():
+            await asyncio.sleep(5)
+            if (not self.busy and not self.queue.queued_count()
+                    and time.monotonic() - self.last_activity > WORKER_IDLE_TIMEOUT):
+                print(f"Idle for {WORKER_IDLE_TIMEOUT:.0f}s, shutting down.")
+                self.stopped.set()
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        self.slots = asyncio.Semaphore(WORKER_POOL_SIZE)
+        self.queued = asyncio.Event()
+        # Two app sessions may both start a worker; only the one holding the lock serves, so
+        # the other never unlinks a live socket or interrupts the running worker's jobs
+        lock = open(WORKER_LOCK_FILE, "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            print(f"Another extraction worker already serves {WORKER_SOCKET}; exiting.")
+            return
+        self.queue = JobQueue()
+        interrupted = self.queue.interrupt_active()
+        if interrupted:
+            print(f"Marked {interrupted} job(s) of a previous worker as interrupted.")
+        self.queue.purge()
+        if os.path.exists(WORKER_SOCKET):
+            os.remove(WORKER_SOCKET)  # left over from a worker that died
+        server = await asyncio.start_unix_server(self.handle_client, path=WORKER_SOCKET, limit=MAX_MESSAGE_BYTES)
+        os.chmod(WORKER_SOCKET, 0o600)
+        print(f"Extraction worker {os.getpid()} listening on {WORKER_SOCKET}")
+        await self.ensure_browser()  # warm up before the first job arrives
+
+        watchdog = asyncio.create_task(self.idle_watchdog())
+        pool = [asyncio.create_task(self.run_queue()) for _ in range(WORKER_POOL_SIZE)]
+        try:
+            await self.stopped.wait()
+        finally:
+            watchdog.cancel()
+            for runner in pool:
+                runner.cancel()
+            server.close()
+            for session in self.sessions.values():
+                await session["context"].close()
+            if self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+            if os.path.exists(WORKER_SOCKET):
+                os.remove(WORKER_SOCKET)
+            self.queue.interrupt_active("The extraction worker shut down; resume the run to continue.")
+            self.queue.close()
+            lock.close()  # releases the lock
+
+# ==========================================
+# CLIENT (used by app.py)
+# ==========================================
+def _request(payload, timeout):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(WORKER_SOCKET)
+        s.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Extraction worker closed the connection without replying.")
+    return json.loads(line)
+
+
+def ping(timeout=2):
+    """
+    Health check. Returns the worker status dict, or None when no worker is reachable.
+    """
+    try:
+        return _request({"op": "ping"}, timeout)
+    except (OSError, ValueError):
+        return None
+
+
+def _worker_locked():
+    """
+    Whether some worker process holds WORKER_LOCK_FILE (is serving or starting up).
+    """
+    with open(WORKER_LOCK_FILE, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        return False
+
+
+def ensure_worker():
+    """
+    Starts the worker process if none is answering, and waits until it is ready.
+    """
+    if ping():
+        return
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def start():
+        with open(os.path.join(here, WORKER_LOG_FILE), "ab") as log:
+            return subprocess.Popen(
+                [sys.executable, os.path.join(here, "worker.py")],
+                cwd=here, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+
+    process = start()
+    deadline = time.monotonic() + WORKER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if ping():
+            return
+        if process.poll() is not None and not _worker_locked():
+            # Lost the lock to a worker that has since shut down; nobody serves now, so try again
+            process = start()
+        time.sleep(0.2)
+    raise RuntimeError(f"Extraction worker did not start within {WORKER_START_TIMEOUT}s (see {WORKER_LOG_FILE}).")
+
+
+def stream(job, timeout=600):
+    """
+    Runs an extraction job in the warm worker and yields its progress events
+    (see progress.py) until "done", "error" or "cancelled".
+    timeout is the longest silence tolerated between two events.
+    """
+    ensure_worker()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(WORKER_SOCKET)
+        s.sendall(json.dumps({"op": "extract", **job}).encode("utf-8") + b"\n")
+        with s.makefile("r", encoding="utf-8") as f:
+            for line in f:
+                event = parse_event(line)
+                if event is None:
+                    continue
+                yield event
+                if event["event"] in ("done", "error", "cancelled"):
+                    return
+    raise ConnectionError("Extraction worker closed the connection before the job finished.")
+
+
+def submit(job, timeout=600):
+    """
+    Runs a job to completion and returns its final event.
+    """
+    event = None
+    for event in stream(job, timeout):
+        pass
+    return event
+
+
+def enqueue(job):
+    """
+    Queues an extraction job in the worker and returns its job ID right away.
+    Follow it with job_queue.JobQueue().get(job_id).
+    """
+    ensure_worker()
+    reply = _request({"op": "enqueue", **job}, 10)
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error") or "The extraction worker did not accept the job.")
+    return reply["job_id"]
+
+
+def cancel(job_id):
+    try:
+        return _request({"op": "cancel", "job_id": job_id}, 5).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def shutdown():
+    try:
+        _request({"op": "shutdown"}, 5)
+    except (OSError, ValueError):
+        pass
+
+
+def main():
+    sys.stdout.reconfigure(line_buffering=True)
+    asyncio.run(ExtractionWorker().serve())
+
+
+if __name__ == "__main__":
+    main()